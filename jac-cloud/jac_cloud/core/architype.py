@@ -454,7 +454,8 @@ class BaseAnchor:
 
     def is_populated(self) -> bool:
         """Check if populated."""
-        return "architype" in self.__dict__
+        # architype is kept in the slot of the jaclang anchor
+        return Anchor.is_populated(self)  # type: ignore[arg-type]
 
     def make_stub(self: "BaseAnchor | TANCH") -> "BaseAnchor | TANCH":
         """Return unsynced copy of anchor."""
@@ -473,7 +474,7 @@ class BaseAnchor:
         jsrc = JaseciContext.get().mem
 
         if anchor := jsrc.find_by_id(self):
-            self.__dict__.update(anchor.__dict__)
+            Anchor.load_from(self, anchor)  # type: ignore[arg-type]
         else:
             raise ValueError(
                 f"{self.__class__.__name__} [{self.ref_id}] is not a valid reference!"
@@ -659,8 +660,8 @@ class BaseAnchor:
         if self.is_populated():
             attrs = ""
             for f in fields(self):
-                if f.name in self.__dict__:
-                    attrs += f"{f.name}={self.__dict__[f.name]}, "
+                if f.repr and Anchor.is_set(self, f.name):  # type: ignore[arg-type]
+                    attrs += f"{f.name}={getattr(self, f.name)}, "
             attrs = attrs[:-2]
         else:
             attrs = f"name={self.name}, id={self.id}"
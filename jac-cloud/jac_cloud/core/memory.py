@@ -46,7 +46,7 @@ class MongoDB(Memory[ObjectId, BaseAnchor | Anchor]):
                     nodes.add(edge.source)
                 if edge.target:
                     nodes.add(edge.target)
-            self.find(nodes)
+            list(self.find(nodes))
 
     def find(  # type: ignore[override]
         self,
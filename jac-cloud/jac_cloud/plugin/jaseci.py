@@ -6,7 +6,7 @@ from dataclasses import Field, MISSING, fields, is_dataclass
 from functools import wraps
 from os import getenv
 from re import compile
-from types import NoneType
+from types import NoneType, UnionType
 from typing import Any, Callable, Type, TypeAlias, TypeVar, Union, cast, get_type_hints
 
 from asyncer import syncify
@@ -464,13 +464,18 @@ class JacNodePlugin:
         dir: EdgeDir,
         filter_func: Callable[[list[EdgeArchitype]], list[EdgeArchitype]] | None,
         target_obj: list[NodeArchitype] | None,
+        edge_type: type | UnionType | None,
     ) -> list[EdgeArchitype]:
         """Get edges connected to this node."""
         if FastAPI.is_enabled():
             JaseciContext.get().mem.populate_data(node.edges)
 
-        return JacFeatureImpl.get_edges(
-            node=node, dir=dir, filter_func=filter_func, target_obj=target_obj  # type: ignore[arg-type, return-value]
+        return JacFeatureImpl.get_edges(  # type: ignore[return-value]
+            node=node,  # type: ignore[arg-type]
+            dir=dir,
+            filter_func=filter_func,
+            target_obj=target_obj,
+            edge_type=edge_type,
         )
 
     @staticmethod
@@ -480,13 +485,18 @@ class JacNodePlugin:
         dir: EdgeDir,
         filter_func: Callable[[list[EdgeArchitype]], list[EdgeArchitype]] | None,
         target_obj: list[NodeArchitype] | None,
+        edge_type: type | UnionType | None,
     ) -> list[NodeArchitype]:
         """Get set of nodes connected to this node."""
         if FastAPI.is_enabled():
             JaseciContext.get().mem.populate_data(node.edges)
 
-        return JacFeatureImpl.edges_to_nodes(
-            node=node, dir=dir, filter_func=filter_func, target_obj=target_obj  # type: ignore[arg-type, return-value]
+        return JacFeatureImpl.edges_to_nodes(  # type: ignore[return-value]
+            node=node,  # type: ignore[arg-type]
+            dir=dir,
+            filter_func=filter_func,
+            target_obj=target_obj,
+            edge_type=edge_type,
         )
 
 
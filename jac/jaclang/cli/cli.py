@@ -15,6 +15,7 @@ from jaclang import jac_import
 from jaclang.cli.cmdreg import CommandShell, cmd_registry
 from jaclang.compiler.compile import jac_file_to_pass
 from jaclang.compiler.constant import Constants
+from jaclang.compiler.parallel import using_compile_jobs
 from jaclang.compiler.passes.main.pyast_load_pass import PyastBuildPass
 from jaclang.compiler.passes.main.schedules import py_code_gen_typed
 from jaclang.compiler.passes.tool.schedules import format_pass
@@ -24,6 +25,7 @@ from jaclang.plugin.feature import JacFeature as Jac
 from jaclang.runtimelib.constructs import WalkerArchitype
 from jaclang.runtimelib.context import ExecutionContext
 from jaclang.runtimelib.machine import JacMachine, JacProgram, ShellGhost
+from jaclang.settings import settings
 from jaclang.utils.helpers import debugger as db
 from jaclang.utils.lang_tools import AstTool
 
@@ -73,9 +75,18 @@ def format(path: str, outfile: str = "", debug: bool = False) -> None:
 
 @cmd_registry.register
 def run(
-    filename: str, session: str = "", main: bool = True, cache: bool = True, gins: bool = False
+    filename: str,
+    session: str = "",
+    main: bool = True,
+    cache: bool = True,
+    gins: bool = False,
+    jobs: int = -1,
 ) -> None:
-    """Run the specified .jac file."""
+    """Run the specified .jac file.
+
+    :param jobs: Processes compiling the imported modules, 0 for one per CPU,
+        -1 for the compile_jobs setting.
+    """
     # if no session specified, check if it was defined when starting the command shell
     # otherwise default to jaclang.session
     if session == "":
@@ -94,35 +105,38 @@ def run(
     if gins:
         JacMachine(base).attach_gin(ShellGhost())
 
-    if filename.endswith(".jac"):
-        try:
-            jac_import(
-                target=mod,
-                base_path=base,
-                cachable=cache,
-                override_name="__main__" if main else None,
-            )
-        except Exception as e:
-            print(e, file=sys.stderr)
-    elif filename.endswith(".jir"):
-        try:
-            with open(filename, "rb") as f:
-                JacMachine(base).attach_program(
-                    JacProgram(mod_bundle=pickle.load(f), bytecode=None, sem_ir=None)
-                )
+    with using_compile_jobs(jobs):
+        if filename.endswith(".jac"):
+            try:
                 jac_import(
                     target=mod,
                     base_path=base,
                     cachable=cache,
                     override_name="__main__" if main else None,
                 )
-        except Exception as e:
-            print(e, file=sys.stderr)
+            except Exception as e:
+                print(e, file=sys.stderr)
+        elif filename.endswith(".jir"):
+            try:
+                with open(filename, "rb") as f:
+                    JacMachine(base).attach_program(
+                        JacProgram(
+                            mod_bundle=pickle.load(f), bytecode=None, sem_ir=None
+                        )
+                    )
+                    jac_import(
+                        target=mod,
+                        base_path=base,
+                        cachable=cache,
+                        override_name="__main__" if main else None,
+                    )
+            except Exception as e:
+                print(e, file=sys.stderr)
 
-    else:
-        jctx.close()
-        JacMachine.detach()
-        raise ValueError("Not a valid file!\nOnly supports `.jac` and `.jir`")
+        else:
+            jctx.close()
+            JacMachine.detach()
+            raise ValueError("Not a valid file!\nOnly supports `.jac` and `.jir`")
 
     jctx.close()
     JacMachine.detach()
@@ -184,10 +198,15 @@ def get_object(
 
 
 @cmd_registry.register
-def build(filename: str) -> None:
-    """Build the specified .jac file."""
+def build(filename: str, jobs: int = -1) -> None:
+    """Build the specified .jac file.
+
+    :param jobs: Processes compiling the imported modules, 0 for one per CPU,
+        -1 for the compile_jobs setting.
+    """
     if filename.endswith(".jac"):
-        out = jac_file_to_pass(file_path=filename, schedule=py_code_gen_typed)
+        with using_compile_jobs(jobs):
+            out = jac_file_to_pass(file_path=filename, schedule=py_code_gen_typed)
         errs = len(out.errors_had)
         warnings = len(out.warnings_had)
         print(f"Errors: {errs}, Warnings: {warnings}")
@@ -246,7 +265,7 @@ def enter(
     :param filename: The path to the .jac file.
     :param entrypoint: The name of the entrypoint function.
     :param args: Arguments to pass to the entrypoint function.
-    :param session: shelve.Shelf file path.
+    :param session: shelve.Shelf file path, or `sqlite://<path>` for SQLite.
     :param root: root executor.
     :param node: starting node.
     """
@@ -306,6 +325,21 @@ def enter(
     JacMachine.detach()
 
 
+@cmd_registry.register
+def migrate_session(source: str, target: str) -> None:
+    """Copy a shelve session into a SQLite session.
+
+    :param source: shelve.Shelf file path.
+    :param target: SQLite database path, used as `--session sqlite://<target>`.
+    """
+    from jaclang.runtimelib.memory import SQLITE_SCHEME, migrate_shelf
+
+    if target.startswith(SQLITE_SCHEME):
+        target = target[len(SQLITE_SCHEME) :]
+    count = migrate_shelf(source, target)
+    print(f"Migrated {count} anchors to {SQLITE_SCHEME}{target}", file=sys.stderr)
+
+
 @cmd_registry.register
 def test(
     filepath: str,
@@ -478,6 +512,49 @@ def dot(
     jctx.close()
 
 
+@cmd_registry.register
+def gins_report(
+    filename: str,
+    profile: str = "",
+    json: bool = False,
+    top: int = 10,
+    snapshot: int = -1,
+) -> None:
+    """Report hot lines, loop trip counts and untaken branches from a GINS profile.
+
+    :param filename: The path to the profiled .jac file.
+    :param profile: The profile written by `jac run --gins` (default gins_profile).
+    :param json: Print the report as JSON instead of text.
+    :param top: Number of hottest lines to list.
+    :param snapshot: Report the counters at this snapshot (default the last one).
+    """
+    from jaclang.runtimelib.gins.profile import ProfileReader
+    from jaclang.runtimelib.gins.report import (
+        build_report,
+        report_to_json,
+        report_to_text,
+    )
+
+    if not filename.endswith(".jac"):
+        print("Not a .jac file.", file=sys.stderr)
+        return
+    profile = profile or settings.gins_profile
+    if not os.path.exists(profile):
+        print(f"Profile {profile} does not exist.", file=sys.stderr)
+        return
+    out = jac_file_to_pass(file_path=filename)
+    if out.errors_had or not out.ir.gen.py_bytecode:
+        print(f"Errors occurred while compiling {filename}.", file=sys.stderr)
+        return
+    report = build_report(
+        ProfileReader(profile),
+        marshal.loads(out.ir.gen.py_bytecode),
+        top=top,
+        snapshot=None if snapshot == -1 else snapshot,
+    )
+    print(report_to_json(report) if json else report_to_text(report))
+
+
 @cmd_registry.register
 def py2jac(filename: str) -> None:
     """Convert a Python file to Jac.
@@ -0,0 +1,203 @@
+"""Bytecode cache manifest.
+
+Each __jac_gen__ directory holds a manifest.json recording, for every module
+compiled into it, the files its bytecode depends on (the module, its .impl.jac
+and .test.jac annexes and its transitive Jac imports) with their content
+hashes. A cache entry is only used if its key, the hash of those files and of
+the compiler fingerprint, is unchanged. Files are only read again when their
+size or mtime changed since they were hashed, so warm starts only stat them
+and list the directories annexes are found in: the annexes of every module are
+recorded too, so one created after the build invalidates the entry.
+A process reads each manifest once, through BytecodeCache.of.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.metadata
+import json
+import os
+import pickle
+import sys
+from functools import lru_cache
+from importlib.util import MAGIC_NUMBER
+from typing import Any, Iterable, Optional
+
+from jaclang.compiler.constant import Constants as Con
+from jaclang.compiler.semtable import SemRegistry
+
+MANIFEST = "manifest.json"
+
+
+@lru_cache(maxsize=1)
+def compiler_fingerprint() -> str:
+    """Identify the compiler and Python version that produce the bytecode."""
+    try:
+        version = importlib.metadata.version("jaclang")
+    except importlib.metadata.PackageNotFoundError:
+        version = "dev"
+    digest = hashlib.sha256(
+        f"{version}:{sys.implementation.cache_tag}:{MAGIC_NUMBER.hex()}".encode()
+    )
+    # a development checkout changes without a version bump
+    compiler_dir = os.path.dirname(__file__)
+    for root, dirs, files in os.walk(compiler_dir):
+        dirs[:] = sorted(d for d in dirs if d not in ("tests", "__pycache__"))
+        for file in sorted(files):
+            if file.endswith(".py"):
+                stat = os.stat(os.path.join(root, file))
+                rel_path = os.path.relpath(os.path.join(root, file), compiler_dir)
+                digest.update(f"{rel_path}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    return digest.hexdigest()
+
+
+def gen_dir_of(mod_path: str) -> str:
+    """Return the cache directory of a module."""
+    return os.path.join(os.path.dirname(mod_path), Con.JAC_GEN_DIR)
+
+
+class BytecodeCache:
+    """Manifest of the modules cached in a __jac_gen__ directory."""
+
+    def __init__(self, gen_dir: str) -> None:
+        """Load the manifest of `gen_dir`, if any."""
+        self.gen_dir = gen_dir
+        self.path = os.path.join(gen_dir, MANIFEST)
+        self.entries: dict[str, dict[str, Any]] = self.read()
+        self.changed: set[str] = set()
+
+    @classmethod
+    def of(cls, gen_dir: str) -> BytecodeCache:
+        """Return the manifest of `gen_dir` shared by this process."""
+        cache = _CACHES.get(gen_dir)
+        if cache is None:
+            cache = _CACHES[gen_dir] = cls(gen_dir)
+        return cache
+
+    def read(self) -> dict[str, dict[str, Any]]:
+        """Read the manifest file, an unreadable one is empty."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("fingerprint") != (
+            compiler_fingerprint()
+        ):
+            return {}
+        return data.get("modules", {})
+
+    @staticmethod
+    def file_hash(path: str, record: Optional[list] = None) -> Optional[list]:
+        """Return [mtime_ns, size, sha256] of a file, reusing `record` if current."""
+        try:
+            stat = os.stat(path)
+            if record and record[0] == stat.st_mtime_ns and record[1] == stat.st_size:
+                return record
+            with open(path, "rb") as f:
+                sha = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size, sha]
+
+    @staticmethod
+    def make_key(files: dict[str, list]) -> str:
+        """Hash the compiler fingerprint and the content of the files."""
+        digest = hashlib.sha256(compiler_fingerprint().encode())
+        for path in sorted(files):
+            digest.update(f"{path}:{files[path][2]}".encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def annexes_of(files: Iterable[str]) -> dict[str, list[str]]:
+        """Return the .impl.jac and .test.jac annexes of the modules in `files`."""
+        from jaclang.compiler.parallel import annex_files
+
+        return {
+            path: sorted(annex_files(path))
+            for path in files
+            if not path.endswith((".impl.jac", ".test.jac"))
+        }
+
+    def lookup(self, mod_path: str) -> Optional[dict[str, Any]]:
+        """Return the entry of a module if its bytecode is current."""
+        entry = self.entries.get(mod_path)
+        if not entry or "annexes" not in entry:
+            return None
+        files = {}
+        for path, record in entry["files"].items():
+            if (current := self.file_hash(path, record)) is None:
+                return None
+            files[path] = current
+        if self.make_key(files) != entry["key"]:
+            return None
+        try:
+            if self.annexes_of(entry["annexes"]) != entry["annexes"]:
+                return None
+        except OSError:
+            return None
+        if files != entry["files"]:
+            # touched but unchanged, skip rehashing them next time
+            entry["files"] = files
+            self.changed.add(mod_path)
+        return entry
+
+    def store(
+        self,
+        mod_path: str,
+        deps: list[str],
+        bytecode_path: str,
+        registry_path: Optional[str],
+    ) -> None:
+        """Record the bytecode of a module and the files it was built from."""
+        files = {
+            path: record
+            for path in dict.fromkeys([mod_path, *deps])
+            if (record := self.file_hash(path)) is not None
+        }
+        self.entries[mod_path] = {
+            "key": self.make_key(files),
+            "files": files,
+            "annexes": self.annexes_of(files),
+            "bytecode": os.path.relpath(bytecode_path, self.gen_dir),
+            "registry": (
+                os.path.relpath(registry_path, self.gen_dir) if registry_path else None
+            ),
+        }
+        self.changed.add(mod_path)
+
+    def save(self) -> None:
+        """Write the changed entries, keeping those written by other processes."""
+        if not self.changed:
+            return
+        entries = self.read()
+        entries.update({path: self.entries[path] for path in self.changed})
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(
+                    {"fingerprint": compiler_fingerprint(), "modules": entries}, f
+                )
+            os.replace(tmp_path, self.path)
+        except OSError:
+            return
+        self.changed.clear()
+
+    def load(self, mod_path: str) -> Optional[tuple[bytes, Optional[SemRegistry]]]:
+        """Return the bytecode and semantic registry of a module if current."""
+        if (entry := self.lookup(mod_path)) is None:
+            return None
+        try:
+            with open(os.path.join(self.gen_dir, entry["bytecode"]), "rb") as f:
+                bytecode = f.read()
+            registry = None
+            if entry["registry"]:
+                with open(os.path.join(self.gen_dir, entry["registry"]), "rb") as f:
+                    registry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        self.save()
+        return bytecode, registry
+
+
+_CACHES: dict[str, BytecodeCache] = {}
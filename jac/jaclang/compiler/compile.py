@@ -5,11 +5,19 @@ from typing import Optional, Type
 import jaclang.compiler.absyntree as ast
 from jaclang.compiler.parser import JacParser
 from jaclang.compiler.passes import Pass
+from jaclang.compiler.passes.fused_pass import run_schedule
 from jaclang.compiler.passes.main import PyOutPass, pass_schedule
 from jaclang.compiler.passes.tool import JacFormatPass
 from jaclang.compiler.passes.tool.schedules import format_pass
 
 
+def passes_before(
+    schedule: list[Type[Pass]], target: Optional[Type[Pass]]
+) -> list[Type[Pass]]:
+    """Return the passes of the schedule that run before the target."""
+    return schedule[: schedule.index(target)] if target in schedule else schedule
+
+
 def compile_jac(file_path: str, cache_result: bool = False) -> Pass:
     """Start Compile for Jac file and return python code as string."""
     code = jac_file_to_pass(
@@ -56,10 +64,7 @@ def jac_str_to_pass(
     if len(ast_ret.errors_had) != 0:
         return ast_ret
 
-    for i in schedule:
-        if i == target:
-            break
-        ast_ret = i(input_ir=ast_ret.ir, prior=ast_ret)
+    ast_ret = run_schedule(ast_ret, passes_before(schedule, target))
     ast_ret = target(input_ir=ast_ret.ir, prior=ast_ret) if target else ast_ret
     return ast_ret
 
@@ -77,10 +82,7 @@ def jac_ir_to_pass(
         if not len(schedule)
         else schedule[0](input_ir=ir, prior=None)
     )
-    for i in schedule[1:]:
-        if i == target:
-            break
-        ast_ret = i(input_ir=ast_ret.ir, prior=ast_ret)
+    ast_ret = run_schedule(ast_ret, passes_before(schedule[1:], target))
     ast_ret = target(input_ir=ast_ret.ir, prior=ast_ret) if target else ast_ret
     return ast_ret
 
@@ -94,10 +96,7 @@ def jac_pass_to_pass(
     if not target:
         target = schedule[-1] if schedule else None
     ast_ret = in_pass
-    for i in schedule:
-        if i == target:
-            break
-        ast_ret = i(input_ir=ast_ret.ir, prior=ast_ret)
+    ast_ret = run_schedule(ast_ret, passes_before(schedule, target))
     ast_ret = target(input_ir=ast_ret.ir, prior=ast_ret) if target else ast_ret
     return ast_ret
 
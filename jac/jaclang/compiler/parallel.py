@@ -0,0 +1,201 @@
+"""Parallel compilation of independent Jac modules.
+
+The import graph of a module is discovered from the parsed modules
+themselves: every newly found Jac file is parsed (up to the sub node table)
+in a pool of processes as soon as it is known, and the parsed modules are
+sent back to be attached by the import pass, which runs unchanged. Python
+ASTs of the lowered modules are compiled to bytecode by forked workers.
+"""
+
+from __future__ import annotations
+
+import ast as py_ast
+import marshal
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import jaclang.compiler.absyntree as ast
+from jaclang.compiler.passes import Pass
+from jaclang.compiler.passes.transform import Alert
+from jaclang.settings import settings
+from jaclang.utils.log import logging
+
+logger = logging.getLogger(__name__)
+
+ParsedModule = tuple[Optional[ast.AstNode], list[Alert], list[Alert]]
+
+
+def compile_jobs(jobs: Optional[int] = None) -> int:
+    """Return the number of compile processes, 0 meaning one per CPU."""
+    jobs = settings.compile_jobs if jobs is None else jobs
+    return jobs if jobs > 0 else os.cpu_count() or 1
+
+
+@contextmanager
+def using_compile_jobs(jobs: int) -> Iterator[None]:
+    """Compile over `jobs` processes within the block, negative for the setting."""
+    previous = settings.compile_jobs
+    if jobs >= 0:
+        settings.compile_jobs = jobs
+    try:
+        yield
+    finally:
+        settings.compile_jobs = previous
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    """Create a pool of compile processes."""
+    # forked workers start with the compiler already imported
+    methods = multiprocessing.get_all_start_methods()
+    mp_context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    return ProcessPoolExecutor(workers, mp_context=mp_context)
+
+
+def parse_jac_file(target: str) -> ParsedModule:
+    """Parse a Jac file up to its sub node table."""
+    from jaclang.compiler.compile import jac_file_to_pass
+    from jaclang.compiler.passes.main import SubNodeTabPass
+
+    mod_pass = jac_file_to_pass(file_path=target, target=SubNodeTabPass)
+    return mod_pass.ir, mod_pass.errors_had, mod_pass.warnings_had
+
+
+def annex_files(mod_path: str) -> list[str]:
+    """Return the .impl.jac and .test.jac annexes of a module, if any."""
+    if not mod_path.endswith(".jac"):
+        return []
+    base_path = mod_path[:-4]
+    directory = os.path.dirname(mod_path)
+    if not directory:
+        directory = os.getcwd()
+        base_path = os.path.join(directory, base_path)
+    impl_folder = base_path + ".impl"
+    test_folder = base_path + ".test"
+    search_files = [
+        os.path.join(directory, impl_file) for impl_file in os.listdir(directory)
+    ]
+    if os.path.exists(impl_folder):
+        search_files += [
+            os.path.join(impl_folder, impl_file)
+            for impl_file in os.listdir(impl_folder)
+        ]
+    if os.path.exists(test_folder):
+        search_files += [
+            os.path.join(test_folder, test_file)
+            for test_file in os.listdir(test_folder)
+        ]
+    annexes = []
+    for cur_file in search_files:
+        if mod_path.endswith(cur_file):
+            continue
+        if (
+            cur_file.startswith(f"{base_path}.")
+            or impl_folder == os.path.dirname(cur_file)
+        ) and cur_file.endswith(".impl.jac"):
+            annexes.append(cur_file)
+        if (
+            cur_file.startswith(f"{base_path}.")
+            or test_folder == os.path.dirname(cur_file)
+        ) and cur_file.endswith(".test.jac"):
+            annexes.append(cur_file)
+    return annexes
+
+
+def jac_import_targets(mod: ast.Module) -> list[str]:
+    """Return the Jac files a parsed module imports or annexes."""
+    targets = [] if mod.stub_only else annex_files(mod.loc.mod_path)
+    for path in Pass.get_all_sub_nodes(mod, ast.ModulePath):
+        imp_node = path.parent_of_type(ast.Import)
+        if not imp_node.is_jac or path.sub_module:
+            continue
+        target = path.resolve_relative_path()
+        if not os.path.isdir(target):
+            targets.append(target)
+            continue
+        targets.append(os.path.join(target, "__init__.jac"))
+        if path == imp_node.from_loc:
+            for item in imp_node.items.items:
+                if isinstance(item, ast.ModuleItem):
+                    item_target = path.resolve_relative_path(item.name.value)
+                    targets.append(
+                        os.path.join(item_target, "__init__.jac")
+                        if os.path.isdir(item_target)
+                        else item_target
+                    )
+    return [target for target in targets if os.path.isfile(target)]
+
+
+def parse_jac_modules(
+    node: ast.Module, jobs: int, known: Optional[set[str]] = None
+) -> dict[str, ParsedModule]:
+    """Parse the Jac modules `node` transitively depends on over `jobs` processes.
+
+    Files in `known` are not parsed. A file that fails to parse in a worker
+    is left out, the import pass parses it again to report the failure.
+    """
+    seen = set(known or ()) | {node.loc.mod_path}
+    parsed: dict[str, ParsedModule] = {}
+    targets = jac_import_targets(node)
+    if seen.issuperset(targets):
+        return parsed
+    pending: dict[Future, str] = {}
+    with process_pool(jobs) as pool:
+        while targets or pending:
+            for target in targets:
+                if target not in seen:
+                    seen.add(target)
+                    pending[pool.submit(parse_jac_file, target)] = target
+            targets = []
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                target = pending.pop(future)
+                if future.exception() is not None:
+                    logger.info(future.exception())
+                    continue
+                parsed[target] = future.result()
+                if isinstance(mod := parsed[target][0], ast.Module):
+                    targets += jac_import_targets(mod)
+    return parsed
+
+
+def compile_py_module(py_ast_mod: py_ast.Module, mod_path: str) -> bytes:
+    """Compile the Python AST of a module to marshalled bytecode."""
+    return marshal.dumps(compile(source=py_ast_mod, filename=mod_path, mode="exec"))
+
+
+# Python ASTs being compiled, inherited by the forked workers
+_py_asts: list[tuple[py_ast.Module, str]] = []
+
+
+def _compile_inherited(idx: int) -> bytes:
+    return compile_py_module(*_py_asts[idx])
+
+
+def compile_py_modules(mods: list[tuple[py_ast.Module, str]], jobs: int) -> list[bytes]:
+    """Compile the Python ASTs of several modules over `jobs` processes.
+
+    The ASTs link back to the Jac AST and cost more to pickle than to compile,
+    so they are not sent: workers are forked once they are set and compile
+    their own copy. Without fork, the modules are compiled serially.
+    """
+    global _py_asts
+    jobs = min(jobs, len(mods))
+    if jobs <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return [compile_py_module(*mod) for mod in mods]
+    _py_asts = mods
+    try:
+        with ProcessPoolExecutor(
+            jobs, mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            return list(
+                pool.map(
+                    _compile_inherited,
+                    range(len(mods)),
+                    chunksize=max(1, len(mods) // (jobs * 4)),
+                )
+            )
+    finally:
+        _py_asts = []
@@ -0,0 +1,101 @@
+"""Fused passes for Jac IR.
+
+Runs of fusible passes in a schedule are run over a single traversal of the
+tree. On every node, the enter and exit hooks of the fused passes are called
+in schedule order. Setting fuse_passes to False runs every pass on its own,
+as a debug mode.
+"""
+
+from typing import Optional, Sequence, Type
+
+import jaclang.compiler.absyntree as ast
+from jaclang.compiler.passes.ir_pass import Pass
+from jaclang.compiler.passes.transform import Transform
+from jaclang.settings import settings
+
+
+class FusedPass(Pass):
+    """Run several passes in a single traversal."""
+
+    def __init__(
+        self,
+        input_ir: ast.AstNode,
+        prior: Optional[Transform],
+        passes: Sequence[Type[Pass]],
+    ) -> None:
+        """Initialize fused pass."""
+        self.passes = list(passes)
+        self.fused: list[Pass] = []
+        Pass.__init__(self, input_ir=input_ir, prior=prior)
+
+    def before_pass(self) -> None:
+        """Set up the fused passes."""
+        for pass_cls in self.passes:
+            fused = pass_cls.__new__(pass_cls)
+            fused.setup(self.ir, prior=self)
+            fused.before_pass()
+            self.fused.append(fused)
+
+    def after_pass(self) -> None:
+        """Finish the fused passes."""
+        for fused in self.fused:
+            fused.after_pass()
+
+    def traverse(self, node: ast.AstNode) -> ast.AstNode:
+        """Traverse tree once for all fused passes."""
+        self.visit(node, self.fused)
+        return node
+
+    def visit(self, node: ast.AstNode, passes: list[Pass]) -> None:
+        """Run the hooks of passes on the subtree of node.
+
+        Terminating or pruning only stops the pass that asked for it.
+        """
+        passes = [i for i in passes if not i.term_signal]
+        for i in passes:
+            i.cur_node = node
+            i.enter_node(node)
+        descending = []
+        for i in passes:
+            if i.prune_signal:
+                i.prune_signal = False
+            elif not i.term_signal:
+                descending.append(i)
+        for kid in node.kid if descending else []:
+            if kid and (visitors := [i for i in descending if not i.skips(kid)]):
+                self.visit(kid, visitors)
+        for i in passes:
+            if not i.term_signal:
+                i.cur_node = node
+                i.exit_node(node)
+
+
+def is_fusible(pass_cls: Type[Pass]) -> bool:
+    """Check if a pass can share a traversal with its neighbours."""
+    return pass_cls.fusible and pass_cls.traverse is Pass.traverse
+
+
+def fuse_schedule(schedule: Sequence[Type[Pass]]) -> list[list[Type[Pass]]]:
+    """Group the runs of fusible passes in a schedule."""
+    groups: list[list[Type[Pass]]] = []
+    for pass_cls in schedule:
+        if (
+            settings.fuse_passes
+            and groups
+            and is_fusible(groups[-1][-1])
+            and is_fusible(pass_cls)
+        ):
+            groups[-1].append(pass_cls)
+        else:
+            groups.append([pass_cls])
+    return groups
+
+
+def run_schedule(prior: Pass, schedule: Sequence[Type[Pass]]) -> Pass:
+    """Run a schedule of passes after prior, fusing the fusible ones."""
+    for group in fuse_schedule(schedule):
+        if len(group) == 1:
+            prior = group[0](input_ir=prior.ir, prior=prior)
+        else:
+            prior = FusedPass(input_ir=prior.ir, prior=prior, passes=group)
+    return prior
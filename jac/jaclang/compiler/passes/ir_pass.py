@@ -1,7 +1,7 @@
 """Abstract class for IR Passes for Jac."""
 
 import time
-from typing import Optional, Type, TypeVar
+from typing import Callable, Optional, Type, TypeVar
 
 import jaclang.compiler.absyntree as ast
 from jaclang.compiler.passes.transform import Transform
@@ -10,17 +10,95 @@ from jaclang.utils.helpers import pascal_to_snake
 
 T = TypeVar("T", bound=ast.AstNode)
 
+Handler = Callable[["Pass", ast.AstNode], None]
+
+
+# handler name suffix of each node type, enter_<suffix> and exit_<suffix>
+_suffixes: dict[type, str] = {}
+
+
+def _node_types() -> list[type[ast.AstNode]]:
+    """Return every AST node type."""
+    types = []
+    stack: list[type[ast.AstNode]] = [ast.AstNode]
+    while stack:
+        typ = stack.pop()
+        types.append(typ)
+        stack.extend(typ.__subclasses__())
+    return types
+
+
+class DispatchTable(dict[type, Optional[Handler]]):
+    """Node type to enter_*/exit_* handler of a pass class, None if it has none."""
+
+    def __init__(self, pass_cls: type, prefix: str) -> None:
+        """Look up the handlers of `pass_cls` for all the node types."""
+        super().__init__()
+        self.pass_cls = pass_cls
+        self.prefix = prefix
+        for typ in _node_types():
+            self[typ]  # noqa: B018
+
+    def __missing__(self, typ: type) -> Optional[Handler]:
+        """Resolve and cache the handler of a node type seen for the first time."""
+        if typ not in _suffixes:
+            _suffixes[typ] = pascal_to_snake(typ.__name__)
+        handler = getattr(self.pass_cls, self.prefix + _suffixes[typ], None)
+        self[typ] = handler
+        return handler
+
 
 class Pass(Transform[T]):
-    """Abstract class for IR passes."""
+    """Abstract class for IR passes.
+
+    Handlers are looked up once per pass class, in dispatch tables built when
+    the class is created. Passes that do not override the traversal skip the
+    subtrees holding no node type they handle, as told by the sub node table.
+
+    A pass is fusible when its hooks on a node only need the work the passes
+    before it did on entering that node or the nodes visited earlier, and it
+    leaves no work that passes after it need finished for a whole subtree.
+    Runs of fusible passes in a schedule share a single traversal.
+    """
+
+    fusible: bool = False
+    enter_table: DispatchTable
+    exit_table: DispatchTable
+    handled_types: frozenset[type]
+    skips_subtrees: bool
+
+    def __init_subclass__(cls, **kwargs: object) -> None:
+        """Build the dispatch tables of a pass."""
+        super().__init_subclass__(**kwargs)
+        cls.build_dispatch_tables()
+
+    @classmethod
+    def build_dispatch_tables(cls) -> None:
+        """Map node types to the handlers of the pass."""
+        cls.enter_table = DispatchTable(cls, "enter_")
+        cls.exit_table = DispatchTable(cls, "exit_")
+        cls.handled_types = frozenset(
+            typ
+            for typ in cls.enter_table
+            if cls.enter_table[typ] or cls.exit_table[typ]
+        )
+        cls.skips_subtrees = (
+            cls.enter_node is Pass.enter_node
+            and cls.exit_node is Pass.exit_node
+            and cls.traverse is Pass.traverse
+        )
 
     def __init__(self, input_ir: T, prior: Optional[Transform]) -> None:
         """Initialize parser."""
+        Transform.__init__(self, input_ir, prior)
+
+    def setup(self, input_ir: T, prior: Optional[Transform] = None) -> None:
+        """Set up the pass without running it."""
         self.term_signal = False
         self.prune_signal = False
         self.ir: ast.AstNode = input_ir
         self.time_taken = 0.0
-        Transform.__init__(self, input_ir, prior)
+        Transform.setup(self, input_ir, prior)
 
     def before_pass(self) -> None:
         """Run once before pass."""
@@ -32,13 +110,27 @@ class Pass(Transform[T]):
 
     def enter_node(self, node: ast.AstNode) -> None:
         """Run on entering node."""
-        if hasattr(self, f"enter_{pascal_to_snake(type(node).__name__)}"):
-            getattr(self, f"enter_{pascal_to_snake(type(node).__name__)}")(node)
+        if handler := self.enter_table[type(node)]:
+            handler(self, node)
 
     def exit_node(self, node: ast.AstNode) -> None:
         """Run on exiting node."""
-        if hasattr(self, f"exit_{pascal_to_snake(type(node).__name__)}"):
-            getattr(self, f"exit_{pascal_to_snake(type(node).__name__)}")(node)
+        if handler := self.exit_table[type(node)]:
+            handler(self, node)
+
+    def skips(self, node: ast.AstNode) -> bool:
+        """Check if no node the pass handles is found in the subtree of `node`."""
+        return (
+            self.skips_subtrees
+            and type(node) not in self.handled_types
+            and (
+                not node.kid
+                or (
+                    bool(node._sub_node_tab)
+                    and self.handled_types.isdisjoint(node._sub_node_tab)
+                )
+            )
+        )
 
     def terminate(self) -> None:
         """Terminate traversal."""
@@ -128,7 +220,7 @@ class Pass(Transform[T]):
         self.enter_node(node)
         if not self.prune_signal:
             for i in node.kid:
-                if i:
+                if i and not self.skips(i):
                     self.traverse(i)
         else:
             self.prune_signal = False
@@ -154,6 +246,9 @@ class Pass(Transform[T]):
         )
 
 
+Pass.build_dispatch_tables()
+
+
 class PrinterPass(Pass):
     """Printer Pass for Jac AST."""
 
@@ -15,6 +15,8 @@ from jaclang.settings import settings
 class AccessCheckPass(Pass):
     """Jac Ast Access Check pass."""
 
+    fusible = True
+
     # NOTE: This method is a hacky way to detect if the drivied class is inherit from base class, it
     # doesn't work if the base class was provided as an expression (ex. obj Dri :module.Base: {...}).
     def is_class_inherited_from(
@@ -3,15 +3,17 @@
 This pass generates a control flow graph from the bytecode generated by the previous pass.
 """
 
-import ast
+import marshal
 
 import jaclang.compiler.absyntree as ast
 from jaclang.compiler.passes import Pass
-from jaclang.runtimelib.gins.cfg import visualize_cfg, disassemble_bytecode, create_BBs, create_cfg
+from jaclang.runtimelib.gins.cfg import create_code_cfgs
 
 class CfgGenPass(Pass):
     """Control flow graph generation pass."""
 
+    fusible = True
+
     def before_pass(self) -> None:
         """Before pass."""
         return super().before_pass()
@@ -32,11 +34,11 @@ class CfgGenPass(Pass):
             mods = [node] + self.get_all_sub_nodes(node, ast.Module)
             module_cfgs = {}
             for mod in mods:
-                bytecode = mod.gen.py_bytecode
-                instructions = disassemble_bytecode(bytecode)
-                BBs = create_BBs(instructions)
-                cfg = create_cfg(BBs)
-                module_cfgs[mod.name] = cfg
+                if not mod.gen.py_bytecode:
+                    continue
+                # one CFG per code object: module body, abilities, functions...
+                code_object = marshal.loads(mod.gen.py_bytecode)
+                module_cfgs.update(create_code_cfgs(code_object))
                 # for cfg in module_cfgs.values():
                 #     dot = visualize_cfg(cfg)
                 #     dot.render(f'cfg_{mod.name}.gv', view=True)
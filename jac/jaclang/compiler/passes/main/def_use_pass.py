@@ -16,6 +16,8 @@ from jaclang.compiler.passes import Pass
 class DefUsePass(Pass):
     """Jac Ast build pass."""
 
+    fusible = True
+
     def after_pass(self) -> None:
         """After pass."""
 
@@ -12,8 +12,16 @@ from typing import Optional
 
 
 import jaclang.compiler.absyntree as ast
+from jaclang.compiler.parallel import (
+    ParsedModule,
+    annex_files,
+    compile_jobs,
+    parse_jac_file,
+    parse_jac_modules,
+)
 from jaclang.compiler.passes import Pass
 from jaclang.compiler.passes.main import SubNodeTabPass, SymTabBuildPass
+from jaclang.compiler.py_raise_cache import py_raise_cache
 from jaclang.settings import settings
 from jaclang.utils.log import logging
 
@@ -27,11 +35,13 @@ class JacImportPass(Pass):
     def before_pass(self) -> None:
         """Run once before pass."""
         self.import_table: dict[str, ast.Module] = {}
+        self.parsed: dict[str, ParsedModule] = {}
 
     def enter_module(self, node: ast.Module) -> None:
         """Run Importer."""
         self.cur_node = node
         self.import_table[node.loc.mod_path] = node
+        self.parse_in_parallel(node)
         self.annex_impl(node)
         self.terminate()  # Turns off auto traversal for deliberate traversal
         self.run_again = True
@@ -45,6 +55,12 @@ class JacImportPass(Pass):
 
         node.mod_deps.update(self.import_table)
 
+    def parse_in_parallel(self, node: ast.Module) -> None:
+        """Parse the Jac modules of the import graph ahead over a process pool."""
+        jobs = compile_jobs()
+        if jobs > 1:
+            self.parsed = parse_jac_modules(node, jobs, known=set(self.import_table))
+
     def process_import(self, i: ast.ModulePath) -> None:
         """Process an import."""
         imp_node = i.parent_of_type(ast.Import)
@@ -68,44 +84,14 @@ class JacImportPass(Pass):
             return
         if not node.loc.mod_path:
             self.error("Module has no path")
-        if not node.loc.mod_path.endswith(".jac"):
-            return
-        base_path = node.loc.mod_path[:-4]
-        directory = os.path.dirname(node.loc.mod_path)
-        if not directory:
-            directory = os.getcwd()
-            base_path = os.path.join(directory, base_path)
-        impl_folder = base_path + ".impl"
-        test_folder = base_path + ".test"
-        search_files = [
-            os.path.join(directory, impl_file) for impl_file in os.listdir(directory)
-        ]
-        if os.path.exists(impl_folder):
-            search_files += [
-                os.path.join(impl_folder, impl_file)
-                for impl_file in os.listdir(impl_folder)
-            ]
-        if os.path.exists(test_folder):
-            search_files += [
-                os.path.join(test_folder, test_file)
-                for test_file in os.listdir(test_folder)
-            ]
-        for cur_file in search_files:
-            if node.loc.mod_path.endswith(cur_file):
-                continue
-            if (
-                cur_file.startswith(f"{base_path}.")
-                or impl_folder == os.path.dirname(cur_file)
-            ) and cur_file.endswith(".impl.jac"):
+        for cur_file in annex_files(node.loc.mod_path):
+            if cur_file.endswith(".impl.jac"):
                 mod = self.import_jac_mod_from_file(cur_file)
                 if mod:
                     node.impl_mod.append(mod)
                     node.add_kids_left([mod], pos_update=False)
                     mod.parent = node
-            if (
-                cur_file.startswith(f"{base_path}.")
-                or test_folder == os.path.dirname(cur_file)
-            ) and cur_file.endswith(".test.jac"):
+            else:
                 mod = self.import_jac_mod_from_file(cur_file)
                 if mod and not settings.ignore_test_annex:
                     node.test_mod.append(mod)
@@ -169,19 +155,18 @@ class JacImportPass(Pass):
 
     def import_jac_mod_from_file(self, target: str) -> ast.Module | None:
         """Import a module from a file."""
-        from jaclang.compiler.compile import jac_file_to_pass
-        from jaclang.compiler.passes.main import SubNodeTabPass
-
         if not os.path.exists(target):
             self.error(f"Could not find module {target}")
             return None
         if target in self.import_table:
             return self.import_table[target]
         try:
-            mod_pass = jac_file_to_pass(file_path=target, target=SubNodeTabPass)
-            self.errors_had += mod_pass.errors_had
-            self.warnings_had += mod_pass.warnings_had
-            mod = mod_pass.ir
+            if target in self.parsed:
+                mod, errors, warnings = self.parsed.pop(target)
+            else:
+                mod, errors, warnings = parse_jac_file(target)
+            self.errors_had += errors
+            self.warnings_had += warnings
         except Exception as e:
             logger.info(e)
             mod = None
@@ -203,6 +188,9 @@ class PyImportPass(JacImportPass):
         super().before_pass()
         self.__load_builtins()
 
+    def parse_in_parallel(self, node: ast.Module) -> None:
+        """Jac modules are already imported by the JacImportPass."""
+
     def __get_current_module(self, node: ast.AstNode) -> str:
         parent = node.find_parent_of_type(ast.Module)
         mod_list = []
@@ -253,8 +241,6 @@ class PyImportPass(JacImportPass):
         mod_path: str,
     ) -> Optional[ast.Module]:
         """Import a module."""
-        from jaclang.compiler.passes.main import PyastBuildPass
-
         assert isinstance(self.ir, ast.Module)
 
         python_raise_map = self.ir.py_raise_map
@@ -278,20 +264,11 @@ class PyImportPass(JacImportPass):
                 if file_to_raise in self.import_table:
                     return self.import_table[file_to_raise]
 
-                with open(file_to_raise, "r", encoding="utf-8") as f:
-                    file_source = f.read()
-                    mod = PyastBuildPass(
-                        input_ir=ast.PythonModuleAst(
-                            py_ast.parse(file_source),
-                            orig_src=ast.JacSource(file_source, file_to_raise),
-                        ),
-                    ).ir
-                    SubNodeTabPass(input_ir=mod, prior=self)
+                mod = self.raise_py_file(file_to_raise, imported_mod_name)
                 if mod:
-                    mod.name = imported_mod_name
                     self.import_table[file_to_raise] = mod
                     self.attach_mod_to_node(parent_node, mod)
-                    SymTabBuildPass(input_ir=mod, prior=self)
+                    self.link_sym_tab(mod, parent_node)
                     return mod
                 else:
                     raise self.ice(f"Failed to import python module {mod_path}")
@@ -302,8 +279,6 @@ class PyImportPass(JacImportPass):
 
     def __load_builtins(self) -> None:
         """Pyraise builtins to help with builtins auto complete."""
-        from jaclang.compiler.passes.main import PyastBuildPass
-
         assert isinstance(self.ir, ast.Module)
 
         file_to_raise = str(
@@ -314,18 +289,41 @@ class PyImportPass(JacImportPass):
             / "stdlib"
             / "builtins.pyi"
         )
+        mod = self.raise_py_file(file_to_raise, "builtins")
+        if mod:
+            self.link_sym_tab(mod, self.ir)
+
+    def raise_py_file(self, file_to_raise: str, mod_name: str) -> Optional[ast.Module]:
+        """Raise a Python file with its symbol table, reusing the cached one."""
+        from jaclang.compiler.passes.main import PyastBuildPass
+
         with open(file_to_raise, "r", encoding="utf-8") as f:
             file_source = f.read()
+        cache = py_raise_cache()
+        mod = cache.load(file_to_raise, file_source) if cache else None
+        if not mod:
             mod = PyastBuildPass(
                 input_ir=ast.PythonModuleAst(
                     py_ast.parse(file_source),
                     orig_src=ast.JacSource(file_source, file_to_raise),
                 ),
             ).ir
-            mod.parent = self.ir
+            if not isinstance(mod, ast.Module):
+                return None
+            errors = len(self.errors_had)
             SubNodeTabPass(input_ir=mod, prior=self)
             SymTabBuildPass(input_ir=mod, prior=self)
-            mod.parent = None
+            if cache and len(self.errors_had) == errors:
+                cache.store(file_to_raise, file_source, mod)
+        mod.name = mod_name
+        mod.sym_tab.name = mod_name
+        return mod
+
+    @staticmethod
+    def link_sym_tab(mod: ast.Module, parent: ast.AstNode) -> None:
+        """Nest the symbol table of a raised module in the scope of its parent."""
+        mod.sym_tab.parent = parent.sym_tab
+        parent.sym_tab.kid.append(mod.sym_tab)
 
     def annex_impl(self, node: ast.Module) -> None:
         """Annex impl and test modules."""
@@ -3241,7 +3241,14 @@ class PyastGenPass(Pass):
         targ: Optional[ast3.AST],
         edges_only: bool,
     ) -> ast3.AST:
-        """Generate ast for edge op ref call."""
+        """Generate ast for edge op ref call.
+
+        The edge type of a typed reference is passed as `edge_type` so the
+        runtime only looks at edges of that class, the filter function is
+        only generated when there are also field comparisons.
+        """
+        filter_cond = node.filter_cond
+        edge_type = filter_cond.f_type if filter_cond else None
         return self.sync(
             ast3.Call(
                 func=self.sync(
@@ -3290,8 +3297,9 @@ class PyastGenPass(Pass):
                         ast3.keyword(
                             arg="filter_func",
                             value=self.sync(
-                                node.filter_cond.gen.py_ast[0]
-                                if node.filter_cond
+                                filter_cond.gen.py_ast[0]
+                                if filter_cond
+                                and (not edge_type or filter_cond.compares)
                                 else self.sync(ast3.Constant(value=None))
                             ),
                         )
@@ -3302,7 +3310,18 @@ class PyastGenPass(Pass):
                             value=self.sync(ast3.Constant(value=edges_only)),
                         )
                     ),
-                ],
+                ]
+                + (
+                    [
+                        self.sync(
+                            ast3.keyword(
+                                arg="edge_type", value=edge_type.gen.py_ast[0]
+                            )
+                        )
+                    ]
+                    if edge_type
+                    else []
+                ),
             )
         )
 
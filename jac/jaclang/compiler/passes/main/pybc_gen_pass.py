@@ -6,16 +6,18 @@ relevant files.
 """
 
 import ast as ast3
-import marshal
 
 
 import jaclang.compiler.absyntree as ast
+from jaclang.compiler.parallel import compile_jobs, compile_py_modules
 from jaclang.compiler.passes import Pass
 
 
 class PyBytecodeGenPass(Pass):
     """Python and bytecode file printing pass."""
 
+    fusible = True
+
     def before_pass(self) -> None:
         """Before pass."""
         return super().before_pass()
@@ -30,17 +32,18 @@ class PyBytecodeGenPass(Pass):
         is_imported: bool,
         sym_tab: Optional[SymbolTable],
         """
-        mods = [node] + self.get_all_sub_nodes(node, ast.Module)
-        for mod in mods:
+        mods = []
+        for mod in [node] + self.get_all_sub_nodes(node, ast.Module):
             if not mod.gen.py_ast or not isinstance(node.gen.py_ast[0], ast3.Module):
                 self.error(
                     f"Unable to find ast for module {node.loc.mod_path}.",
                     node,
                 )
                 continue
-            mod.gen.py_bytecode = marshal.dumps(
-                compile(
-                    source=mod.gen.py_ast[0], filename=mod.loc.mod_path, mode="exec"
-                )
-            )
+            mods.append(mod)
+        bytecodes = compile_py_modules(
+            [(mod.gen.py_ast[0], mod.loc.mod_path) for mod in mods], compile_jobs()
+        )
+        for mod, bytecode in zip(mods, bytecodes):
+            mod.gen.py_bytecode = bytecode
         self.terminate()
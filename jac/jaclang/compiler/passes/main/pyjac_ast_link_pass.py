@@ -14,6 +14,8 @@ from jaclang.compiler.passes import Pass
 class PyJacAstLinkPass(Pass):
     """Link jac ast to python ast nodes."""
 
+    fusible = True
+
     def link_jac_py_nodes(
         self, jac_node: ast.AstNode, py_nodes: list[ast3.AST]
     ) -> None:
@@ -6,9 +6,11 @@ relevant files.
 """
 
 import os
+import pickle
 
 
 import jaclang.compiler.absyntree as ast
+from jaclang.compiler.bytecode_cache import BytecodeCache
 from jaclang.compiler.constant import Constants as Con
 from jaclang.compiler.passes import Pass
 
@@ -38,19 +40,47 @@ class PyOutPass(Pass):
         mods = [node] + [
             i for i in self.get_all_sub_nodes(node, ast.Module) if not i.stub_only
         ]
+        caches: dict[str, BytecodeCache] = {}
         for mod in mods:
             mod_path, out_path_py, out_path_pyc = self.get_output_targets(mod)
-            if os.path.exists(out_path_pyc) and os.path.getmtime(
-                out_path_pyc
-            ) > os.path.getmtime(mod_path):
+            gen_dir = os.path.dirname(out_path_pyc)
+            if gen_dir not in caches:
+                caches[gen_dir] = BytecodeCache.of(gen_dir)
+            cache = caches[gen_dir]
+            if cache.lookup(mod_path):
                 continue
             try:
                 self.gen_python(mod, out_path=out_path_py)
                 self.dump_bytecode(mod, mod_path=mod_path, out_path=out_path_pyc)
+                out_path_reg = self.dump_registry(mod, out_path_pyc)
+                cache.store(mod_path, self.get_deps(mod), out_path_pyc, out_path_reg)
             except Exception as e:
                 self.warning(f"Error in generating Python code: {e}", node)
+        for cache in caches.values():
+            cache.save()
         self.terminate()
 
+    def get_deps(self, node: ast.Module) -> list[str]:
+        """Get the Jac files the module bytecode is built from.
+
+        Annexes and imported modules are sub nodes of the module, imports of
+        imports included.
+        """
+        return [
+            mod.loc.mod_path
+            for mod in self.get_all_sub_nodes(node, ast.Module)
+            if mod.loc.mod_path.endswith(".jac")
+        ]
+
+    def dump_registry(self, node: ast.Module, out_path_pyc: str) -> str | None:
+        """Save the semantic registry next to the bytecode."""
+        if node.registry is None:
+            return None
+        out_path = out_path_pyc[: -len(".jbc")] + ".registry.pkl"
+        with open(out_path, "wb") as f:
+            pickle.dump(node.registry, f)
+        return out_path
+
     def gen_python(self, node: ast.Module, out_path: str) -> None:
         """Generate Python."""
         with open(out_path, "w") as f:
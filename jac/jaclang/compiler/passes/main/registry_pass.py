@@ -16,6 +16,8 @@ from jaclang.settings import settings
 class RegistryPass(Pass):
     """Creates a registry for each module."""
 
+    fusible = True
+
     modules_visited: list[ast.Module] = []
 
     def enter_module(self, node: ast.Module) -> None:
@@ -0,0 +1,61 @@
+"""Test fused pass module."""
+
+import ast as ast3
+
+from jaclang.compiler.compile import jac_file_to_pass
+from jaclang.compiler.passes.fused_pass import fuse_schedule
+from jaclang.compiler.passes.main.schedules import (
+    CfgGenPass,
+    DefUsePass,
+    PyBytecodeGenPass,
+    PyJacAstLinkPass,
+    RegistryPass,
+    SubNodeTabPass,
+    py_code_gen,
+    py_code_gen_typed,
+)
+from jaclang.settings import settings
+from jaclang.utils.test import TestCase
+
+
+class FusedPassTests(TestCase):
+    """Test pass module."""
+
+    def setUp(self) -> None:
+        """Set up test."""
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        """Tear down test."""
+        settings.fuse_passes = True
+        return super().tearDown()
+
+    def test_fuse_schedule(self) -> None:
+        """Test runs of fusible passes are grouped."""
+        groups = fuse_schedule(py_code_gen)
+        self.assertIn([DefUsePass, RegistryPass], groups)
+        self.assertIn([PyJacAstLinkPass, PyBytecodeGenPass, CfgGenPass], groups)
+        self.assertEqual(groups[0], [SubNodeTabPass])
+        self.assertLess(len(groups), len(py_code_gen))
+        settings.fuse_passes = False
+        self.assertEqual(fuse_schedule(py_code_gen), [[i] for i in py_code_gen])
+
+    def test_fused_matches_serial(self) -> None:
+        """Test the fused schedule gives the same result as the serial one."""
+        results = []
+        for fuse in (True, False):
+            settings.fuse_passes = fuse
+            state = jac_file_to_pass(
+                self.examples_abs_path("manual_code/circle.jac"),
+                schedule=py_code_gen_typed,
+            )
+            results.append(
+                (
+                    [str(i) for i in state.errors_had],
+                    [str(i) for i in state.warnings_had],
+                    ast3.dump(state.ir.gen.py_ast[0]),
+                    state.ir.sym_tab.pp(),
+                )
+            )
+        self.assertEqual(results[0], results[1])
+        self.assertFalse(results[0][0])
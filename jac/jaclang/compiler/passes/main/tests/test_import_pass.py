@@ -1,8 +1,10 @@
 """Test pass module."""
 
 import io
+import os
 import re
 import sys
+import tempfile
 
 import jaclang.compiler.absyntree as ast
 from jaclang.cli import cli
@@ -10,6 +12,8 @@ from jaclang.compiler.compile import jac_file_to_pass
 from jaclang.compiler.passes.main import JacImportPass
 from jaclang.compiler.passes.main.fuse_typeinfo_pass import FuseTypeInfoPass
 from jaclang.compiler.passes.main.schedules import py_code_gen_typed
+from jaclang.compiler.py_raise_cache import PyRaiseCache
+from jaclang.settings import settings
 from jaclang.utils.test import TestCase
 
 
@@ -101,6 +105,59 @@ class ImportPassPassTests(TestCase):
             7,
         )
 
+    def test_py_raise_cache(self) -> None:
+        """Test raised python modules are reused from the cache."""
+        cache_dir = settings.py_raise_cache_dir
+        results = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            settings.py_raise_cache_dir = tmp_dir
+            try:
+                for _ in range(2):
+                    state = jac_file_to_pass(
+                        self.fixture_abs_path("py_imp_test.jac"),
+                        schedule=py_code_gen_typed,
+                    )
+                    raised = [
+                        (i.name, i.sym_tab.parent is not None)
+                        for i in state.ir.get_all_sub_nodes(ast.Module)
+                        if i.is_raised_from_py
+                    ]
+                    errors = [str(i) for i in state.errors_had]
+                    results.append((errors, raised, state.ir.sym_tab.pp()))
+                cached = [files for _, _, files in os.walk(tmp_dir) if files]
+            finally:
+                settings.py_raise_cache_dir = cache_dir
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(len(results[0][1]), 7)
+        self.assertTrue(all(linked for _, linked in results[0][1]))
+        self.assertGreaterEqual(sum(len(i) for i in cached), 8)
+
+    def test_py_raise_cache_bounds(self) -> None:
+        """Test stale entries are misses and old entries are evicted."""
+        mod = ast.Module.__new__(ast.Module)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = PyRaiseCache(tmp_dir)
+            path = cache.path_of(cache.make_key("stale.py", ""))
+            os.makedirs(os.path.dirname(path))
+            with open(path, "wb") as f:
+                f.write(b"\x80\x05cbuiltins\nint\n(Vx\ntR.")
+            self.assertIsNone(cache.load("stale.py", ""))
+            for idx in range(4):
+                path = cache.path_of(cache.make_key(f"{idx}.py", ""))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(b"x" * 100)
+                os.utime(path, (idx, idx))
+            cache.max_size = 250
+            cache.store("new.py", "", mod)
+            kept = [
+                os.path.join(dir_path, name)
+                for dir_path, _, files in os.walk(tmp_dir)
+                for name in files
+            ]
+        self.assertLessEqual(len(kept), 3)
+        self.assertIn(cache.path_of(cache.make_key("new.py", "")), kept)
+
     # def test_py_resolve_list(self) -> None:
     #     """Basic test for pass."""
     #     state: JacImportPass = jac_file_to_pass(
@@ -1,6 +1,8 @@
 """Test sub node pass module."""
 
+import jaclang.compiler.absyntree as ast
 from jaclang.compiler.compile import jac_file_to_pass
+from jaclang.compiler.passes import Pass
 from jaclang.compiler.passes.main import SubNodeTabPass
 from jaclang.utils.test import TestCase
 
@@ -23,3 +25,27 @@ class SubNodePassTests(TestCase):
                 for n in v:
                     self.assertIn(n, code_gen.get_all_sub_nodes(i, k, brute_force=True))
         self.assertFalse(code_gen.errors_had)
+
+    def test_pass_skips_unhandled_subtrees(self) -> None:
+        """Test a pass still reaches its nodes when skipping subtrees."""
+        code_gen = jac_file_to_pass(
+            file_path=self.examples_abs_path("manual_code/circle.jac"),
+            target=SubNodeTabPass,
+        )
+
+        class AbilityCounter(Pass):
+            def before_pass(self) -> None:
+                self.abilities: list[ast.Ability] = []
+
+            def enter_ability(self, node: ast.Ability) -> None:
+                self.abilities.append(node)
+
+        self.assertEqual(AbilityCounter.handled_types, {ast.Ability})
+        self.assertIsNone(AbilityCounter.enter_table[ast.Name])
+        self.assertTrue(AbilityCounter.skips_subtrees)
+        counter = AbilityCounter(input_ir=code_gen.ir, prior=code_gen)
+        self.assertEqual(
+            counter.abilities,
+            code_gen.get_all_sub_nodes(code_gen.ir, ast.Ability, brute_force=True),
+        )
+        self.assertFalse(SubNodeTabPass.skips_subtrees)
@@ -64,11 +64,15 @@ class Transform(ABC, Generic[T]):
         prior: Optional[Transform] = None,
     ) -> None:
         """Initialize pass."""
+        self.setup(input_ir, prior)
+        self.ir = self.transform(ir=input_ir)
+
+    def setup(self, input_ir: T, prior: Optional[Transform] = None) -> None:
+        """Set up the pass without running it."""
         self.logger = logging.getLogger(self.__class__.__name__)
         self.errors_had: list[Alert] = [] if not prior else prior.errors_had
         self.warnings_had: list[Alert] = [] if not prior else prior.warnings_had
         self.cur_node: AstNode = input_ir  # tracks current node during traversal
-        self.ir = self.transform(ir=input_ir)
 
     @abstractmethod
     def transform(self, ir: T) -> AstNode:
@@ -0,0 +1,119 @@
+"""Cache of raised Python modules.
+
+Type checking raises the builtins stub and every imported Python module to a
+Jac AST and builds its symbol table, which takes seconds for large modules.
+The raised modules are pickled with their symbol tables to a cache directory,
+under a key hashing the compiler fingerprint, the file path and the file
+content. An entry is only read when its module is raised again. The cache is
+off unless `py_raise_cache_dir` is set, and the least recently used entries
+are removed once it grows over `py_raise_cache_size` megabytes.
+"""
+
+from __future__ import annotations
+
+import gc
+import hashlib
+import os
+import pickle
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import jaclang.compiler.absyntree as ast
+from jaclang.compiler.bytecode_cache import compiler_fingerprint
+from jaclang.settings import settings
+
+CACHE_VERSION = 1
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """Pause the cyclic garbage collector, it rescans the whole tree otherwise."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class PyRaiseCache:
+    """Raised Python modules stored in a cache directory."""
+
+    def __init__(self, cache_dir: str, max_size: int = 0) -> None:
+        """Use `cache_dir` to store up to `max_size` bytes, 0 for no bound."""
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_size = max_size
+
+    @staticmethod
+    def make_key(file_path: str, source: str) -> str:
+        """Hash the compiler fingerprint, the path and the content of a file."""
+        digest = hashlib.sha256(
+            f"{CACHE_VERSION}:{compiler_fingerprint()}:{file_path}:".encode()
+        )
+        digest.update(source.encode())
+        return digest.hexdigest()
+
+    def path_of(self, key: str) -> str:
+        """Return the cache file of a key."""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pkl")
+
+    def load(self, file_path: str, source: str) -> Optional[ast.Module]:
+        """Return the raised module of a file, if cached."""
+        path = self.path_of(self.make_key(file_path, source))
+        try:
+            with open(path, "rb") as f, gc_paused():
+                mod = pickle.load(f)
+            # entries are evicted by last use, not by creation
+            os.utime(path)
+        except Exception:
+            # missing, partial or stale entries are raised again
+            return None
+        return mod if isinstance(mod, ast.Module) else None
+
+    def store(self, file_path: str, source: str, mod: ast.Module) -> None:
+        """Pickle a raised module that is not attached to an importer yet."""
+        path = self.path_of(self.make_key(file_path, source))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f, gc_paused():
+                pickle.dump(mod, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except (OSError, pickle.PicklingError, RecursionError, TypeError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries over the size bound."""
+        if not self.max_size:
+            return
+        entries = []
+        for dir_path, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(dir_path, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+def py_raise_cache() -> Optional[PyRaiseCache]:
+    """Return the cache of raised modules, None if it is turned off."""
+    if not settings.py_raise_cache_dir:
+        return None
+    return PyRaiseCache(
+        settings.py_raise_cache_dir, settings.py_raise_cache_size * 1024 * 1024
+    )
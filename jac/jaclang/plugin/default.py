@@ -5,11 +5,14 @@ from __future__ import annotations
 import ast as ast3
 import fnmatch
 import html
+import multiprocessing
 import os
 import types
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import field
 from functools import wraps
+from itertools import repeat
 from logging import getLogger
 from typing import Any, Callable, Mapping, Optional, Sequence, Type, Union, cast
 from uuid import UUID
@@ -36,12 +39,15 @@ from jaclang.plugin.feature import (
     ast,
 )
 from jaclang.runtimelib.constructs import (
+    AbilityDispatchTable,
     GenericEdge,
     JacTestCheck,
+    WalkerAnchor,
+    WalkerFrontier,
 )
 from jaclang.runtimelib.importer import ImportPathSpec, JacImporter, PythonImporter
 from jaclang.runtimelib.machine import JacMachine, JacProgram
-from jaclang.runtimelib.memory import Shelf, ShelfStorage
+from jaclang.runtimelib.memory import Shelf, ShelfStorage, SqliteStorage
 from jaclang.runtimelib.utils import collect_node_connections, traverse_graph
 
 
@@ -82,11 +88,14 @@ class JacAccessValidationImpl:
     ) -> None:
         """Allow all access from target root graph to current Architype."""
         level = AccessLevel.cast(level)
-        access = architype.__jac__.access.roots
+        anchor = architype.__jac__
+        access = anchor.access.roots
 
         _root_id = str(root_id)
         if level != access.anchors.get(_root_id, AccessLevel.NO_ACCESS):
-            access.anchors[_root_id] = level
+            anchor.writable_access().roots.anchors[_root_id] = level
+            anchor.dirty = True
+            Jac.get_context().clear_access_cache()
 
     @staticmethod
     @hookimpl
@@ -95,9 +104,13 @@ class JacAccessValidationImpl:
     ) -> None:
         """Disallow all access from target root graph to current Architype."""
         level = AccessLevel.cast(level)
-        access = architype.__jac__.access.roots
+        anchor = architype.__jac__
+        access = anchor.access.roots
 
-        access.anchors.pop(str(root_id), None)
+        if str(root_id) in access.anchors:
+            anchor.writable_access().roots.anchors.pop(str(root_id))
+            anchor.dirty = True
+            Jac.get_context().clear_access_cache()
 
     @staticmethod
     @hookimpl
@@ -106,7 +119,9 @@ class JacAccessValidationImpl:
         anchor = architype.__jac__
         level = AccessLevel.cast(level)
         if level != anchor.access.all:
-            anchor.access.all = level
+            anchor.writable_access().all = level
+            anchor.dirty = True
+            Jac.get_context().clear_access_cache()
 
     @staticmethod
     @hookimpl
@@ -114,7 +129,9 @@ class JacAccessValidationImpl:
         """Disallow others to access current Architype."""
         anchor = architype.__jac__
         if anchor.access.all > AccessLevel.NO_ACCESS:
-            anchor.access.all = AccessLevel.NO_ACCESS
+            anchor.writable_access().all = AccessLevel.NO_ACCESS
+            anchor.dirty = True
+            Jac.get_context().clear_access_cache()
 
     @staticmethod
     @hookimpl
@@ -163,6 +180,11 @@ class JacAccessValidationImpl:
         if jroot == jctx.system_root or jroot.id == to.root or jroot == to:
             return AccessLevel.WRITE
 
+        # computed once per context until an allow/disallow/(un)restrict call
+        key = (jroot.id, to.id)
+        if (access_level := jctx.access_cache.get(key)) is not None:
+            return access_level
+
         access_level = AccessLevel.NO_ACCESS
 
         # if target anchor have set access.all
@@ -185,6 +207,7 @@ class JacAccessValidationImpl:
         if level > AccessLevel.NO_ACCESS and access_level == AccessLevel.NO_ACCESS:
             access_level = level
 
+        jctx.access_cache[key] = access_level
         return access_level
 
 
@@ -223,10 +246,16 @@ class JacNodeImpl:
         dir: EdgeDir,
         filter_func: Optional[Callable[[list[EdgeArchitype]], list[EdgeArchitype]]],
         target_obj: Optional[list[NodeArchitype]],
+        edge_type: Optional[type | types.UnionType],
     ) -> list[EdgeArchitype]:
         """Get edges connected to this node."""
+        node.populate_edges()
         ret_edges: list[EdgeArchitype] = []
-        for anchor in node.edges:
+        for anchor in (
+            node.edges
+            if edge_type is None
+            else node.edge_index().select(edge_type, dir)
+        ):
             if (
                 (source := anchor.source)
                 and (target := anchor.target)
@@ -257,10 +286,16 @@ class JacNodeImpl:
         dir: EdgeDir,
         filter_func: Optional[Callable[[list[EdgeArchitype]], list[EdgeArchitype]]],
         target_obj: Optional[list[NodeArchitype]],
+        edge_type: Optional[type | types.UnionType],
     ) -> list[NodeArchitype]:
         """Get set of nodes connected to this node."""
+        node.populate_edges()
         ret_edges: list[NodeArchitype] = []
-        for anchor in node.edges:
+        for anchor in (
+            node.edges
+            if edge_type is None
+            else node.edge_index().select(edge_type, dir)
+        ):
             if (
                 (source := anchor.source)
                 and (target := anchor.target)
@@ -284,14 +319,37 @@ class JacNodeImpl:
                     ret_edges.append(source.architype)
         return ret_edges
 
+    @staticmethod
+    @hookimpl
+    def expand_frontier(
+        nodes: list[NodeAnchor],
+        dir: EdgeDir,
+        filter_func: Optional[Callable[[list[EdgeArchitype]], list[EdgeArchitype]]],
+        target_obj: Optional[list[NodeArchitype]],
+        edge_type: Optional[type | types.UnionType],
+        edges_only: bool,
+    ) -> list[NodeArchitype] | list[EdgeArchitype]:
+        """Get nodes (or edges) connected to any node of a frontier."""
+        expand = Jac.get_edges if edges_only else Jac.edges_to_nodes
+        # keyed by anchor, architypes may define their own __eq__/__hash__
+        expanded: set[NodeAnchor] = set()
+        seen: set[Anchor] = set()
+        connected: list = []
+        for node in nodes:
+            if node in expanded:
+                continue
+            expanded.add(node)
+            for arch in expand(node, dir, filter_func, target_obj, edge_type):
+                if (anchor := arch.__jac__) not in seen:
+                    seen.add(anchor)
+                    connected.append(arch)
+        return connected
+
     @staticmethod
     @hookimpl
     def remove_edge(node: NodeAnchor, edge: EdgeAnchor) -> None:
         """Remove reference without checking sync status."""
-        for idx, ed in enumerate(node.edges):
-            if ed.id == edge.id:
-                node.edges.pop(idx)
-                break
+        node.remove_edge(edge)
 
 
 class JacEdgeImpl:
@@ -324,19 +382,21 @@ class JacWalkerImpl:
         if isinstance(walker, WalkerArchitype):
             """Walker visits node."""
             wanch = walker.__jac__
-            before_len = len(wanch.next)
+            nodes = []
             for anchor in (
                 (i.__jac__ for i in expr) if isinstance(expr, list) else [expr.__jac__]
             ):
                 if anchor not in wanch.ignores:
                     if isinstance(anchor, NodeAnchor):
-                        wanch.next.append(anchor)
+                        nodes.append(anchor)
                     elif isinstance(anchor, EdgeAnchor):
                         if target := anchor.target:
-                            wanch.next.append(target)
+                            nodes.append(target)
                         else:
                             raise ValueError("Edge has no target.")
-            return len(wanch.next) > before_len
+            # queued as one batch so DFS keeps the order of the visit statement
+            wanch.next.extend(nodes)
+            return len(nodes) > 0
         else:
             raise TypeError("Invalid walker object")
 
@@ -356,16 +416,22 @@ class JacWalkerImpl:
         if isinstance(walker, WalkerArchitype):
             wanch = walker.__jac__
             before_len = len(wanch.ignores)
+            # walker anchors of other plugins may still keep a list
+            add = (
+                wanch.ignores.add
+                if isinstance(wanch.ignores, set)
+                else wanch.ignores.append
+            )
             for anchor in (
                 (i.__jac__ for i in expr) if isinstance(expr, list) else [expr.__jac__]
             ):
                 if anchor not in wanch.ignores:
                     if isinstance(anchor, NodeAnchor):
-                        wanch.ignores.append(anchor)
+                        add(anchor)
                     elif isinstance(anchor, EdgeAnchor):
-                        if target := anchor.target:
-                            wanch.ignores.append(target)
-                        else:
+                        if (target := anchor.target) and target not in wanch.ignores:
+                            add(target)
+                        elif not target:
                             raise ValueError("Edge has no target.")
             return len(wanch.ignores) > before_len
         else:
@@ -397,68 +463,110 @@ class JacWalkerImpl:
             raise TypeError("Invalid walker object")
 
         walker.path = []
-        walker.next = [node]
+        walker.next = WalkerFrontier([node], walker.traversal, walker.priority_key)
         if walker.next:
-            current_node = walker.next[-1].architype
+            current_node = node.architype
             for i in warch._jac_entry_funcs_:
-                trigger = i.get_funcparam_annotations(i.func)
-                if not trigger:
+                if not i.get_trigger():
                     if i.func:
                         i.func(warch, current_node)
                     else:
                         raise ValueError(f"No function {i.name} to call.")
+        walker_cls = type(warch)
         while len(walker.next):
-            if current_node := walker.next.pop(0).architype:
-                for i in current_node._jac_entry_funcs_:
-                    trigger = i.get_funcparam_annotations(i.func)
-                    if not trigger or isinstance(warch, trigger):
-                        if i.func:
-                            i.func(current_node, warch)
-                        else:
-                            raise ValueError(f"No function {i.name} to call.")
+            if current_node := cast(NodeArchitype, walker.next.pop().architype):
+                table = AbilityDispatchTable.get(walker_cls, type(current_node))
+                for i in table.node_entry:
+                    if i.func:
+                        i.func(current_node, warch)
+                    else:
+                        raise ValueError(f"No function {i.name} to call.")
                     if walker.disengaged:
                         return warch
-                for i in warch._jac_entry_funcs_:
-                    trigger = i.get_funcparam_annotations(i.func)
-                    if not trigger or isinstance(current_node, trigger):
-                        if i.func and trigger:
-                            i.func(warch, current_node)
-                        elif not trigger:
-                            continue
-                        else:
-                            raise ValueError(f"No function {i.name} to call.")
+                for i in table.walker_entry:
+                    if i.func:
+                        i.func(warch, current_node)
+                    else:
+                        raise ValueError(f"No function {i.name} to call.")
                     if walker.disengaged:
                         return warch
-                for i in warch._jac_exit_funcs_:
-                    trigger = i.get_funcparam_annotations(i.func)
-                    if not trigger or isinstance(current_node, trigger):
-                        if i.func and trigger:
-                            i.func(warch, current_node)
-                        elif not trigger:
-                            continue
-                        else:
-                            raise ValueError(f"No function {i.name} to call.")
+                for i in table.walker_exit:
+                    if i.func:
+                        i.func(warch, current_node)
+                    else:
+                        raise ValueError(f"No function {i.name} to call.")
                     if walker.disengaged:
                         return warch
-                for i in current_node._jac_exit_funcs_:
-                    trigger = i.get_funcparam_annotations(i.func)
-                    if not trigger or isinstance(warch, trigger):
-                        if i.func:
-                            i.func(current_node, warch)
-                        else:
-                            raise ValueError(f"No function {i.name} to call.")
+                for i in table.node_exit:
+                    if i.func:
+                        i.func(current_node, warch)
+                    else:
+                        raise ValueError(f"No function {i.name} to call.")
                     if walker.disengaged:
                         return warch
         for i in warch._jac_exit_funcs_:
-            trigger = i.get_funcparam_annotations(i.func)
-            if not trigger:
+            if not i.get_trigger():
                 if i.func:
                     i.func(warch, current_node)
                 else:
                     raise ValueError(f"No function {i.name} to call.")
-        walker.ignores = []
+        walker.ignores = set()
         return warch
 
+    @staticmethod
+    @hookimpl
+    def spawn_many(
+        walkers: list[WalkerArchitype],
+        nodes: list[NodeArchitype],
+        workers: Optional[int],
+    ) -> list[WalkerArchitype]:
+        """Spawn walkers on stored nodes, spread over a pool of processes.
+
+        Batch changes are merged in walker order, the last write of a field wins.
+        """
+        if len(walkers) != len(nodes):
+            raise ValueError("spawn_many expects one node per walker!")
+
+        jctx = Jac.get_context()
+        workers = min(workers or os.cpu_count() or 1, len(walkers))
+        if workers <= 1:
+            return [Jac.spawn_call(wlk, nd) for wlk, nd in zip(walkers, nodes)]
+
+        if not jctx.session or not isinstance(jctx.mem, ShelfStorage):
+            raise ValueError("spawn_many needs a session to share the graph!")
+        for node in nodes:
+            if not node.__jac__.persistent:
+                raise ValueError(f"{node} is not saved, it can't be spawned on!")
+        for walker in walkers:
+            if walker.__jac__.priority_key is not None:
+                raise ValueError(f"{walker} has a priority_key, it can't be sent!")
+
+        mem = jctx.mem
+        jobs = [(wlk.__jac__, nd.__jac__.id) for wlk, nd in zip(walkers, nodes)]
+        size = -(-len(jobs) // workers)
+        batches = [jobs[idx : idx + size] for idx in range(0, len(jobs), size)]
+        methods = multiprocessing.get_all_start_methods()
+        # jac modules are compiled at runtime, forked workers already have them
+        mp_context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        # workers open their own context on the session, it has to be current
+        pool = ProcessPoolExecutor(len(batches), mp_context=mp_context)
+        with mem.shared(), pool:
+            results = list(
+                pool.map(
+                    _spawn_batch,
+                    repeat(jctx.session),
+                    repeat(jctx.root.id.hex),
+                    batches,
+                )
+            )
+
+        spawned: list[WalkerArchitype] = []
+        for done, reports, changed, deleted in results:
+            spawned.extend(anchor.architype for anchor in done)
+            jctx.reports.extend(reports)
+            mem.merge(changed, deleted)
+        return spawned
+
     @staticmethod
     @hookimpl
     def disengage(walker: WalkerArchitype) -> bool:  # noqa: ANN401
@@ -467,6 +575,30 @@ class JacWalkerImpl:
         return True
 
 
+def _spawn_batch(
+    session: str, root: str, jobs: list[tuple[WalkerAnchor, UUID]]
+) -> tuple[list[WalkerAnchor], list[Any], list, list[UUID]]:
+    """Run a batch of spawn_many in a worker process.
+
+    Nothing is written to the session, the changes are sent back for the
+    spawning process to merge.
+    """
+    jctx = ExecutionContext.create(
+        session=session, root=root, auto_close=False, read_only=True
+    )
+    mem = cast(ShelfStorage, jctx.mem)
+    try:
+        for walker, node_id in jobs:
+            if not isinstance(node := mem.find_by_id(node_id), NodeAnchor):
+                raise ValueError(f"Invalid anchor id {node_id} !")
+            Jac.spawn_call(walker.architype, node.architype)
+        changed, deleted = mem.changes()
+        return [walker for walker, _ in jobs], jctx.reports, changed, deleted
+    finally:
+        if isinstance(mem.__shelf__, Shelf):
+            mem.__shelf__.close()
+
+
 class JacBuiltinImpl:
     """Jac Builtins."""
 
@@ -598,9 +730,13 @@ class JacFeatureImpl(
 
         deleted_count = 0
         for anchor in (
-            anchors.values()
-            if isinstance(anchors := mem.__shelf__, Shelf)
-            else mem.__mem__.values()
+            list(mem.find_by_root(ranchor.id))
+            if isinstance(mem, SqliteStorage)
+            else (
+                anchors.values()
+                if isinstance(anchors := mem.__shelf__, Shelf)
+                else mem.__mem__.values()
+            )
         ):
             if anchor == ranchor or anchor.root != ranchor.id:
                 continue
@@ -634,6 +770,7 @@ class JacFeatureImpl(
         """Create a new architype."""
         for i in on_entry + on_exit:
             i.resolve(cls)
+        AbilityDispatchTable.clear()
         if not hasattr(cls, "_jac_entry_funcs_") or not hasattr(
             cls, "_jac_exit_funcs_"
         ):
@@ -918,6 +1055,7 @@ class JacFeatureImpl(
         dir: EdgeDir,
         filter_func: Optional[Callable[[list[EdgeArchitype]], list[EdgeArchitype]]],
         edges_only: bool,
+        edge_type: Optional[type | types.UnionType],
     ) -> list[NodeArchitype] | list[EdgeArchitype]:
         """Jac's apply_dir stmt feature."""
         if isinstance(node_obj, NodeArchitype):
@@ -927,26 +1065,14 @@ class JacFeatureImpl(
             if isinstance(target_obj, NodeArchitype)
             else target_obj if target_obj else None
         )
-        if edges_only:
-            connected_edges: list[EdgeArchitype] = []
-            for node in node_obj:
-                edges = Jac.get_edges(
-                    node.__jac__, dir, filter_func, target_obj=targ_obj_set
-                )
-                connected_edges.extend(
-                    edge for edge in edges if edge not in connected_edges
-                )
-            return connected_edges
-        else:
-            connected_nodes: list[NodeArchitype] = []
-            for node in node_obj:
-                nodes = Jac.edges_to_nodes(
-                    node.__jac__, dir, filter_func, target_obj=targ_obj_set
-                )
-                connected_nodes.extend(
-                    node for node in nodes if node not in connected_nodes
-                )
-            return connected_nodes
+        return Jac.expand_frontier(
+            [node.__jac__ for node in node_obj],
+            dir,
+            filter_func,
+            target_obj=targ_obj_set,
+            edge_type=edge_type,
+            edges_only=edges_only,
+        )
 
     @staticmethod
     @hookimpl
@@ -986,9 +1112,12 @@ class JacFeatureImpl(
         left = [left] if isinstance(left, NodeArchitype) else left
         right = [right] if isinstance(right, NodeArchitype) else right
 
+        right_anchors = {j.__jac__ for j in right}
+
         for i in left:
             node = i.__jac__
-            for anchor in set(node.edges):
+            # an edge to itself is listed twice
+            for anchor in dict.fromkeys(node.edges):
                 if (
                     (source := anchor.source)
                     and (target := anchor.target)
@@ -999,7 +1128,7 @@ class JacFeatureImpl(
                     if (
                         dir in [EdgeDir.OUT, EdgeDir.ANY]
                         and node == source
-                        and target.architype in right
+                        and target in right_anchors
                         and Jac.check_write_access(target)
                     ):
                         Jac.destroy(anchor) if anchor.persistent else Jac.detach(anchor)
@@ -1007,7 +1136,7 @@ class JacFeatureImpl(
                     if (
                         dir in [EdgeDir.IN, EdgeDir.ANY]
                         and node == target
-                        and source.architype in right
+                        and source in right_anchors
                         and Jac.check_write_access(source)
                     ):
                         Jac.destroy(anchor) if anchor.persistent else Jac.detach(anchor)
@@ -1058,8 +1187,8 @@ class JacFeatureImpl(
                 target=target,
                 is_undirected=is_undirected,
             )
-            source.edges.append(eanch)
-            target.edges.append(eanch)
+            source.add_edge(eanch)
+            target.add_edge(eanch)
 
             if conn_assign:
                 for fld, val in zip(conn_assign[0], conn_assign[1]):
@@ -115,10 +115,15 @@ class JacNode:
         dir: EdgeDir,
         filter_func: Optional[Callable[[list[EdgeArchitype]], list[EdgeArchitype]]],
         target_obj: Optional[list[NodeArchitype]],
+        edge_type: Optional[type | types.UnionType] = None,
     ) -> list[EdgeArchitype]:
         """Get edges connected to this node."""
         return plugin_manager.hook.get_edges(
-            node=node, dir=dir, filter_func=filter_func, target_obj=target_obj
+            node=node,
+            dir=dir,
+            filter_func=filter_func,
+            target_obj=target_obj,
+            edge_type=edge_type,
         )
 
     @staticmethod
@@ -127,10 +132,40 @@ class JacNode:
         dir: EdgeDir,
         filter_func: Optional[Callable[[list[EdgeArchitype]], list[EdgeArchitype]]],
         target_obj: Optional[list[NodeArchitype]],
+        edge_type: Optional[type | types.UnionType] = None,
     ) -> list[NodeArchitype]:
         """Get set of nodes connected to this node."""
         return plugin_manager.hook.edges_to_nodes(
-            node=node, dir=dir, filter_func=filter_func, target_obj=target_obj
+            node=node,
+            dir=dir,
+            filter_func=filter_func,
+            target_obj=target_obj,
+            edge_type=edge_type,
+        )
+
+    @staticmethod
+    def expand_frontier(
+        nodes: list[NodeAnchor],
+        dir: EdgeDir,
+        filter_func: Optional[
+            Callable[[list[EdgeArchitype]], list[EdgeArchitype]]
+        ] = None,
+        target_obj: Optional[list[NodeArchitype]] = None,
+        edge_type: Optional[type | types.UnionType] = None,
+        edges_only: bool = False,
+    ) -> list[NodeArchitype] | list[EdgeArchitype]:
+        """Get nodes (or edges) connected to any node of a frontier.
+
+        Each node is expanded once and the result holds every node (or edge)
+        once, in the order they are first reached.
+        """
+        return plugin_manager.hook.expand_frontier(
+            nodes=nodes,
+            dir=dir,
+            filter_func=filter_func,
+            target_obj=target_obj,
+            edge_type=edge_type,
+            edges_only=edges_only,
         )
 
     @staticmethod
@@ -184,6 +219,25 @@ class JacWalker:
         """Jac's spawn operator feature."""
         return plugin_manager.hook.spawn_call(op1=op1, op2=op2)
 
+    @staticmethod
+    def spawn_many(
+        walkers: list[WalkerArchitype],
+        nodes: list[NodeArchitype],
+        workers: Optional[int] = None,
+    ) -> list[WalkerArchitype]:
+        """Spawn walkers[i] on nodes[i] over `workers` processes (cpu count).
+
+        Each process opens its own context on the session of the current one,
+        the reports and graph changes of the walkers are merged back into it.
+        The walkers are split into one batch per process and the batches are
+        merged in order, so a field of a node written by several batches keeps
+        the value of the last one (last writer wins). Edges connected or
+        disconnected by any batch are all applied.
+        """
+        return plugin_manager.hook.spawn_many(
+            walkers=walkers, nodes=nodes, workers=workers
+        )
+
     @staticmethod
     def disengage(walker: WalkerArchitype) -> bool:
         """Jac's disengage stmt feature."""
@@ -397,14 +451,20 @@ class JacFeature(
         dir: EdgeDir,
         filter_func: Optional[Callable[[list[EdgeArchitype]], list[EdgeArchitype]]],
         edges_only: bool = False,
+        edge_type: Optional[type | types.UnionType] = None,
     ) -> list[NodeArchitype] | list[EdgeArchitype]:
-        """Jac's apply_dir stmt feature."""
+        """Jac's apply_dir stmt feature.
+
+        `edge_type` is the edge class of a typed reference (`-[:T:]->`), edges
+        of other classes are skipped without calling `filter_func`.
+        """
         return plugin_manager.hook.edge_ref(
             node_obj=node_obj,
             target_obj=target_obj,
             dir=dir,
             filter_func=filter_func,
             edges_only=edges_only,
+            edge_type=edge_type,
         )
 
     @staticmethod
@@ -121,6 +121,7 @@ class JacNodeSpec:
         dir: EdgeDir,
         filter_func: Optional[Callable[[list[EdgeArchitype]], list[EdgeArchitype]]],
         target_obj: Optional[list[NodeArchitype]],
+        edge_type: Optional[type | types.UnionType],
     ) -> list[EdgeArchitype]:
         """Get edges connected to this node."""
         raise NotImplementedError
@@ -132,10 +133,24 @@ class JacNodeSpec:
         dir: EdgeDir,
         filter_func: Optional[Callable[[list[EdgeArchitype]], list[EdgeArchitype]]],
         target_obj: Optional[list[NodeArchitype]],
+        edge_type: Optional[type | types.UnionType],
     ) -> list[NodeArchitype]:
         """Get set of nodes connected to this node."""
         raise NotImplementedError
 
+    @staticmethod
+    @hookspec(firstresult=True)
+    def expand_frontier(
+        nodes: list[NodeAnchor],
+        dir: EdgeDir,
+        filter_func: Optional[Callable[[list[EdgeArchitype]], list[EdgeArchitype]]],
+        target_obj: Optional[list[NodeArchitype]],
+        edge_type: Optional[type | types.UnionType],
+        edges_only: bool,
+    ) -> list[NodeArchitype] | list[EdgeArchitype]:
+        """Get nodes (or edges) connected to any node of a frontier."""
+        raise NotImplementedError
+
     @staticmethod
     @hookspec(firstresult=True)
     def remove_edge(node: NodeAnchor, edge: EdgeAnchor) -> None:
@@ -192,6 +207,16 @@ class JacWalkerSpec:
         """Invoke data spatial call."""
         raise NotImplementedError
 
+    @staticmethod
+    @hookspec(firstresult=True)
+    def spawn_many(
+        walkers: list[WalkerArchitype],
+        nodes: list[NodeArchitype],
+        workers: Optional[int],
+    ) -> list[WalkerArchitype]:
+        """Spawn walkers on stored nodes, spread over a pool of processes."""
+        raise NotImplementedError
+
     @staticmethod
     @hookspec(firstresult=True)
     def disengage(walker: WalkerArchitype) -> bool:
@@ -380,6 +405,7 @@ class JacFeatureSpec(
         dir: EdgeDir,
         filter_func: Optional[Callable[[list[EdgeArchitype]], list[EdgeArchitype]]],
         edges_only: bool,
+        edge_type: Optional[type | types.UnionType],
     ) -> list[NodeArchitype] | list[EdgeArchitype]:
         """Jac's apply_dir stmt feature."""
         raise NotImplementedError
@@ -3,13 +3,42 @@
 import io
 import os
 import sys
+from dataclasses import dataclass, field
+from pickle import dumps, loads
 
 from jaclang.cli import cli
+from jaclang.plugin.feature import JacFeature as Jac
+from jaclang.runtimelib.architype import (
+    AccessLevel,
+    DEFAULT_PERMISSION,
+    NodeAnchor,
+    NodeArchitype,
+    Permission,
+    Root,
+)
+from jaclang.runtimelib.context import ExecutionContext
+from jaclang.runtimelib.memory import SqliteShelf, migrate_shelf
 from jaclang.utils.test import TestCase
 
 session = ""
 
 
+@Jac.make_node(on_entry=[], on_exit=[])
+@dataclass(eq=False)
+class Counter(NodeArchitype):
+    """Node with only scalar fields."""
+
+    count: int = 0
+
+
+@Jac.make_node(on_entry=[], on_exit=[])
+@dataclass(eq=False)
+class Bag(NodeArchitype):
+    """Node with a container field."""
+
+    items: list = field(default_factory=list)
+
+
 class TestJaseciPlugin(TestCase):
     """Test jaseci plugin."""
 
@@ -58,6 +87,92 @@ class TestJaseciPlugin(TestCase):
         self.assertEqual(output, "node a\nnode b")
         self._del_session(session)
 
+    def test_walker_simple_persistent_sqlite(self) -> None:
+        """Test simple persistent object on a SQLite session."""
+        session = self.fixture_abs_path("test_simple_persistent_sqlite.db")
+        self._output2buffer()
+        for entrypoint in ("create", "traverse"):
+            cli.enter(
+                filename=self.fixture_abs_path("simple_persistent.jac"),
+                session=f"sqlite://{session}",
+                entrypoint=entrypoint,
+                args=[],
+            )
+        output = self.capturedOutput.getvalue().strip()
+        self.assertEqual(output, "node a\nnode b")
+
+        db = SqliteShelf(session)
+        kinds = {
+            kind: db.db.execute(f"SELECT COUNT(*) FROM {kind}").fetchone()[0]
+            for kind in db.KINDS
+        }
+        db.close()
+        self.assertEqual(kinds, {"node": 3, "edge": 2, "walker": 0, "object": 0})
+        self._del_session(session)
+
+    def test_migrate_shelf_session(self) -> None:
+        """Test migrating a shelf session to SQLite."""
+        session = self.fixture_abs_path("test_migrate_shelf.session")
+        target = self.fixture_abs_path("test_migrate_shelf.db")
+        cli.enter(
+            filename=self.fixture_abs_path("simple_persistent.jac"),
+            session=session,
+            entrypoint="create",
+            args=[],
+        )
+        self.assertEqual(migrate_shelf(session, target), 5)
+        self._output2buffer()
+        cli.enter(
+            filename=self.fixture_abs_path("simple_persistent.jac"),
+            session=f"sqlite://{target}",
+            entrypoint="traverse",
+            args=[],
+        )
+        output = self.capturedOutput.getvalue().strip()
+        self.assertEqual(output, "node a\nnode b")
+        self._del_session(session)
+        self._del_session(target)
+
+    def test_spawn_many(self) -> None:
+        """Test spawning walkers over a process pool."""
+        for session in (
+            self.fixture_abs_path("test_spawn_many.session"),
+            f"sqlite://{self.fixture_abs_path('test_spawn_many.db')}",
+        ):
+            self._output2buffer()
+            for entrypoint in ("create", "bump_all", "bump_all", "check"):
+                cli.enter(
+                    filename=self.fixture_abs_path("spawn_many.jac"),
+                    session=session,
+                    entrypoint=entrypoint,
+                    args=[],
+                )
+            output = self.capturedOutput.getvalue().strip().split("\n")
+            self.assertEqual(
+                [
+                    "[1, 1, 1, 1] [1, 1, 1, 1]",
+                    "[1, 1, 1, 1] [2, 2, 2, 2]",
+                    "[2, 2, 2, 2] [2, 2, 2, 2]",
+                ],
+                output,
+            )
+            self._del_session(session.removeprefix("sqlite://"))
+
+    def test_spawn_many_last_writer_wins(self) -> None:
+        """Test fields written by several batches keep the last batch value."""
+        session = self.fixture_abs_path("test_spawn_many_conflict.session")
+        self._output2buffer()
+        for entrypoint in ("create", "stamp_first"):
+            cli.enter(
+                filename=self.fixture_abs_path("spawn_many.jac"),
+                session=session,
+                entrypoint=entrypoint,
+                args=[],
+            )
+        # two batches of two walkers, every connected edge is kept
+        self.assertEqual("3 4", self.capturedOutput.getvalue().strip())
+        self._del_session(session)
+
     def test_entrypoint_root(self) -> None:
         """Test entrypoint being root."""
         session = self.fixture_abs_path("test_entrypoint_root.session")
@@ -745,6 +860,209 @@ class TestJaseciPlugin(TestCase):
 
         self._del_session(session)
 
+    def test_access_level_cache(self) -> None:
+        """Test access levels are cached per context until access changes."""
+        ctx = ExecutionContext.create()
+        try:
+            other_root = Root().__jac__
+            ctx.mem.set(other_root.id, other_root)
+            target = Root().__jac__
+            target.root = other_root.id
+            ctx.root = Root().__jac__
+
+            self.assertEqual(AccessLevel.NO_ACCESS, Jac.check_access_level(target))
+            self.assertEqual(
+                AccessLevel.NO_ACCESS, ctx.access_cache[(ctx.root.id, target.id)]
+            )
+
+            Jac.allow_root(target.architype, ctx.root.id, "READ")
+            self.assertFalse(ctx.access_cache)
+            self.assertEqual(AccessLevel.READ, Jac.check_access_level(target))
+
+            Jac.unrestrict(other_root.architype, "WRITE")
+            self.assertEqual(AccessLevel.WRITE, Jac.check_access_level(target))
+            Jac.restrict(other_root.architype)
+            self.assertEqual(AccessLevel.READ, Jac.check_access_level(target))
+
+            Jac.disallow_root(target.architype, ctx.root.id, "READ")
+            self.assertEqual(AccessLevel.NO_ACCESS, Jac.check_access_level(target))
+
+            # a cached level is per current root
+            Jac.elevate_root()
+            self.assertEqual(AccessLevel.WRITE, Jac.check_access_level(target))
+        finally:
+            ctx.close()
+
+    def test_dirty_tracking(self) -> None:
+        """Test only anchors changed since loaded are written back."""
+        session = self.fixture_abs_path("dirty_tracking.session")
+
+        def load() -> tuple[ExecutionContext, list[NodeArchitype]]:
+            ctx = ExecutionContext.create(session=session)
+            return ctx, Jac.edge_ref(ctx.root.architype, None, Jac.EdgeDir.OUT, None)
+
+        ctx = ExecutionContext.create(session=session)
+        Jac.connect(
+            ctx.root.architype,
+            [Counter(), Bag()],
+            Jac.build_edge(is_undirected=False, conn_type=None, conn_assign=None),
+            edges_only=False,
+        )
+        ctx.close()
+
+        ctx, (counter, bag) = load()
+        self.assertFalse(
+            any(a.is_dirty() for a in (ctx.root, counter.__jac__, bag.__jac__))
+        )
+        counter.count = 5
+        # loaded containers are tracked, in place changes flag their anchor
+        bag.items.append([1])
+        self.assertTrue(counter.__jac__.dirty)
+        self.assertTrue(bag.__jac__.dirty)
+        self.assertFalse(ctx.root.is_dirty())
+        ctx.close()
+
+        ctx, (counter, bag) = load()
+        self.assertEqual(5, counter.count)
+        self.assertEqual([[1]], bag.items)
+        self.assertFalse(bag.__jac__.is_dirty())
+        bag.items[0].append(2)
+        self.assertTrue(bag.__jac__.dirty)
+        ctx.close()
+
+        ctx, (counter, bag) = load()
+        self.assertEqual([[1, 2]], bag.items)
+        self.assertIs(list, type(loads(dumps(bag.items))))
+        # a container assigned after loading can't be tracked
+        bag.items = []
+        bag.__jac__.mark_synced()
+        self.assertTrue(bag.__jac__.is_dirty())
+        Jac.connect(
+            counter,
+            bag,
+            Jac.build_edge(is_undirected=False, conn_type=None, conn_assign=None),
+            edges_only=False,
+        )
+        self.assertTrue(counter.__jac__.is_dirty())
+        ctx.close()
+
+        ctx, (counter, bag) = load()
+        self.assertEqual([bag], Jac.edge_ref(counter, None, Jac.EdgeDir.OUT, None))
+        ctx.close()
+
+        self._del_session(session)
+
+    def test_bulk_populate_edges(self) -> None:
+        """Test traversing a stored node loads its neighbours in bulk."""
+        session = self.fixture_abs_path("bulk_populate.db")
+        ctx = ExecutionContext.create(session=f"sqlite://{session}")
+        Jac.connect(
+            ctx.root.architype,
+            [Counter(count=i) for i in range(30)],
+            Jac.build_edge(is_undirected=False, conn_type=None, conn_assign=None),
+            edges_only=False,
+        )
+        ctx.close()
+
+        ctx = ExecutionContext.create(session=f"sqlite://{session}")
+        shelf = ctx.mem.__shelf__
+        calls = {"get_many": 0, "get": 0}
+        get_many, get = shelf.get_many, shelf.get
+
+        def count_get_many(keys: list[str]) -> dict:
+            calls["get_many"] += 1
+            return get_many(keys)
+
+        def count_get(key: str, default: object = None) -> object:
+            calls["get"] += 1
+            return get(key, default)
+
+        shelf.get_many, shelf.get = count_get_many, count_get
+        nodes = Jac.edge_ref(ctx.root.architype, None, Jac.EdgeDir.OUT, None)
+        self.assertEqual(list(range(30)), [node.count for node in nodes])
+        # one call for the edges, one for their end nodes
+        self.assertEqual({"get_many": 2, "get": 0}, calls)
+        ctx.close()
+
+        self._del_session(session)
+
+    def test_sqlite_read_only(self) -> None:
+        """Test a read-only SQLite session never writes the database."""
+        session = self.fixture_abs_path("read_only.db")
+        ctx = ExecutionContext.create(session=f"sqlite://{session}")
+        Jac.connect(
+            ctx.root.architype,
+            Counter(count=1),
+            Jac.build_edge(is_undirected=False, conn_type=None, conn_assign=None),
+            edges_only=False,
+        )
+        ctx.close()
+
+        ctx = ExecutionContext.create(session=f"sqlite://{session}", read_only=True)
+        self.assertEqual(session, ctx.mem.session)
+        [counter] = Jac.edge_ref(ctx.root.architype, None, Jac.EdgeDir.OUT, None)
+        counter.count = 2
+        Jac.connect(
+            ctx.root.architype,
+            Counter(count=3),
+            Jac.build_edge(is_undirected=False, conn_type=None, conn_assign=None),
+            edges_only=False,
+        )
+        ctx.close()
+
+        ctx = ExecutionContext.create(session=f"sqlite://{session}")
+        nodes = Jac.edge_ref(ctx.root.architype, None, Jac.EdgeDir.OUT, None)
+        self.assertEqual([1], [node.count for node in nodes])
+        ctx.close()
+
+        self._del_session(session)
+
+    def test_slotted_anchors(self) -> None:
+        """Test anchor slots, shared default permission and legacy state."""
+        ctx = ExecutionContext.create()
+        first, second = Counter(), Counter()
+        self.assertFalse(hasattr(first.__jac__, "__dict__"))
+        self.assertIs(first.__jac__.access, second.__jac__.access)
+
+        Jac.allow_root(first, ctx.root.id, AccessLevel.READ)
+        self.assertEqual(
+            AccessLevel.READ, first.__jac__.access.roots.check(str(ctx.root.id))
+        )
+        self.assertIs(DEFAULT_PERMISSION, second.__jac__.access)
+        self.assertFalse(DEFAULT_PERMISSION.roots.anchors)
+        with self.assertRaises(TypeError):
+            DEFAULT_PERMISSION.all = AccessLevel.WRITE
+
+        anchor = loads(dumps(second.__jac__))
+        self.assertIs(DEFAULT_PERMISSION, anchor.access)
+        # fields that are not pickled are reset to their defaults
+        self.assertIsNone(anchor._edge_index)
+        self.assertFalse(anchor._stub_edges)
+
+        # state pickled before anchors had slots
+        legacy = object.__new__(NodeAnchor)
+        legacy.__setstate__(
+            {
+                "id": second.__jac__.id,
+                "architype": Counter(count=3),
+                "root": None,
+                "access": Permission(),
+                "persistent": True,
+                "hash": 0,
+                "edges": [],
+            }
+        )
+        self.assertIs(DEFAULT_PERMISSION, legacy.access)
+        self.assertFalse(legacy.is_dirty())
+        self.assertEqual(3, legacy.architype.count)
+
+        ctx.mem.set(legacy.id, legacy)
+        stub = legacy.make_stub()
+        self.assertFalse(stub.is_populated())
+        self.assertEqual(3, stub.architype.count)
+        self.assertTrue(stub.persistent)
+        ctx.close()
+
     def test_savable_object(self) -> None:
         """Test ObjectAnchor save."""
         global session
@@ -3,16 +3,32 @@
 from __future__ import annotations
 
 import inspect
-from dataclasses import asdict, dataclass, field, fields, is_dataclass
-from enum import IntEnum
+from collections import deque
+from contextlib import suppress
+from dataclasses import MISSING, asdict, dataclass, field, fields, is_dataclass
+from enum import Enum, IntEnum
+from heapq import heappop, heappush
+from itertools import count
 from logging import getLogger
-from pickle import dumps
 from types import UnionType
-from typing import Any, Callable, ClassVar, Optional, TypeVar
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Iterable,
+    Iterator,
+    NoReturn,
+    Optional,
+    SupportsIndex,
+    TypeVar,
+)
 from uuid import UUID, uuid4
 
+from jaclang.compiler.constant import EdgeDir
+
 logger = getLogger(__name__)
 
+T = TypeVar("T")
 TARCH = TypeVar("TARCH", bound="Architype")
 TANCH = TypeVar("TANCH", bound="Anchor")
 
@@ -37,6 +53,229 @@ class AccessLevel(IntEnum):
                 return val
 
 
+class TraversalStrategy(Enum):
+    """Order in which a walker visits the nodes queued by visit statements."""
+
+    BFS = "bfs"  # first queued, first visited (default)
+    DFS = "dfs"  # nodes queued by the latest visit statement first
+    PRIORITY = "priority"  # lowest WalkerAnchor.priority_key(node) first
+
+
+class WalkerFrontier:
+    """Nodes a walker is yet to visit, popped in traversal strategy order."""
+
+    def __init__(
+        self,
+        anchors: Iterable[Anchor] = (),
+        strategy: TraversalStrategy = TraversalStrategy.BFS,
+        key: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        """Create walker frontier."""
+        if strategy is TraversalStrategy.PRIORITY and key is None:
+            raise ValueError("Priority traversal requires a priority key.")
+        self.strategy = strategy
+        self.key = key
+        self.queue: deque[Anchor] = deque()
+        self.heap: list[tuple[Any, int, Anchor]] = []
+        self.counter = count()
+        self.extend(anchors)
+
+    def append(self, anchor: Anchor) -> None:
+        """Queue a node."""
+        self.extend((anchor,))
+
+    def extend(self, anchors: Iterable[Anchor]) -> None:
+        """Queue nodes in the order of a visit statement."""
+        match self.strategy:
+            case TraversalStrategy.BFS:
+                self.queue.extend(anchors)
+            case TraversalStrategy.DFS:
+                self.queue.extendleft(reversed(list(anchors)))
+            case TraversalStrategy.PRIORITY:
+                key = self.key
+                assert key is not None
+                for anchor in anchors:
+                    heappush(
+                        self.heap, (key(anchor.architype), next(self.counter), anchor)
+                    )
+
+    def pop(self) -> Anchor:
+        """Return the next node to visit."""
+        if self.strategy is TraversalStrategy.PRIORITY:
+            return heappop(self.heap)[2]
+        return self.queue.popleft()
+
+    def __len__(self) -> int:
+        """Count queued nodes."""
+        if self.strategy is TraversalStrategy.PRIORITY:
+            return len(self.heap)
+        return len(self.queue)
+
+    def __iter__(self) -> Iterator[Anchor]:
+        """Iterate queued nodes, not necessarily in visiting order."""
+        if self.strategy is TraversalStrategy.PRIORITY:
+            return (anchor for _, _, anchor in self.heap)
+        return iter(self.queue)
+
+
+# values that can only change by assignment, caught by Architype.__setattr__
+_SCALARS = (type(None), bool, int, float, complex, str, bytes, Enum, UUID)
+_SCALAR_TYPES: dict[type, bool] = {}
+
+
+def _is_scalar_type(cls: type) -> bool:
+    scalar = _SCALAR_TYPES.get(cls)
+    if scalar is None:
+        scalar = _SCALAR_TYPES[cls] = issubclass(cls, _SCALARS)
+    return scalar
+
+
+def _is_immutable(value: object) -> bool:
+    if isinstance(value, _SCALARS):
+        return True
+    if isinstance(value, (tuple, frozenset)):
+        return all(isinstance(item, _SCALARS) for item in value)
+    return False
+
+
+def _write_barriers(*methods: str) -> Callable[[type[T]], type[T]]:
+    """Flag the anchor of a tracked container before each of `methods`."""
+
+    def barrier(method: Callable) -> Callable:
+        def flag(self: Any, *args: object, **kwargs: object) -> object:  # noqa: ANN401
+            if (anchor := getattr(self, "_jac_anchor", None)) is not None:
+                anchor.dirty = True
+            return method(self, *args, **kwargs)
+
+        return flag
+
+    def decorate(cls: type[T]) -> type[T]:
+        for name in methods:
+            setattr(cls, name, barrier(getattr(cls, name)))
+        return cls
+
+    return decorate
+
+
+@_write_barriers(
+    "__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend",
+    "insert", "pop", "remove", "clear", "sort", "reverse",
+)  # fmt: skip
+class TrackedList(list):
+    """List of a loaded architype, flagging its anchor when changed in place."""
+
+    __slots__ = ("_jac_anchor",)
+    _jac_anchor: Anchor
+
+    def __reduce_ex__(self, protocol: SupportsIndex) -> tuple:
+        """Pickle as a plain list, stored sessions never depend on it."""
+        return (list, (), None, iter(self))
+
+
+@_write_barriers(
+    "__setitem__", "__delitem__", "__ior__", "pop", "popitem", "clear",
+    "update", "setdefault",
+)  # fmt: skip
+class TrackedDict(dict):
+    """Dict of a loaded architype, flagging its anchor when changed in place."""
+
+    __slots__ = ("_jac_anchor",)
+    _jac_anchor: Anchor
+
+    def __reduce_ex__(self, protocol: SupportsIndex) -> tuple:
+        """Pickle as a plain dict, stored sessions never depend on it."""
+        return (dict, (), None, None, iter(self.items()))
+
+
+@_write_barriers(
+    "__ior__", "__iand__", "__isub__", "__ixor__", "add", "discard", "remove",
+    "pop", "clear", "update", "intersection_update", "difference_update",
+    "symmetric_difference_update",
+)  # fmt: skip
+class TrackedSet(set):
+    """Set of a loaded architype, flagging its anchor when changed in place."""
+
+    __slots__ = ("_jac_anchor",)
+    _jac_anchor: Anchor
+
+    def __reduce_ex__(self, protocol: SupportsIndex) -> tuple:
+        """Pickle as a plain set, stored sessions never depend on it."""
+        return (set, (list(self),))
+
+
+_TRACKED = (TrackedList, TrackedDict, TrackedSet)
+
+
+def _track(
+    value: Any, anchor: Anchor, memo: dict[int, Any]  # noqa: ANN401
+) -> tuple[Any, bool]:
+    """Copy the lists, dicts and sets of a loaded value into tracked ones.
+
+    Returns the copy and whether every mutable part of it is now tracked.
+    `memo` keeps containers shared between fields shared.
+    """
+    if _is_immutable(value):
+        return value, True
+    if (key := id(value)) in memo:
+        return memo[key], True
+    cls = type(value)
+    tracked: TrackedList | TrackedDict | TrackedSet
+    if cls is dict:
+        tracked = TrackedDict(value)
+    elif cls is list:
+        tracked = TrackedList(value)
+    elif cls is set:
+        tracked = TrackedSet(value)
+    else:
+        return value, False
+    memo[key] = tracked
+    complete = _track_items(tracked, anchor, memo)
+    # bound last, filling the container does not flag the anchor
+    tracked._jac_anchor = anchor
+    return tracked, complete
+
+
+def _track_items(
+    tracked: TrackedList | TrackedDict | TrackedSet,
+    anchor: Anchor,
+    memo: dict[int, Any],
+) -> bool:
+    items = tracked.values() if isinstance(tracked, TrackedDict) else tracked
+    # the common case of scalar items is checked without a python loop
+    if all(map(_is_scalar_type, set(map(type, items)))):
+        return True
+    complete = True
+    if isinstance(tracked, TrackedSet):
+        complete = all(map(_is_immutable, tracked))
+    elif isinstance(tracked, TrackedDict):
+        for name, item in tracked.items():
+            tracked[name], item_complete = _track(item, anchor, memo)
+            complete = complete and item_complete
+    else:
+        for idx, item in enumerate(tracked):
+            tracked[idx], item_complete = _track(item, anchor, memo)
+            complete = complete and item_complete
+    return complete
+
+
+def _is_tracked(value: Any, anchor: Anchor, seen: set[int]) -> bool:  # noqa: ANN401
+    """Check every mutable part of a value is a container tracked for `anchor`."""
+    if _is_immutable(value):
+        return True
+    if (
+        not isinstance(value, _TRACKED)
+        or getattr(value, "_jac_anchor", None) is not anchor
+    ):
+        return False
+    if id(value) in seen:
+        return True
+    seen.add(id(value))
+    items = value.values() if isinstance(value, dict) else value
+    if all(map(_is_scalar_type, set(map(type, items)))):
+        return True
+    return all(_is_tracked(item, anchor, seen) for item in items)
+
+
 @dataclass
 class Access:
     """Access Structure."""
@@ -55,6 +294,71 @@ class Permission:
     all: AccessLevel = AccessLevel.NO_ACCESS
     roots: Access = field(default_factory=Access)
 
+    def is_default(self) -> bool:
+        """Check if nothing is granted."""
+        return self.all == AccessLevel.NO_ACCESS and not self.roots.anchors
+
+    def copy(self) -> Permission:
+        """Return a mutable copy."""
+        return Permission(all=self.all, roots=Access(anchors=dict(self.roots.anchors)))
+
+
+class _ReadOnlyAnchors(dict[str, AccessLevel]):
+    """Empty access levels of the default permission."""
+
+    def _reject(self, *args: object, **kwargs: object) -> NoReturn:
+        raise TypeError("The default permission is shared, copy it first!")
+
+    __setitem__ = __delitem__ = __ior__ = _reject
+    clear = pop = popitem = setdefault = update = _reject
+
+
+class DefaultPermission(Permission):
+    """Read only permission shared by every anchor that was never granted access.
+
+    Anchors copy it before the first change, see Anchor.writable_access.
+    """
+
+    def __init__(self) -> None:
+        """Create the shared permission."""
+        object.__setattr__(self, "all", AccessLevel.NO_ACCESS)
+        object.__setattr__(self, "roots", Access(anchors=_ReadOnlyAnchors()))
+
+    def __setattr__(self, name: str, value: Any) -> None:  # noqa: ANN401
+        """Reject changes."""
+        raise TypeError("The default permission is shared, copy it first!")
+
+    def __repr__(self) -> str:
+        """Represent as the equivalent permission."""
+        return repr(self.copy())
+
+    def __reduce__(self) -> tuple[Callable[[], Permission], tuple]:
+        """Unpickle as the shared instance."""
+        return default_permission, ()
+
+
+DEFAULT_PERMISSION = DefaultPermission()
+
+
+def default_permission() -> Permission:
+    """Return the permission shared by anchors that were never granted access."""
+    return DEFAULT_PERMISSION
+
+
+def _slot_names(cls: type) -> tuple[str, ...]:
+    names = _SLOT_NAMES.get(cls)
+    if names is None:
+        names = _SLOT_NAMES[cls] = tuple(
+            name
+            for klass in reversed(cls.__mro__)
+            for name in klass.__dict__.get("__slots__", ())
+            if name != "__weakref__"
+        )
+    return names
+
+
+_SLOT_NAMES: dict[type, tuple[str, ...]] = {}
+
 
 @dataclass
 class AnchorReport:
@@ -64,20 +368,54 @@ class AnchorReport:
     context: dict[str, Any]
 
 
-@dataclass(eq=False, repr=False, kw_only=True)
+@dataclass(eq=False, repr=False, kw_only=True, slots=True)
 class Anchor:
-    """Object Anchor."""
+    """Object Anchor.
+
+    Anchors are slotted: a stub only has its id set, reading any other field
+    populates it from the datasource. Classes built by dataclass(slots=True)
+    need the explicit form of super().
+    """
 
     architype: Architype
     id: UUID = field(default_factory=uuid4)
     root: Optional[UUID] = None
-    access: Permission = field(default_factory=Permission)
+    access: Permission = field(default_factory=default_permission)
     persistent: bool = False
-    hash: int = 0
+    # set by write barriers (architype attribute sets, edge and access changes)
+    dirty: bool = True
+    # all in place changes of the architype go through tracked containers
+    _tracked: bool = field(default=False, init=False, repr=False)
+
+    def is_set(self, name: str) -> bool:
+        """Check if a field is set, without populating the anchor."""
+        try:
+            object.__getattribute__(self, name)
+        except AttributeError:
+            return False
+        return True
 
     def is_populated(self) -> bool:
         """Check if state."""
-        return "architype" in self.__dict__
+        return self.is_set("architype")
+
+    def load_from(self, anchor: Anchor) -> None:
+        """Copy the state of a loaded anchor into this one."""
+        for name in _slot_names(type(anchor)):
+            with suppress(AttributeError):
+                object.__setattr__(self, name, object.__getattribute__(anchor, name))
+        # subclasses without slots, such as the jac-cloud anchors
+        try:
+            state = object.__getattribute__(anchor, "__dict__")
+        except AttributeError:
+            return
+        object.__getattribute__(self, "__dict__").update(state)
+
+    def writable_access(self) -> Permission:
+        """Return the anchor permission, copying the shared default first."""
+        if isinstance(self.access, DefaultPermission):
+            self.access = self.access.copy()
+        return self.access
 
     def make_stub(self: TANCH) -> TANCH:
         """Return unsynced copy of anchor."""
@@ -94,7 +432,7 @@ class Anchor:
         jsrc = Jac.get_context().mem
 
         if anchor := jsrc.find_by_id(self.id):
-            self.__dict__.update(anchor.__dict__)
+            self.load_from(anchor)
 
     def __getattr__(self, name: str) -> object:
         """Trigger load if detects unloaded state."""
@@ -131,19 +469,65 @@ class Anchor:
 
     def __setstate__(self, state: dict[str, Any]) -> None:
         """Deserialize Anchor."""
-        self.__dict__.update(state)
+        slots = _slot_names(type(self))
+        for name, value in state.items():
+            # skip fields of older sessions, such as the pickle hash
+            if name in slots:
+                object.__setattr__(self, name, value)
+
+        if "architype" in state:
+            # fields that are not stored, or missing from older sessions
+            for f in fields(self):
+                if f.name not in state:
+                    if f.default is not MISSING:
+                        object.__setattr__(self, f.name, f.default)
+                    elif f.default_factory is not MISSING:
+                        object.__setattr__(self, f.name, f.default_factory())
+
+            if self.access.is_default():
+                self.access = DEFAULT_PERMISSION
 
         if self.is_populated() and self.architype:
             self.architype.__jac__ = self
-            self.hash = hash(dumps(self))
+            self.mark_synced(loaded=True)
+
+    def mark_synced(self, loaded: bool = False) -> None:
+        """Record the anchor as matching its stored state.
+
+        The lists, dicts and sets of a `loaded` architype are replaced with
+        tracked ones, which flag the anchor when changed in place. Containers
+        assigned later, or other mutable values, can't be tracked, so the
+        anchor then counts as changed until it is loaded again.
+        """
+        self.dirty = False
+        state = self.architype.__dict__
+        if loaded:
+            memo: dict[int, Any] = {}
+            complete = True
+            for name, value in state.items():
+                if name != "__jac__":
+                    state[name], value_complete = _track(value, self, memo)
+                    complete = complete and value_complete
+            self._tracked = complete
+        else:
+            seen: set[int] = set()
+            self._tracked = all(
+                _is_tracked(value, self, seen)
+                for name, value in state.items()
+                if name != "__jac__"
+            )
+
+    def is_dirty(self) -> bool:
+        """Check if the anchor changed since it was loaded or last synced."""
+        return self.dirty or not self._tracked
 
     def __repr__(self) -> str:
         """Override representation."""
         if self.is_populated():
             attrs = ""
             for f in fields(self):
-                if f.name in self.__dict__:
-                    attrs += f"{f.name}={self.__dict__[f.name]}, "
+                if f.repr and self.is_set(f.name):
+                    attrs += f"{f.name}={getattr(self, f.name)}, "
             attrs = attrs[:-2]
         else:
             attrs = f"id={self.id}"
@@ -173,24 +557,150 @@ class Anchor:
         return False
 
 
-@dataclass(eq=False, repr=False, kw_only=True)
+class EdgeIndex:
+    """Edges of a node grouped by edge architype class, in connection order.
+
+    Each class maps to (all, outgoing, incoming) edge lists. The index is kept
+    up to date by NodeAnchor.add_edge/remove_edge and rebuilt on demand when
+    `node.edges` was replaced or changed directly (detected by its length and
+    last edge).
+    """
+
+    def __init__(self, node: NodeAnchor) -> None:
+        """Index the current edges of a node."""
+        self.node = node
+        self.edges = node.edges
+        self.size = 0
+        self.last: Optional[EdgeAnchor] = None
+        self.buckets: dict[
+            type, tuple[list[EdgeAnchor], list[EdgeAnchor], list[EdgeAnchor]]
+        ] = {}
+        for edge in node.edges:
+            self.add(edge)
+
+    def is_current(self) -> bool:
+        """Check the index still describes `node.edges`."""
+        edges = self.edges
+        return (
+            edges is self.node.edges
+            and self.size == len(edges)
+            and (edges[-1] if edges else None) is self.last
+        )
+
+    def add(self, edge: EdgeAnchor) -> None:
+        """Index an edge appended to the node edges."""
+        cls = type(edge.architype)
+        if (bucket := self.buckets.get(cls)) is None:
+            bucket = self.buckets[cls] = ([], [], [])
+        bucket[0].append(edge)
+        if edge.source == self.node:
+            bucket[1].append(edge)
+        if edge.target == self.node:
+            bucket[2].append(edge)
+        self.size += 1
+        self.last = edge
+
+    def remove(self, edge: EdgeAnchor) -> None:
+        """Unindex an edge after its removal from the node edges."""
+        for edges in self.buckets.get(type(edge.architype), ()):
+            with suppress(ValueError):
+                edges.remove(edge)
+        self.size -= 1
+        self.last = self.edges[-1] if self.edges else None
+
+    def select(self, edge_type: type | UnionType, dir: EdgeDir) -> list[EdgeAnchor]:
+        """Return the edges in direction `dir` that are `edge_type` instances."""
+        buckets = [
+            bucket for cls, bucket in self.buckets.items() if issubclass(cls, edge_type)
+        ]
+        if len(buckets) == 1:
+            return buckets[0][
+                0 if dir == EdgeDir.ANY else 1 if dir == EdgeDir.OUT else 2
+            ]
+        if not buckets:
+            return []
+        # several subclasses match, keep the connection order of node.edges
+        return [edge for edge in self.edges if isinstance(edge.architype, edge_type)]
+
+
+@dataclass(eq=False, repr=False, kw_only=True, slots=True)
 class NodeAnchor(Anchor):
     """Node Anchor."""
 
     architype: NodeArchitype
     edges: list[EdgeAnchor]
+    _synced_edges: int = field(default=-1, init=False, repr=False)
+    _edge_index: Optional[EdgeIndex] = field(default=None, init=False, repr=False)
+    _stub_edges: bool = field(default=False, init=False, repr=False)
+
+    def mark_synced(self, loaded: bool = False) -> None:
+        """Record the anchor as matching its stored state."""
+        super(NodeAnchor, self).mark_synced(loaded)
+        self._synced_edges = len(self.edges)
+
+    def is_dirty(self) -> bool:
+        """Check if the anchor or its edges changed since last synced."""
+        # edges appended or removed without add_edge/remove_edge
+        return super(NodeAnchor, self).is_dirty() or self._synced_edges != len(
+            self.edges
+        )
+
+    def edge_index(self) -> EdgeIndex:
+        """Return the index of the node edges by edge class."""
+        index = self._edge_index
+        if index is None or not index.is_current():
+            index = self._edge_index = EdgeIndex(self)
+        return index
+
+    def add_edge(self, edge: EdgeAnchor) -> None:
+        """Append an edge, updating the edge index if one was built."""
+        index = self._edge_index
+        current = index is not None and index.is_current()
+        self.edges.append(edge)
+        self.dirty = True
+        if index and current:
+            index.add(edge)
+
+    def remove_edge(self, edge: EdgeAnchor) -> bool:
+        """Remove the first reference to an edge, returning whether it was found."""
+        for idx, ed in enumerate(self.edges):
+            if ed.id == edge.id:
+                index = self._edge_index
+                current = index is not None and index.is_current()
+                self.edges.pop(idx)
+                self.dirty = True
+                if index and current:
+                    index.remove(ed)
+                return True
+        return False
+
+    def populate_edges(self) -> None:
+        """Load the edge stubs of a stored node and their end nodes in bulk."""
+        if self._stub_edges:
+            self._stub_edges = False
+            from jaclang.plugin.feature import JacFeature as Jac
+
+            Jac.get_context().mem.populate_data(self.edges)
 
     def __getstate__(self) -> dict[str, object]:
         """Serialize Node Anchor."""
-        state = super().__getstate__()
+        state = super(NodeAnchor, self).__getstate__()
 
         if self.is_populated():
             state["edges"] = [edge.make_stub() for edge in self.edges]
 
         return state
 
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Deserialize Node Anchor."""
+        super(NodeAnchor, self).__setstate__(state)
 
-@dataclass(eq=False, repr=False, kw_only=True)
+        if self.is_populated() and self.edges:
+            # edges are stored as stubs, loaded on first traversal
+            self._stub_edges = True
+
+
+@dataclass(eq=False, repr=False, kw_only=True, slots=True)
 class EdgeAnchor(Anchor):
     """Edge Anchor."""
 
@@ -201,7 +711,7 @@ class EdgeAnchor(Anchor):
 
     def __getstate__(self) -> dict[str, object]:
         """Serialize Node Anchor."""
-        state = super().__getstate__()
+        state = super(EdgeAnchor, self).__getstate__()
 
         if self.is_populated():
             state.update(
@@ -215,18 +725,20 @@ class EdgeAnchor(Anchor):
         return state
 
 
-@dataclass(eq=False, repr=False, kw_only=True)
+@dataclass(eq=False, repr=False, kw_only=True, slots=True)
 class WalkerAnchor(Anchor):
     """Walker Anchor."""
 
     architype: WalkerArchitype
     path: list[Anchor] = field(default_factory=list)
-    next: list[Anchor] = field(default_factory=list)
-    ignores: list[Anchor] = field(default_factory=list)
+    next: WalkerFrontier = field(default_factory=WalkerFrontier)
+    ignores: set[Anchor] = field(default_factory=set)
     disengaged: bool = False
+    traversal: TraversalStrategy = TraversalStrategy.BFS
+    priority_key: Optional[Callable[[Any], Any]] = None
 
 
-@dataclass(eq=False, repr=False, kw_only=True)
+@dataclass(eq=False, repr=False, kw_only=True, slots=True)
 class ObjectAnchor(Anchor):
     """Edge Anchor."""
 
@@ -247,6 +759,12 @@ class Architype:
         """Override repr for architype."""
         return f"{self.__class__.__name__}"
 
+    def __setattr__(self, name: str, value: Any) -> None:  # noqa: ANN401
+        """Flag the anchor for writing when an attribute changes."""
+        object.__setattr__(self, name, value)
+        if name != "__jac__" and (anchor := self.__dict__.get("__jac__")):
+            anchor.dirty = True
+
 
 class NodeArchitype(Architype):
     """Node Architype Protocol."""
@@ -310,10 +828,28 @@ class DSFunc:
 
     name: str
     func: Callable[[Any, Any], Any] | None = None
+    trigger: type | UnionType | tuple[type | UnionType, ...] | None = field(
+        default=None, init=False, repr=False
+    )
+    trigger_resolved: bool = field(default=False, init=False, repr=False)
 
     def resolve(self, cls: type) -> None:
-        """Resolve the function."""
+        """Resolve the function and its trigger annotation."""
         self.func = getattr(cls, self.name)
+        self.trigger_resolved = False
+        # an annotation referring to an architype defined later in the module
+        # gets resolved on first dispatch instead
+        with suppress(NameError):
+            self.get_trigger()
+
+    def get_trigger(
+        self,
+    ) -> type | UnionType | tuple[type | UnionType, ...] | None:
+        """Get the (cached) trigger annotation of the function."""
+        if not self.trigger_resolved:
+            self.trigger = self.get_funcparam_annotations(self.func)
+            self.trigger_resolved = True
+        return self.trigger
 
     def get_funcparam_annotations(
         self, func: Callable[[Any, Any], Any] | None
@@ -325,3 +861,54 @@ class DSFunc:
             inspect.signature(func, eval_str=True).parameters["_jac_here_"].annotation
         )
         return annotation if annotation != inspect._empty else None
+
+
+@dataclass(eq=False)
+class AbilityDispatchTable:
+    """Abilities triggered when a walker class visits a node class."""
+
+    node_entry: list[DSFunc]
+    walker_entry: list[DSFunc]
+    walker_exit: list[DSFunc]
+    node_exit: list[DSFunc]
+
+    _cache: ClassVar[
+        dict[tuple[type[WalkerArchitype], type[NodeArchitype]], AbilityDispatchTable]
+    ] = {}
+
+    @classmethod
+    def get(
+        cls, walker_cls: type[WalkerArchitype], node_cls: type[NodeArchitype]
+    ) -> AbilityDispatchTable:
+        """Get the cached dispatch table of a (walker class, node class) pair."""
+        if (table := cls._cache.get((walker_cls, node_cls))) is None:
+            table = cls._cache[(walker_cls, node_cls)] = AbilityDispatchTable(
+                node_entry=[
+                    i
+                    for i in node_cls._jac_entry_funcs_
+                    if not (trigger := i.get_trigger())
+                    or issubclass(walker_cls, trigger)
+                ],
+                walker_entry=[
+                    i
+                    for i in walker_cls._jac_entry_funcs_
+                    if (trigger := i.get_trigger()) and issubclass(node_cls, trigger)
+                ],
+                walker_exit=[
+                    i
+                    for i in walker_cls._jac_exit_funcs_
+                    if (trigger := i.get_trigger()) and issubclass(node_cls, trigger)
+                ],
+                node_exit=[
+                    i
+                    for i in node_cls._jac_exit_funcs_
+                    if not (trigger := i.get_trigger())
+                    or issubclass(walker_cls, trigger)
+                ],
+            )
+        return table
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop cached tables, abilities of an architype changed."""
+        cls._cache.clear()
@@ -4,21 +4,25 @@ from __future__ import annotations
 
 
 from .architype import (
+    AbilityDispatchTable,
     AccessLevel,
     Anchor,
     Architype,
     DSFunc,
     EdgeAnchor,
     EdgeArchitype,
+    EdgeIndex,
     GenericEdge,
     NodeAnchor,
     NodeArchitype,
     Root,
+    TraversalStrategy,
     WalkerAnchor,
     WalkerArchitype,
+    WalkerFrontier,
 )
 from .context import ExecutionContext
-from .memory import Memory, ShelfStorage
+from .memory import Memory, ShelfStorage, SqliteStorage
 from .test import JacTestCheck, JacTestResult, JacTextTestRunner
 
 __all__ = [
@@ -30,12 +34,17 @@ __all__ = [
     "Architype",
     "NodeArchitype",
     "EdgeArchitype",
+    "EdgeIndex",
     "WalkerArchitype",
     "GenericEdge",
     "Root",
+    "TraversalStrategy",
+    "WalkerFrontier",
     "DSFunc",
+    "AbilityDispatchTable",
     "Memory",
     "ShelfStorage",
+    "SqliteStorage",
     "ExecutionContext",
     "JacTestResult",
     "JacTextTestRunner",
@@ -8,8 +8,8 @@ from dataclasses import MISSING
 from typing import Any, Callable, Optional, cast
 from uuid import UUID
 
-from .architype import NodeAnchor, Root
-from .memory import Memory, ShelfStorage
+from .architype import AccessLevel, NodeAnchor, Root
+from .memory import Memory, open_storage
 
 
 EXECUTION_CONTEXT = ContextVar[Optional["ExecutionContext"]]("ExecutionContext")
@@ -26,11 +26,15 @@ class ExecutionContext:
     """Execution Context."""
 
     mem: Memory
+    # storage the context was opened on, see memory.open_storage
+    session: Optional[str] = None
     reports: list[Any]
     custom: Any = MISSING
     system_root: NodeAnchor
     root: NodeAnchor
     entry_node: NodeAnchor
+    # (current root id, target anchor id) -> access level of persistent anchors
+    access_cache: dict[tuple[UUID, UUID], AccessLevel]
 
     def init_anchor(
         self,
@@ -48,6 +52,10 @@ class ExecutionContext:
         """Override entry."""
         self.entry_node = self.init_anchor(entry_node, self.root)
 
+    def clear_access_cache(self) -> None:
+        """Forget computed access levels after an access change."""
+        self.access_cache.clear()
+
     def close(self) -> None:
         """Close current ExecutionContext."""
         self.mem.close()
@@ -58,11 +66,14 @@ class ExecutionContext:
         session: Optional[str] = None,
         root: Optional[str] = None,
         auto_close: bool = True,
+        read_only: bool = False,
     ) -> ExecutionContext:
         """Create ExecutionContext."""
         ctx = ExecutionContext()
-        ctx.mem = ShelfStorage(session)
+        ctx.mem = open_storage(session, read_only)
+        ctx.session = session
         ctx.reports = []
+        ctx.access_cache = {}
 
         if not isinstance(
             system_root := ctx.mem.find_by_id(SUPER_ROOT_UUID), NodeAnchor
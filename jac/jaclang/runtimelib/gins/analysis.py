@@ -0,0 +1,205 @@
+"""Hot path and phase change detection over GINS CFG counters.
+
+The analysis works on plain counter lists so it applies both to the live CFGs
+of a running ghost and to snapshots read back from a binary profile. Counters
+are compared per window (the increments between two observations), so a
+program that switches from one loop to another, or whose branches start going
+the other way, shows up as a change even when the cumulative counts barely
+move.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterator, Optional, Sequence
+
+from jaclang.runtimelib.gins.cfg import CFG
+from jaclang.runtimelib.gins.profile import ProfileReader
+
+Edge = tuple[int, int]
+
+
+@dataclass
+class PhaseChange:
+    """A window whose branch behaviour differs from the one before it."""
+
+    key: str
+    snapshot: int
+    timestamp: float
+    distance: float
+    previous_hot_path: list[int]
+    hot_path: list[int]
+    changed_blocks: list[int] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        """Describe the change for logs and prompts."""
+        return (
+            f"{self.key} @ snapshot {self.snapshot}: hot path "
+            f"{' -> '.join(f'bb{b}' for b in self.previous_hot_path)} became "
+            f"{' -> '.join(f'bb{b}' for b in self.hot_path)} "
+            f"(distance {self.distance:.2f}, blocks "
+            f"{', '.join(f'bb{b}' for b in self.changed_blocks)})"
+        )
+
+
+def edge_probabilities(
+    edges: Sequence[Edge], edge_counts: Sequence[int]
+) -> list[float]:
+    """Probability of taking each edge when leaving its source block."""
+    out_totals: dict[int, int] = {}
+    for (src, _), count in zip(edges, edge_counts):
+        out_totals[src] = out_totals.get(src, 0) + count
+    return [
+        count / out_totals[src] if out_totals[src] else 0.0
+        for (src, _), count in zip(edges, edge_counts)
+    ]
+
+
+def hot_path(
+    edges: Sequence[Edge], edge_counts: Sequence[int], entry: Optional[int] = None
+) -> list[int]:
+    """Follow the most frequent out edge from `entry` until a block repeats.
+
+    Without an explicit entry the path starts at bb0 if it was left in this
+    window, otherwise at the source of the most frequently taken edge.
+    """
+    best: dict[int, tuple[int, int]] = {}
+    for (src, dst), count in zip(edges, edge_counts):
+        if count and (src not in best or count > best[src][0]):
+            best[src] = (count, dst)
+    if entry is None:
+        entry = 0 if 0 in best or not best else max(best, key=lambda b: best[b][0])
+    path = [entry]
+    seen = {entry}
+    while path[-1] in best:
+        nxt = best[path[-1]][1]
+        path.append(nxt)
+        if nxt in seen:
+            break
+        seen.add(nxt)
+    return path
+
+
+def branch_distance(
+    edges: Sequence[Edge], before: Sequence[int], after: Sequence[int]
+) -> tuple[float, list[int]]:
+    """Distance in [0, 1] between the branch behaviour of two counter windows.
+
+    Each source block contributes the total variation distance between its out
+    edge distributions, weighted by its average share of the traversals in the
+    two windows. A block only executed in one of the windows counts as fully
+    changed. Returns the distance and the blocks that contributed to it.
+    """
+    totals_before: dict[int, int] = {}
+    totals_after: dict[int, int] = {}
+    for (src, _), count_before, count_after in zip(edges, before, after):
+        totals_before[src] = totals_before.get(src, 0) + count_before
+        totals_after[src] = totals_after.get(src, 0) + count_after
+    sum_before = sum(totals_before.values())
+    sum_after = sum(totals_after.values())
+    if not sum_before or not sum_after:
+        return 0.0, []
+
+    variation: dict[int, float] = {}
+    for (src, _), count_before, count_after in zip(edges, before, after):
+        if not totals_before[src] or not totals_after[src]:
+            variation[src] = 1.0
+            continue
+        diff = abs(count_before / totals_before[src] - count_after / totals_after[src])
+        variation[src] = variation.get(src, 0.0) + diff / 2
+
+    distance = 0.0
+    changed = []
+    for src, tv in variation.items():
+        weight = (totals_before[src] / sum_before + totals_after[src] / sum_after) / 2
+        if tv and weight:
+            distance += weight * tv
+            changed.append(src)
+    return distance, sorted(changed)
+
+
+class HotPathAnalyzer:
+    """Flags phase changes between consecutive windows of CFG counters."""
+
+    def __init__(self, threshold: float = 0.25, min_transitions: int = 32) -> None:
+        """Initialize the analyzer.
+
+        `threshold` is the branch_distance above which a window is reported and
+        `min_transitions` the number of edge traversals a window needs before
+        it is compared, smaller windows keep accumulating.
+        """
+        self.threshold = threshold
+        self.min_transitions = min_transitions
+        self.num_snapshots = 0
+        # edge probability vector of the last complete window of each CFG
+        self.edge_probabilities: dict[str, list[float]] = {}
+        # counters at the last window boundary and the last complete window
+        self.__last_counts: dict[str, list[int]] = {}
+        self.__last_window: dict[str, list[int]] = {}
+
+    def observe(
+        self,
+        key: str,
+        edges: Sequence[Edge],
+        edge_counts: Sequence[int],
+        snapshot: int,
+        timestamp: float,
+    ) -> Optional[PhaseChange]:
+        """Feed the cumulative edge counts of one CFG."""
+        last = self.__last_counts.get(key, [0] * len(edges))
+        window = [cur - prev for cur, prev in zip(edge_counts, last)]
+        if sum(window) < self.min_transitions:
+            return None
+        self.__last_counts[key] = list(edge_counts)
+        self.edge_probabilities[key] = edge_probabilities(edges, window)
+        previous = self.__last_window.get(key)
+        self.__last_window[key] = window
+        if previous is None:
+            return None
+
+        distance, changed = branch_distance(edges, previous, window)
+        if distance < self.threshold:
+            return None
+        return PhaseChange(
+            key=key,
+            snapshot=snapshot,
+            timestamp=timestamp,
+            distance=distance,
+            previous_hot_path=hot_path(edges, previous),
+            hot_path=hot_path(edges, window),
+            changed_blocks=changed,
+        )
+
+    def update(self, cfgs: dict[str, CFG], timestamp: float) -> list[PhaseChange]:
+        """Observe the current counters of live CFGs."""
+        events = []
+        for key, cfg in cfgs.items():
+            event = self.observe(
+                key,
+                list(cfg.edge_counts),
+                list(cfg.edge_counts.values()),
+                self.num_snapshots,
+                timestamp,
+            )
+            if event:
+                events.append(event)
+        self.num_snapshots += 1
+        return events
+
+
+def analyze_profile(
+    reader: ProfileReader, threshold: float = 0.25, min_transitions: int = 32
+) -> Iterator[PhaseChange]:
+    """Replay a recorded profile through a HotPathAnalyzer."""
+    analyzer = HotPathAnalyzer(threshold, min_transitions)
+    for snapshot in reader.iter_snapshots():
+        for key, edge_counts in snapshot.edge_counts.items():
+            event = analyzer.observe(
+                key,
+                reader.cfgs[key].edges,
+                edge_counts,
+                snapshot.index,
+                snapshot.timestamp,
+            )
+            if event:
+                yield event
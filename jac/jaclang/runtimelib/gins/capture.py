@@ -0,0 +1,130 @@
+"""Sampled, size-bounded capture of variable values for GINS.
+
+Instead of deep copying every annotated variable on every traced event, the
+tracers sample variables at basic block entries only (every `rate`-th entry
+per thread) and store a shallow ValueSummary of each value in a ring buffer
+holding the last `history` samples per variable.
+"""
+
+from __future__ import annotations
+
+import reprlib
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass
+from itertools import islice
+from numbers import Real
+from typing import Any, Optional
+
+# elements looked at for the min/max and hash of a container
+MAX_ITEMS = 4096
+# characters kept from the repr of a value
+MAX_REPR = 80
+
+# reprs only look at the first elements of containers, however large
+_repr = reprlib.Repr()
+_repr.maxlevel = 2
+_repr.maxlist = _repr.maxtuple = _repr.maxset = _repr.maxfrozenset = 8
+_repr.maxdeque = _repr.maxarray = _repr.maxdict = 8
+_repr.maxstring = _repr.maxother = _repr.maxlong = MAX_REPR
+
+
+@dataclass(frozen=True)
+class ValueSummary:
+    """Shallow description of a variable value at one point of the run."""
+
+    type: str
+    repr: str
+    length: Optional[int] = None
+    min: Optional[Real] = None
+    max: Optional[Real] = None
+    hash: Optional[int] = None
+
+    def __str__(self) -> str:
+        """Describe the value compactly for prompts."""
+        if self.length is None:
+            return self.repr
+        desc = f"{self.type}(len={self.length}"
+        if self.min is not None:
+            desc += f", min={self.min}, max={self.max}"
+        return desc + ")"
+
+
+def _truncate(text: str) -> str:
+    return text if len(text) <= MAX_REPR else text[: MAX_REPR - 3] + "..."
+
+
+def summarize(value: Any) -> ValueSummary:  # noqa: ANN401
+    """Summarize a value without copying it.
+
+    Containers are described by their length and, for numeric sequences,
+    their min and max; only the first MAX_ITEMS elements are inspected, also
+    for the hash. Reprs are cut short with reprlib.
+    """
+    type_name = type(value).__name__
+    try:
+        text = _truncate(_repr.repr(value))
+    except Exception:
+        text = f"<{type_name}>"
+    length = None
+    if not isinstance(value, (str, bytes)):
+        with suppress(Exception):
+            length = len(value)
+    if length is None:
+        try:
+            value_hash = hash(value)
+        except TypeError:
+            value_hash = None
+        return ValueSummary(type=type_name, repr=text, hash=value_hash)
+
+    low = high = value_hash = None
+    if isinstance(value, (list, tuple, range, set, frozenset, deque)):
+        items = list(islice(value, MAX_ITEMS))
+        if items and all(
+            isinstance(item, Real) and not isinstance(item, bool) for item in items
+        ):
+            low, high = min(items), max(items)
+        # hashing the container itself would scan all of its elements
+        with suppress(TypeError):
+            value_hash = hash(tuple(items)) if items else None
+    return ValueSummary(
+        type=type_name, repr=text, length=length, min=low, max=high, hash=value_hash
+    )
+
+
+class VariableSampler:
+    """Ring buffers of the last sampled summaries of each variable of a thread.
+
+    Written only by the thread that owns it; readers copy the deques.
+    """
+
+    def __init__(self, rate: int = 1, history: int = 8) -> None:
+        """Sample every `rate`-th block entry (0 disables), keep `history`."""
+        self.rate = rate
+        self.history = history
+        self.countdown = 1 if rate > 0 else -1
+        # module -> (offset of the latest sample, {variable: latest summary})
+        self.latest: dict[str, tuple[int, dict[str, ValueSummary]]] = {}
+        # module -> {variable: deque of (offset, summary)}
+        self.samples: dict[str, dict[str, deque]] = {}
+
+    def should_sample(self) -> bool:
+        """Count a block entry, returning True when it is to be sampled."""
+        if self.countdown < 0:
+            return False
+        self.countdown -= 1
+        if self.countdown:
+            return False
+        self.countdown = self.rate
+        return True
+
+    def record(self, module: str, offset: int, values: dict[str, Any]) -> None:
+        """Summarize and store the variable values seen at `offset`."""
+        summaries = {name: summarize(value) for name, value in values.items()}
+        self.latest[module] = (offset, summaries)
+        module_samples = self.samples.setdefault(module, {})
+        for name, summary in summaries.items():
+            ring = module_samples.get(name)
+            if ring is None:
+                ring = module_samples[name] = deque(maxlen=self.history)
+            ring.append((offset, summary))
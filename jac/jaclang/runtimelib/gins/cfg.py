@@ -3,8 +3,10 @@
 
 import marshal
 import dis
+import os
+import types
 from collections import defaultdict
-from typing import List, Optional, Iterator
+from typing import Dict, List, Optional, Iterator
 
 
 class BytecodeOp:
@@ -34,11 +36,8 @@ class BytecodeOp:
             "JUMP_ABSOLUTE",
             "JUMP_FORWARD",
             "JUMP_BACKWARD",
-            "POP_JUMP_IF_TRUE",
-            "POP_JUMP_IF_FALSE",
-            "JUMP_IF_TRUE_OR_POP",
-            "JUMP_IF_FALSE_OR_POP",
-        }
+            "JUMP_BACKWARD_NO_INTERRUPT",
+        } or self.is_conditional_branch()
 
     def is_conditional_branch(self) -> bool:
         return self.op in {
@@ -47,16 +46,27 @@ class BytecodeOp:
             "JUMP_IF_FALSE_OR_POP",
             "POP_JUMP_IF_TRUE",
             "POP_JUMP_IF_FALSE",
+            "POP_JUMP_IF_NONE",
+            "POP_JUMP_IF_NOT_NONE",
+            # Python 3.11 spells out the jump direction
+            "POP_JUMP_FORWARD_IF_TRUE",
+            "POP_JUMP_FORWARD_IF_FALSE",
+            "POP_JUMP_FORWARD_IF_NONE",
+            "POP_JUMP_FORWARD_IF_NOT_NONE",
+            "POP_JUMP_BACKWARD_IF_TRUE",
+            "POP_JUMP_BACKWARD_IF_FALSE",
+            "POP_JUMP_BACKWARD_IF_NONE",
+            "POP_JUMP_BACKWARD_IF_NOT_NONE",
         }
 
     def is_relative_branch(self) -> bool:
         return False
 
     def is_return(self) -> bool:
-        return self.op == "RETURN_VALUE"
+        return self.op in {"RETURN_VALUE", "RETURN_CONST"}
 
     def is_raise(self) -> bool:
-        return self.op == "RAISE_VARARGS"
+        return self.op in {"RAISE_VARARGS", "RERAISE"}
 
     def is_for_iter(self) -> bool:
         return self.op == "FOR_ITER"
@@ -75,6 +85,8 @@ class Block:
     def __init__(self, id: int, instructions: List):
         self.id: int = id
         self.instructions = instructions
+        self.start_offset: int = instructions[0].offset
+        self.end_offset: int = instructions[-1].get_next_instruction_offset()
         self.exec_count = 0
         # Potentially use offset instead
         self.bytecode_offsets = set(
@@ -87,11 +99,36 @@ class Block:
 
 
 class BlockMap:
-    def __init__(self) -> None:
+    def __init__(self, max_offset: int = 0) -> None:
         self.idx_to_block: Dict[int, Block] = {}
+        # dense offset -> block id tables indexed by offset // 2 (offsets are
+        # even), -1 where no block covers / starts at the offset
+        self.offset_to_block: List[int] = [-1] * (max_offset // 2)
+        self.start_to_block: List[int] = [-1] * (max_offset // 2)
 
     def add_block(self, idx, block):
         self.idx_to_block[idx] = block
+        start, end = block.start_offset // 2, block.end_offset // 2
+        if end > len(self.offset_to_block):
+            grow = [-1] * (end - len(self.offset_to_block))
+            self.offset_to_block.extend(grow)
+            self.start_to_block.extend(grow)
+        self.offset_to_block[start:end] = [idx] * (end - start)
+        self.start_to_block[start] = idx
+
+    def block_at(self, offset: int) -> Optional[int]:
+        """Id of the block whose instructions cover `offset`."""
+        slot = offset >> 1
+        if 0 <= slot < len(self.offset_to_block) and self.offset_to_block[slot] >= 0:
+            return self.offset_to_block[slot]
+        return None
+
+    def block_starting_at(self, offset: int) -> Optional[int]:
+        """Id of the block whose first instruction is at `offset`."""
+        slot = offset >> 1
+        if 0 <= slot < len(self.start_to_block) and self.start_to_block[slot] >= 0:
+            return self.start_to_block[slot]
+        return None
 
     def __repr__(self) -> str:
         result = []
@@ -103,8 +140,29 @@ class BlockMap:
         return self.__repr__()
 
 
+def cfg_key(code_object: types.CodeType) -> str:
+    """Stable name of a code object's CFG: module, qualified name and first line.
+
+    Both CfgGenPass and the tracers use it, so a CFG built at compile time is
+    matched with the frames executing the same code at runtime.
+    """
+    module = os.path.splitext(os.path.basename(code_object.co_filename))[0]
+    return f"{module}.{code_object.co_qualname}:{code_object.co_firstlineno}"
+
+
+def iter_code_objects(code_object: types.CodeType) -> Iterator[types.CodeType]:
+    """Yield a code object and every code object nested in its constants."""
+    yield code_object
+    for const in code_object.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from iter_code_objects(const)
+
+
 def disassemble_bytecode(bytecode):
-    code_object = marshal.loads(bytecode)
+    return disassemble_code(marshal.loads(bytecode))
+
+
+def disassemble_code(code_object: types.CodeType):
     instructions = []
     for i, instr in enumerate(dis.get_instructions(code_object)):
         instructions.append(
@@ -118,25 +176,25 @@ def disassemble_bytecode(bytecode):
             )
         )
         # set offest size for calculating next instruction
-        # last instruction is default of 0, but shouldn't be needed
         if i != 0:
             instruction = instructions[i - 1]
             instruction.set_offset_size(instr.offset - instructions[i - 1].offset)
+    # the last instruction is a single code unit (return/raise have no caches)
+    if instructions:
+        instructions[-1].set_offset_size(2)
     return instructions
 
 
 def create_BBs(instructions: List[BytecodeOp]) -> BlockMap:
     block_starts = set([0])
-    block_map = BlockMap()
-    num_instr = len(instructions)
+    max_offset = instructions[-1].get_next_instruction_offset()
+    block_map = BlockMap(max_offset)
 
     # Create offset to index mapping
     offset_to_index = {instr.offset: idx for idx, instr in enumerate(instructions)}
-    max_offset = instructions[-1].get_next_instruction_offset()
-    # print(f"Offset to Index Mapping: {offset_to_index}")
 
     def valid_offset(offset):
-        return offset >= 0 and offset <= max_offset
+        return offset >= 0 and offset < max_offset
 
     # Identify all block starts
     for instr in instructions:
@@ -156,17 +214,12 @@ def create_BBs(instructions: List[BytecodeOp]) -> BlockMap:
     # instructions give a range for instructions each BB will hold
     block_starts_ordered = sorted(block_starts)
     for block_id, start_offset in enumerate(block_starts_ordered):
-        end_offset = (
-            block_starts_ordered[block_id + 1]
+        start_index = offset_to_index[start_offset]
+        end_index = (
+            offset_to_index[block_starts_ordered[block_id + 1]]
             if block_id + 1 < len(block_starts_ordered)
-            else instructions[-1].get_next_instruction_offset()
+            else len(instructions)
         )
-        start_index = offset_to_index[start_offset]
-        end_index = offset_to_index[end_offset]
-
-        # capture last instruction if the BB only has 1
-        if start_index == end_index:
-            end_index += 1
 
         # Collect instructions for this block
         block_instrs = instructions[start_index:end_index]
@@ -179,21 +232,76 @@ class CFG:
         self.nodes = set()
         self.edges = {}
         self.edge_counts = {}
+        # per block successor table: target block start offset -> target block id
+        self.successors = {}
         self.block_map = block_map
 
     def add_node(self, node_id):
         self.nodes.add(node_id)
         if node_id not in self.edges:
             self.edges[node_id] = []
+            self.successors[node_id] = {}
 
     def add_edge(self, from_node, to_node):
-        if from_node in self.edges:
-            self.edges[from_node].append(to_node)
-        else:
-            self.edges[from_node] = to_node
+        # a conditional jump to the next instruction is the same edge twice
+        if (from_node, to_node) in self.edge_counts:
+            return
+        self.add_node(from_node)
+        self.edges[from_node].append(to_node)
+        target_offset = self.block_map.idx_to_block[to_node].start_offset
+        self.successors[from_node][target_offset] = to_node
 
         self.edge_counts[(from_node, to_node)] = 0
 
+    def record_block_counts(self, block_counts: list, edge_counts: list) -> None:
+        """Add counts drained from the tracer's BlockCounters for this CFG."""
+        for block_id, count in enumerate(block_counts):
+            self.block_map.idx_to_block[block_id].exec_count += count
+        for edge, count in zip(self.edge_counts, edge_counts):
+            self.edge_counts[edge] += count
+
+    def record_transitions(self, entries: int, transitions: dict) -> None:
+        """Add counts reported by a branch-event tracker to the CFG.
+
+        `transitions` maps taken (source offset, destination offset) jumps to how
+        often they were taken and `entries` is how often the code object started.
+        Fall-through edges raise no event, so they are derived in block order from
+        each block's execution count minus its measured out edges.
+        """
+        incoming = defaultdict(int)
+        outgoing = defaultdict(int)
+        for (src_offset, dst_offset), count in transitions.items():
+            src = self.block_map.block_at(src_offset)
+            if src is None:
+                continue
+            dst = self.successors[src].get(dst_offset)
+            if dst is None:
+                dst = self.block_map.block_at(dst_offset)
+                # branches that stay within a block (e.g. FOR_ITER continuing)
+                # are not edges, jumps back to the block start are
+                if dst is None or src == dst:
+                    continue
+            if (src, dst) in self.edge_counts:
+                self.edge_counts[(src, dst)] += count
+            incoming[dst] += count
+            outgoing[src] += count
+
+        fall_through = 0
+        for block_id in sorted(self.block_map.idx_to_block):
+            block = self.block_map.idx_to_block[block_id]
+            exec_count = incoming[block_id] + fall_through
+            if block_id == 0:
+                exec_count += entries
+            block.exec_count += exec_count
+
+            fall_through = 0
+            last_instr = block.instructions[-1]
+            if last_instr.is_branch() or last_instr.is_return() or last_instr.is_raise():
+                continue
+            if (block_id, block_id + 1) in self.edge_counts:
+                fall_through = max(exec_count - outgoing[block_id], 0)
+                self.edge_counts[(block_id, block_id + 1)] += fall_through
+
     def display_instructions(self):
         return repr(self.block_map)
 
@@ -240,45 +348,39 @@ def create_cfg(block_map: BlockMap) -> CFG:
         last_instr = block.instructions[-1]
         if first_instr.is_for_iter():
             # get the BB that starts with END_FOR
-            end_for_offset = first_instr.argval
-            end_for_block = find_block_by_offset(block_map, end_for_offset)
+            end_for_block = block_map.block_at(first_instr.argval)
             if end_for_block is not None:
                 cfg.add_edge(block_id, end_for_block)
 
         # handle jumps
         if last_instr.is_branch():
-            target_offset = last_instr.argval
-            target_block = find_block_by_offset(block_map, target_offset)
+            target_block = block_map.block_at(last_instr.argval)
             if target_block is not None:
                 cfg.add_edge(block_id, target_block)
             if last_instr.is_conditional_branch():
-                fall_through_offset = block.instructions[
-                    -1
-                ].get_next_instruction_offset()
-                fall_through_block = find_block_by_offset(
-                    block_map, fall_through_offset
-                )
+                fall_through_block = block_map.block_at(block.end_offset)
                 if fall_through_block is not None:
                     cfg.add_edge(block_id, fall_through_block)
 
         # handle fall-through to the next block for non-control flow instructions
         else:
-            fall_through_offset = block.instructions[-1].get_next_instruction_offset()
-            fall_through_block = find_block_by_offset(block_map, fall_through_offset)
-            if (
-                fall_through_block is not None
-                and fall_through_offset != last_instr.offset
-            ):
+            fall_through_block = block_map.block_at(block.end_offset)
+            if fall_through_block is not None:
                 cfg.add_edge(block_id, fall_through_block)
 
     return cfg
 
 
+def create_code_cfgs(code_object: types.CodeType) -> Dict[str, CFG]:
+    """Build the CFGs of a module code object and all of its nested functions."""
+    return {
+        cfg_key(code): create_cfg(create_BBs(disassemble_code(code)))
+        for code in iter_code_objects(code_object)
+    }
+
+
 def find_block_by_offset(block_map: BlockMap, offset: int) -> int:
-    for block_id, block in block_map.idx_to_block.items():
-        if any(instr.offset == offset for instr in block.instructions):
-            return block_id
-    return None
+    return block_map.block_at(offset)
 
 
 def visualize_cfg(cfg: CFG):
@@ -1,23 +1,31 @@
 """The Shell Ghost code for gins
 """
 
+import logging
 import os
 import threading
 import time
-import logging
+from typing import Optional
 
-from jaclang.runtimelib.gins.model import Gemini
-from jaclang.runtimelib.gins.tracer import CFGTracker, CfgDeque
+from jaclang.runtimelib.gins.analysis import HotPathAnalyzer
+from jaclang.runtimelib.gins.model import BaseModel, get_model
+from jaclang.runtimelib.gins.profile import ProfileWriter
+from jaclang.runtimelib.gins.tracer import CfgDeque, MonitoringCFGTracker, make_tracker
+from jaclang.settings import settings
 
 
+logger = logging.getLogger(__name__)
+
 # Helper class to maintain a fixed deque size
 
 
 class ShellGhost:
-    def __init__(self):
+    def __init__(
+        self, profile_path: Optional[str] = None, model: Optional[str] = None
+    ):
         self.cfgs = None
         self.cfg_cv = threading.Condition()
-        self.tracker = CFGTracker()
+        self.tracker = make_tracker()
         self.sem_ir = None
 
         self.finished_exception_lock = threading.Lock()
@@ -25,28 +33,26 @@ class ShellGhost:
         self.finished = False
         self.variable_values = None
 
-        self.model = Gemini()
+        # created on first prompt so runs that never prompt skip the import
+        self.model_name = model
+        self.__model: Optional[BaseModel] = None
+        self.__static_prompt: Optional[str] = None
 
         self.deque_lock = threading.Lock()
         self.__cfg_deque_dict = dict()
         self.__cfg_deque_size = 10
 
-        self.logger = logging.getLogger()
-        if self.logger.hasHandlers():
-          self.logger.handlers.clear()
-        logging.basicConfig(
-        level=logging.INFO,             # Set the log level
-        format='%(asctime)s - %(message)s', # Set the log message format
-        datefmt='%Y-%m-%d %H:%M:%S',    # Set the timestamp format
-          handlers=[
-              logging.FileHandler("test.txt", mode='a'),  # Log to a file in append mode
-          ]
-        )
-        
+        self.profile = ProfileWriter(profile_path or settings.gins_profile)
+        self.analyzer = HotPathAnalyzer()
+        self.phase_changes = []
+        self.__prompted_phase_changes = 0
 
     def set_cfgs(self, cfgs):
         self.cfg_cv.acquire()
         self.cfgs = cfgs
+        self.__static_prompt = None
+        self.tracker.register_cfgs(cfgs)
+        self.profile.register_cfgs(cfgs)
         self.cfg_cv.notify()
         self.cfg_cv.release()
 
@@ -57,9 +63,67 @@ class ShellGhost:
         self.__cfg_deque_dict[module].add_cfg(cfg)
         self.deque_lock.release()
 
+    @property
+    def model(self) -> BaseModel:
+        if self.__model is None:
+            self.__model = get_model(self.model_name)
+        return self.__model
+
+    def static_prompt(self) -> str:
+        """Instructions and semantic IR, the part of every prompt fixed per program"""
+        if self.__static_prompt is None:
+            ins_string = ""
+            for module, cfg in self.cfgs.items():
+                ins_string += f"Module: {module}\n{cfg.display_instructions()}"
+            self.__static_prompt = (
+                "I have a program.\n"
+                f"Instructions per basic block:\n{ins_string}\n"
+                f"Semantic and Type information from source code:\n{self.sem_ir.pp()}\n"
+            )
+        return self.__static_prompt
+
+    def dynamic_prompt(self, with_history: bool = True) -> str:
+        """Recorded CFGs and variable values, the part of a prompt that changes"""
+        cfg_string = ""
+        for module, cfg in self.cfgs.items():
+            if with_history:
+                cfg_history = "None at this time"
+                if module in self.__cfg_deque_dict:
+                    cfg_history = self.__cfg_deque_dict[module].get_cfg_repr()
+                cfg_string += f"Module: {module}\n{cfg_history}"
+            else:
+                cfg_string += f"Module: {module}\n{cfg}"
+        if with_history:
+            prompt = f"Up to last {self.__cfg_deque_size} CFGs recorded:\n{cfg_string}"
+        else:
+            prompt = f"CFGs:\n{cfg_string}"
+
+        if self.variable_values != None:
+            prompt += "\nCurrent variable values at the specified bytecode offset:"
+
+            for module, var_map in self.variable_values.items():
+                variables = ", ".join(
+                    f"{name}: {summary}" for name, summary in var_map[1].items()
+                )
+                prompt += f"\nModule {module}: Offset: {var_map[0]}, Variables: {{{variables}}}"
+        return prompt
+
     def get_cfg_deque_repr(self):
         return self.__cfg_deque.display_cfgs()
 
+    def has_new_phase_changes(self) -> bool:
+        """Whether the hot path changed since the last prompt listing the changes"""
+        return len(self.phase_changes) > self.__prompted_phase_changes
+
+    def phase_change_prompt(self) -> str:
+        """Hot path changes found by the local analysis, marked as prompted"""
+        if not self.phase_changes:
+            return ""
+        self.__prompted_phase_changes = len(self.phase_changes)
+        return "\nDetected changes of the hot path (as basic blocks):" + "".join(
+            f"\n{event}" for event in self.phase_changes
+        )
+
     def start_ghost(self):
         self.__ghost_thread = threading.Thread(target=self.worker)
         self.__ghost_thread.start()
@@ -167,28 +231,7 @@ class ShellGhost:
       print("\nGin Analysis(With static info):\n", response)
 
     def prompt_llm(self, verbose: bool = False):
-        prompt = """I have a program.
-        {cfgs},
-        Instructions per basic block:
-        {instructions}
-        Semantic and Type information from source code:
-        {sem_ir}"""
-
-        cfg_string = ""
-        ins_string = ""
-        for module, cfg in self.cfgs.items():
-            cfg_string += f"Module: {module}\n{cfg}"
-            ins_string += f"Module: {module}\n{cfg.display_instructions()}"
-
-        prompt = prompt.format(
-            cfgs=cfg_string, instructions=ins_string, sem_ir=self.sem_ir.pp()
-        )
-
-        if self.variable_values != None:
-            prompt += "\nCurrent variable values at the specified bytecode offset:"
-
-            for module, var_map in self.variable_values.items():
-                prompt += f"\nModule {module}: Offset: {var_map[0]}, Variables: {str(var_map[1])}"
+        prompt = self.dynamic_prompt(with_history=False)
 
         self.finished_exception_lock.acquire()
 
@@ -202,43 +245,15 @@ class ShellGhost:
         # prompt += "\n If variable values are available, reason about at what point did a variable cause an issue"
         prompt += "\n Please use the following information fill in predicted_edges[freq] for each BB edge with something completely random"
         if verbose:
-            print(prompt)
+            print(self.static_prompt() + prompt)
 
-        response = self.model.generate(prompt)
+        response = self.model.generate_cached(self.static_prompt(), prompt)
 
         print("\nGin Analysis:\n", response)
         return response
 
     def prompt_llm_with_history(self, verbose: bool = False):
-        prompt = """I have a program.
-        Up to last {history_size} CFGs recorded:
-        {cfgs},
-        Instructions per basic block:
-        {instructions}
-        Semantic and Type information from source code:
-        {sem_ir}"""
-
-        cfg_string = ""
-        ins_string = ""
-        for module, cfg in self.cfgs.items():
-            cfg_history = "None at this time"
-            if module in self.__cfg_deque_dict:
-              cfg_history = self.__cfg_deque_dict[module].get_cfg_repr()
-            cfg_string += f"Module: {module}\n{cfg_history}"
-            ins_string += f"Module: {module}\n{cfg.display_instructions()}"
-
-        prompt = prompt.format(
-            history_size=self.__cfg_deque_size,
-            cfgs=cfg_string, 
-            instructions=ins_string, 
-            sem_ir=self.sem_ir.pp()
-        )
-
-        if self.variable_values != None:
-            prompt += "\nCurrent variable values at the specified bytecode offset:"
-
-            for module, var_map in self.variable_values.items():
-                prompt += f"\nModule {module}: Offset: {var_map[0]}, Variables: {str(var_map[1])}"
+        prompt = self.dynamic_prompt()
 
         self.finished_exception_lock.acquire()
 
@@ -249,50 +264,27 @@ class ShellGhost:
 
         prompt += "\nCan you identity bottlneck optimizations or where the code can error out?"
         prompt += "\n(Reason about the program using cfg history, semantic and type information. Users will not have access to BB information, so try to reason about the logic and frequencies of blocks instead.)"
+        prompt += self.phase_change_prompt()
         prompt += "\n Additionally, look for any cases where the hot path of the code appears to change at some point in the program"
         prompt += "\n If variable values are available, can you provide tracing information to help find the root cause of any issues?"
 
         if verbose:
-            print(prompt)
+            print(self.static_prompt() + prompt)
 
-        response = self.model.generate(prompt)
+        response = self.model.generate_cached(self.static_prompt(), prompt)
 
 
         return response
-    def prompt_for_runtime(self, verbose: bool = False):
-        prompt = """I have a program.
-        Up to last {history_size} CFGs recorded:
-        {cfgs},
-        Instructions per basic block:
-        {instructions}
-        Semantic and Type information from source code:
-        {sem_ir}"""
-
-        cfg_string = ""
-        ins_string = ""
-        for module, cfg in self.cfgs.items():
-            cfg_history = "None at this time"
-            if module in self.__cfg_deque_dict:
-              cfg_history = self.__cfg_deque_dict[module].get_cfg_repr()
-            cfg_string += f"Module: {module}\n{cfg_history}"
-            ins_string += f"Module: {module}\n{cfg.display_instructions()}"
-
-        prompt = prompt.format(
-            history_size=self.__cfg_deque_size,
-            cfgs=cfg_string, 
-            instructions=ins_string, 
-            sem_ir=self.sem_ir.pp()
-        )
-
-        if self.variable_values != None:
-            prompt += "\nCurrent variable values at the specified bytecode offset:"
-
-            for module, var_map in self.variable_values.items():
-                prompt += f"\nModule {module}: Offset: {var_map[0]}, Variables: {str(var_map[1])}"
 
+    def prompt_for_runtime(self, verbose: bool = False):
+        prompt = self.dynamic_prompt()
+        prompt += self.phase_change_prompt()
         prompt+="\n given this information, what is the program behavior? Please express this in short bullets"
-        response = self.model.generate(prompt)
+        if verbose:
+            print(self.static_prompt() + prompt)
+        response = self.model.generate_cached(self.static_prompt(), prompt)
         return response
+
     def worker(self):
         # get static cfgs
         self.cfg_cv.acquire()
@@ -304,60 +296,45 @@ class ShellGhost:
         self.cfg_cv.release()
 
         # Once cv has been notifie, self.cfgs is no longer accessed across threads
-        current_executing_bbs = {}
-
         def update_cfg():
-            exec_insts = self.tracker.get_exec_inst()
+            monitoring = self.tracker.backend == MonitoringCFGTracker.backend
+            if monitoring:
+                exec_data = self.tracker.get_exec_edges()
+            else:
+                exec_data = self.tracker.get_block_counts()
 
             # don't prompt if there's nothing new
-            if exec_insts == {}:
+            if exec_data == {}:
                 return
 
-            for module, offset_list in exec_insts.items():
+            updated = []
+            for module, data in exec_data.items():
+                # code objects CfgGenPass did not build a CFG for
+                if module not in self.cfgs:
+                    continue
                 try:
                     cfg = self.cfgs[module]
-
-                    if (
-                        module not in current_executing_bbs
-                    ):  # this means start at bb0, set exec count for bb0 to 1
-                        current_executing_bbs[module] = 0
-                        cfg.block_map.idx_to_block[0].exec_count = 1
-
-                    for offset in offset_list:
-                        if (
-                            offset
-                            not in cfg.block_map.idx_to_block[
-                                current_executing_bbs[module]
-                            ].bytecode_offsets
-                        ):
-                            for next_bb in cfg.edges[current_executing_bbs[module]]:
-                                if (
-                                    offset
-                                    in cfg.block_map.idx_to_block[
-                                        next_bb
-                                    ].bytecode_offsets
-                                ):
-                                    cfg.edge_counts[
-                                        (current_executing_bbs[module], next_bb)
-                                    ] += 1
-                                    # do some deque op
-                                    cfg.block_map.idx_to_block[next_bb].exec_count += 1
-                                    current_executing_bbs[module] = next_bb
-                                    break
-                        assert (
-                            offset
-                            in cfg.block_map.idx_to_block[
-                                current_executing_bbs[module]
-                            ].bytecode_offsets
-                        )
+                    if monitoring:
+                        entries, transitions = data
+                        cfg.record_transitions(entries, transitions)
+                    else:
+                        block_counts, edge_counts = data
+                        cfg.record_block_counts(block_counts, edge_counts)
+                    updated.append((module, cfg))
                 except Exception as e:
                     self.set_finished(e)
                     print(e)
                     return
 
             self.variable_values = self.tracker.get_variable_values()
-            self.update_cfg_deque(cfg.get_cfg_repr(), module)
-            self.logger.info(cfg.to_json())
+            for module, cfg in updated:
+                self.update_cfg_deque(cfg.get_cfg_repr(), module)
+            if updated:
+                now = time.time()
+                self.profile.write_snapshot(self.cfgs, now)
+                for event in self.analyzer.update(dict(updated), now):
+                    logger.info(f"Phase change: {event}")
+                    self.phase_changes.append(event)
             print(f"CURRENT INPUTS: {self.tracker.get_inputs()}")
 
         self.finished_exception_lock.acquire()
@@ -376,7 +353,12 @@ class ShellGhost:
 
         print("\nUpdating cfgs at the end")
         update_cfg()
-        print(self.prompt_for_runtime())
+        self.profile.close()
+        # the local analysis decides whether the model is worth calling
+        if self.exception or self.has_new_phase_changes():
+            print(self.prompt_for_runtime())
+        else:
+            logger.info("No hot path change detected, the model is not called")
         # print(self.__cfg_deque_dict['hot_path'].get_cfg_repr())
         # self.logger.info(self.prompt_llm())
         
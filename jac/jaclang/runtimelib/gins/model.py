@@ -1,10 +1,30 @@
-from typing import List, TypedDict
+"""Generative AI model integration for GINS.
 
-#for identifying hot edge prediction
+Backends are looked up by name in a registry (see `get_model`), configure
+themselves on first use rather than on construction, and share a prompt cache:
+GINS prompts are split into a static part (instructions and semantic IR, fixed
+for a given program) and a dynamic part (counters, variables, exceptions), and
+the static part is keyed by its content hash so backends that support context
+caching only upload it once and identical requests are answered from memory.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Type, TypedDict
+
+from jaclang.settings import settings
+
+
+# for identifying hot edge prediction
 class Edge(TypedDict):
     edge_to_bb_id: int
     freq: int
 
+
 class BasicBlock(TypedDict):
     bb_id: int
     actual_freq: int
@@ -12,24 +32,157 @@ class BasicBlock(TypedDict):
     predicted_edges: List[Edge]
     actual_edges: List[Edge]
 
+
 class Cfg(TypedDict):
     cfg_bbs: List[BasicBlock]
-"""Generative AI model integration for GINS
-"""
+
+
+def content_hash(text: str) -> str:
+    """Return the hex digest used to key cached prompt parts."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class PromptCache:
+    """Caches backend context handles and responses by content hash."""
+
+    def __init__(self, max_responses: int = 128) -> None:
+        """Initialize the cache, keeping up to `max_responses` responses."""
+        self.max_responses = max_responses
+        # static prompt hash -> backend specific handle (None when unsupported)
+        self.contexts: Dict[str, Any] = {}
+        self.responses: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_response(self, static_key: str, dynamic: str) -> Optional[str]:
+        """Return the cached response to a prompt, if any."""
+        key = (static_key, content_hash(dynamic))
+        if key in self.responses:
+            self.hits += 1
+            self.responses.move_to_end(key)
+            return self.responses[key]
+        self.misses += 1
+        return None
+
+    def put_response(self, static_key: str, dynamic: str, response: str) -> None:
+        """Remember the response to a prompt."""
+        self.responses[(static_key, content_hash(dynamic))] = response
+        while len(self.responses) > self.max_responses:
+            self.responses.popitem(last=False)
+
+
+MODELS: Dict[str, Type[BaseModel]] = {}
+
+
+def register_model(name: str) -> Callable[[Type[BaseModel]], Type[BaseModel]]:
+    """Register a model backend under `name`."""
+
+    def decorator(cls: Type[BaseModel]) -> Type[BaseModel]:
+        MODELS[name] = cls
+        return cls
+
+    return decorator
+
+
+def get_model(name: Optional[str] = None, **kwargs: Any) -> BaseModel:
+    """Create the model backend `name`, defaulting to settings.gins_model."""
+    name = name or settings.gins_model
+    if name not in MODELS:
+        raise ValueError(
+            f"Unknown GINS model '{name}', available: {', '.join(sorted(MODELS))}"
+        )
+    return MODELS[name](**kwargs)
+
+
 class BaseModel:
+    """Base class of GINS model backends.
+
+    Subclasses implement `config` and `_generate`. `config` runs lazily the
+    first time the model is asked for a response.
+    """
+
     def __init__(self, model_name: str = "gemini-1.5-flash", **kwargs):
         self.model_name = model_name
         for key, value in kwargs.items():
             setattr(self, key, value)
-        self.config()
+        self.configured = False
+        self.cache = PromptCache()
 
     def config(self):
         raise NotImplementedError
 
-    def generate(self, prompt: str):
+    def ensure_configured(self) -> None:
+        """Configure the backend if it was not used yet."""
+        if not self.configured:
+            self.configured = True
+            self.config()
+
+    def _generate(self, prompt: str) -> str:
         raise NotImplementedError
 
+    def generate(self, prompt: str) -> str:
+        """Return the response to a single prompt."""
+        self.ensure_configured()
+        return self._generate(prompt)
+
+    def generate_batch(self, prompts: List[str]) -> List[str]:
+        """Return the responses to several prompts, in order."""
+        self.ensure_configured()
+        return [self._generate(prompt) for prompt in prompts]
+
+    def create_context(self, static: str) -> Any:
+        """Upload a static prompt prefix, returning a handle or None."""
+        return None
+
+    def _generate_with_context(self, context: Any, static: str, dynamic: str) -> str:
+        return self._generate(static + dynamic)
+
+    def generate_cached(self, static: str, dynamic: str) -> str:
+        """Return the response to `static + dynamic`, reusing cached work.
+
+        The static part is keyed by its content hash: backends supporting
+        context caching upload it once, and a repeated (static, dynamic) pair
+        is answered without calling the backend at all.
+        """
+        static_key = content_hash(static)
+        response = self.cache.get_response(static_key, dynamic)
+        if response is not None:
+            return response
+        self.ensure_configured()
+        if static_key not in self.cache.contexts:
+            self.cache.contexts[static_key] = self.create_context(static)
+        context = self.cache.contexts[static_key]
+        response = self._generate_with_context(context, static, dynamic)
+        self.cache.put_response(static_key, dynamic, response)
+        return response
+
+
+@register_model("stub")
+class StubModel(BaseModel):
+    """Deterministic offline backend, answers with a digest of the prompt."""
+
+    def __init__(self, model_name: str = "stub", **kwargs):
+        super().__init__(model_name, **kwargs)
+
+    def config(self):
+        self.prompts: List[str] = []
+
+    def _generate(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        lines = prompt.strip().splitlines()
+        return (
+            f"[{self.model_name}] {len(prompt)} chars, "
+            f"sha256 {content_hash(prompt)[:16]}, last line: "
+            f"{lines[-1].strip() if lines else ''}"
+        )
+
+    def generate_structured(self, prompt: str) -> str:
+        self.ensure_configured()
+        self.prompts.append(prompt)
+        return json.dumps(Cfg(cfg_bbs=[]))
 
+
+@register_model("gemini")
 class Gemini(BaseModel):
     def config(self):
         try:
@@ -38,11 +191,8 @@ class Gemini(BaseModel):
             if "api_key" in self.__dict__:
                 genai.configure(api_key=self.api_key)
             else:
-                import os
-
                 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
             self.model = genai.GenerativeModel()
-            import os
         except Exception as e:
             print(
                 "google.generativeai module not present. Please install using 'pip install google.generativeai'."
@@ -50,15 +200,36 @@ class Gemini(BaseModel):
             print("Warning:", e)
             return None
 
-    def generate(self, prompt: str):
+    def _generate(self, prompt: str) -> str:
         response = self.model.generate_content(prompt)
         return response.text
-        
+
+    def create_context(self, static: str) -> Any:
+        # Gemini only caches contexts above a minimum token count, smaller
+        # programs fall back to sending the static part with every prompt
+        try:
+            import google.generativeai as genai
+
+            cached = genai.caching.CachedContent.create(
+                model=f"models/{self.model_name}", contents=[static]
+            )
+            return genai.GenerativeModel.from_cached_content(cached_content=cached)
+        except Exception:
+            return None
+
+    def _generate_with_context(self, context: Any, static: str, dynamic: str) -> str:
+        if context is None:
+            return self._generate(static + dynamic)
+        return context.generate_content(dynamic).text
+
     def generate_structured(self, prompt: str):
         import google.generativeai as genai
+
+        self.ensure_configured()
         response = self.model.generate_content(
-          prompt,
-          generation_config=genai.GenerationConfig(
-          response_mime_type='application/json',
-          response_schema=Cfg),)
+            prompt,
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json", response_schema=Cfg
+            ),
+        )
         return response.text
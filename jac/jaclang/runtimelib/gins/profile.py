@@ -0,0 +1,343 @@
+"""Compact append-only binary log of GINS CFG counters.
+
+A profile file starts with a short header followed by a stream of records, each
+encoded as ``[kind: u8][length: varint][payload]`` so a reader can skip over
+records without decoding them:
+
+* CFG records map a small integer id to a CFG's key and structure (block offset
+  ranges and edges). They are written before the first snapshot using that id.
+* Snapshot records hold, for every CFG that changed since the previous snapshot,
+  the non-zero block and edge counter increments. Indices are gap encoded and
+  all integers are LEB128 varints, so a tick where a hot loop ran costs a few
+  bytes per touched block instead of a full JSON dump of the CFG.
+* Every ``keyframe_interval`` snapshots a keyframe record stores the cumulative
+  counters instead, so the reader can rebuild any snapshot by decoding at most
+  ``keyframe_interval`` records from the closest keyframe.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import struct
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator, Optional
+
+from jaclang.runtimelib.gins.cfg import CFG
+
+MAGIC = b"JACGINS\0"
+VERSION = 1
+
+CFG_RECORD = 1
+SNAPSHOT_RECORD = 2
+KEYFRAME_RECORD = 3
+
+_TIMESTAMP = struct.Struct("<d")
+
+
+def write_varint(out: bytearray, value: int) -> None:
+    """Append an unsigned LEB128 varint."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data: bytes | memoryview, pos: int) -> tuple[int, int]:
+    """Decode an unsigned LEB128 varint, returning (value, next position)."""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _read_stream_varint(stream: BinaryIO) -> Optional[int]:
+    value = shift = 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            return None
+        value |= (byte[0] & 0x7F) << shift
+        if byte[0] < 0x80:
+            return value
+        shift += 7
+
+
+def _write_sparse(out: bytearray, values: list[int]) -> None:
+    """Encode the non-zero entries of a counter list as (index gap, value) pairs."""
+    nonzero = [(idx, val) for idx, val in enumerate(values) if val]
+    write_varint(out, len(nonzero))
+    prev = 0
+    for idx, val in nonzero:
+        write_varint(out, idx - prev)
+        write_varint(out, val)
+        prev = idx
+
+
+def _read_sparse(data: memoryview, pos: int, values: list[int], absolute: bool) -> int:
+    """Decode (index gap, value) pairs into a counter list, returning the position."""
+    count, pos = read_varint(data, pos)
+    idx = 0
+    for _ in range(count):
+        gap, pos = read_varint(data, pos)
+        val, pos = read_varint(data, pos)
+        idx += gap
+        if absolute:
+            values[idx] = val
+        else:
+            values[idx] += val
+    return pos
+
+
+@dataclass
+class CfgLayout:
+    """Structure of a CFG as stored in a profile header record."""
+
+    key: str
+    blocks: list[tuple[int, int]]
+    edges: list[tuple[int, int]]
+
+    @classmethod
+    def from_cfg(cls, key: str, cfg: CFG) -> CfgLayout:
+        """Describe a live CFG."""
+        blocks = [
+            (block.start_offset, block.end_offset)
+            for _, block in sorted(cfg.block_map.idx_to_block.items())
+        ]
+        return cls(key=key, blocks=blocks, edges=list(cfg.edge_counts))
+
+
+@dataclass
+class Snapshot:
+    """Cumulative counters of every CFG at one point of the run."""
+
+    index: int
+    timestamp: float
+    block_counts: dict[str, list[int]] = field(default_factory=dict)
+    edge_counts: dict[str, list[int]] = field(default_factory=dict)
+
+
+class ProfileWriter:
+    """Streams CFG counter snapshots to a binary profile file."""
+
+    def __init__(self, path: str, keyframe_interval: int = 64) -> None:
+        """Initialize the writer, the file is only created on first write."""
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.layouts: dict[str, tuple[int, CfgLayout]] = {}
+        self.last_counts: dict[str, tuple[list[int], list[int]]] = {}
+        self.num_snapshots = 0
+        self.file: Optional[BinaryIO] = None
+
+    def _write_record(self, kind: int, payload: bytearray) -> None:
+        if self.file is None:
+            self.file = open(self.path, "wb")  # noqa: SIM115
+            self.file.write(MAGIC)
+            self.file.write(bytes([VERSION]))
+        header = bytearray([kind])
+        write_varint(header, len(payload))
+        self.file.write(header)
+        self.file.write(payload)
+
+    def register_cfgs(self, cfgs: dict[str, CFG]) -> None:
+        """Write header records for CFGs not seen before."""
+        for key, cfg in cfgs.items():
+            if key in self.layouts:
+                continue
+            layout = CfgLayout.from_cfg(key, cfg)
+            cfg_id = len(self.layouts)
+            self.layouts[key] = (cfg_id, layout)
+            self.last_counts[key] = ([0] * len(layout.blocks), [0] * len(layout.edges))
+
+            payload = bytearray()
+            write_varint(payload, cfg_id)
+            key_bytes = key.encode()
+            write_varint(payload, len(key_bytes))
+            payload += key_bytes
+            write_varint(payload, len(layout.blocks))
+            for start, end in layout.blocks:
+                write_varint(payload, start)
+                write_varint(payload, end - start)
+            write_varint(payload, len(layout.edges))
+            for src, dst in layout.edges:
+                write_varint(payload, src)
+                write_varint(payload, dst)
+            self._write_record(CFG_RECORD, payload)
+
+    def write_snapshot(self, cfgs: dict[str, CFG], timestamp: float) -> None:
+        """Append the counters of `cfgs` as they are now."""
+        self.register_cfgs(cfgs)
+        counts = {
+            key: (
+                [
+                    block.exec_count
+                    for _, block in sorted(cfg.block_map.idx_to_block.items())
+                ],
+                list(cfg.edge_counts.values()),
+            )
+            for key, cfg in cfgs.items()
+        }
+        # Deltas are unsigned, so a counter that went backwards (e.g. after a
+        # reset) forces a keyframe holding the absolute values instead.
+        keyframe = self.num_snapshots % self.keyframe_interval == 0 or any(
+            cur < last
+            for key, (blocks, edges) in counts.items()
+            for cur, last in zip(
+                blocks + edges, self.last_counts[key][0] + self.last_counts[key][1]
+            )
+        )
+        entries = []
+        for key, (blocks, edges) in counts.items():
+            last_blocks, last_edges = self.last_counts[key]
+            if keyframe:
+                if any(blocks) or any(edges):
+                    entries.append((key, blocks, edges))
+            elif blocks != last_blocks or edges != last_edges:
+                entries.append(
+                    (
+                        key,
+                        [cur - last for cur, last in zip(blocks, last_blocks)],
+                        [cur - last for cur, last in zip(edges, last_edges)],
+                    )
+                )
+            self.last_counts[key] = (blocks, edges)
+
+        payload = bytearray(_TIMESTAMP.pack(timestamp))
+        write_varint(payload, len(entries))
+        for key, blocks, edges in entries:
+            write_varint(payload, self.layouts[key][0])
+            _write_sparse(payload, blocks)
+            _write_sparse(payload, edges)
+        self._write_record(KEYFRAME_RECORD if keyframe else SNAPSHOT_RECORD, payload)
+        self.num_snapshots += 1
+        assert self.file is not None
+        self.file.flush()
+
+    def close(self) -> None:
+        """Close the profile file."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class ProfileReader:
+    """Random access to the snapshots of a binary profile file.
+
+    Opening a profile only indexes record positions; counters are decoded on
+    demand, starting from the closest keyframe before the requested snapshot.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Index the records of the profile at `path`."""
+        self.path = path
+        self.cfgs: dict[str, CfgLayout] = {}
+        self._keys_by_id: dict[int, str] = {}
+        # (file position of payload, payload length, is keyframe) per snapshot
+        self._snapshots: list[tuple[int, int, bool]] = []
+        self._index()
+
+    def _index(self) -> None:
+        size = os.path.getsize(self.path)
+        with open(self.path, "rb") as stream:
+            if stream.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a GINS profile")
+            version = stream.read(1)
+            if not version or version[0] != VERSION:
+                raise ValueError(f"Unsupported GINS profile version in {self.path}")
+            while kind := stream.read(1):
+                length = _read_stream_varint(stream)
+                if length is None:
+                    break
+                pos = stream.tell()
+                if pos + length > size:
+                    break  # truncated tail of a profile still being written
+                if kind[0] == CFG_RECORD:
+                    self._read_layout(memoryview(stream.read(length)))
+                else:
+                    self._snapshots.append((pos, length, kind[0] == KEYFRAME_RECORD))
+                    stream.seek(length, io.SEEK_CUR)
+
+    def _read_layout(self, data: memoryview) -> None:
+        cfg_id, pos = read_varint(data, 0)
+        key_len, pos = read_varint(data, pos)
+        key = bytes(data[pos : pos + key_len]).decode()
+        pos += key_len
+        num_blocks, pos = read_varint(data, pos)
+        blocks = []
+        for _ in range(num_blocks):
+            start, pos = read_varint(data, pos)
+            size, pos = read_varint(data, pos)
+            blocks.append((start, start + size))
+        num_edges, pos = read_varint(data, pos)
+        edges = []
+        for _ in range(num_edges):
+            src, pos = read_varint(data, pos)
+            dst, pos = read_varint(data, pos)
+            edges.append((src, dst))
+        self.cfgs[key] = CfgLayout(key=key, blocks=blocks, edges=edges)
+        self._keys_by_id[cfg_id] = key
+
+    def __len__(self) -> int:
+        """Return the number of snapshots in the profile."""
+        return len(self._snapshots)
+
+    def _apply(self, stream: BinaryIO, index: int, snapshot: Snapshot) -> None:
+        pos, length, keyframe = self._snapshots[index]
+        stream.seek(pos)
+        data = memoryview(stream.read(length))
+        if keyframe:
+            # keyframes are sparse, so counters they omit are zero
+            for counts in (snapshot.block_counts, snapshot.edge_counts):
+                for values in counts.values():
+                    values[:] = [0] * len(values)
+        (snapshot.timestamp,) = _TIMESTAMP.unpack_from(data, 0)
+        snapshot.index = index
+        num_entries, offset = read_varint(data, _TIMESTAMP.size)
+        for _ in range(num_entries):
+            cfg_id, offset = read_varint(data, offset)
+            key = self._keys_by_id[cfg_id]
+            layout = self.cfgs[key]
+            blocks = snapshot.block_counts.setdefault(key, [0] * len(layout.blocks))
+            edges = snapshot.edge_counts.setdefault(key, [0] * len(layout.edges))
+            offset = _read_sparse(data, offset, blocks, keyframe)
+            offset = _read_sparse(data, offset, edges, keyframe)
+
+    def snapshot(self, index: int) -> Snapshot:
+        """Rebuild the cumulative counters at snapshot `index`."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Snapshot {index} out of range")
+        start = index
+        while not self._snapshots[start][2]:
+            start -= 1
+        snapshot = Snapshot(index=index, timestamp=0.0)
+        with open(self.path, "rb") as stream:
+            for idx in range(start, index + 1):
+                self._apply(stream, idx, snapshot)
+        return snapshot
+
+    def iter_snapshots(self) -> Iterator[Snapshot]:
+        """Yield every snapshot in order, decoding each record once.
+
+        The same Snapshot object is updated in place and yielded each time.
+        """
+        snapshot = Snapshot(index=0, timestamp=0.0)
+        with open(self.path, "rb") as stream:
+            for idx in range(len(self)):
+                self._apply(stream, idx, snapshot)
+                yield snapshot
+
+    def timeline(self, key: str) -> Iterator[tuple[float, list[int], list[int]]]:
+        """Yield (timestamp, block counts, edge counts) of one CFG per snapshot."""
+        layout = self.cfgs[key]
+        for snapshot in self.iter_snapshots():
+            yield (
+                snapshot.timestamp,
+                list(snapshot.block_counts.get(key, [0] * len(layout.blocks))),
+                list(snapshot.edge_counts.get(key, [0] * len(layout.edges))),
+            )
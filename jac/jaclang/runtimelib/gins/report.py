@@ -0,0 +1,290 @@
+"""Profile-guided optimization report from a recorded GINS profile.
+
+The report is computed offline from the binary profile written by the ghost
+and the code objects of the profiled module, and is deterministic for a given
+profile: block counters are mapped back to .jac source lines through
+co_positions, FOR_ITER blocks give loop trip counts and conditional branches
+with an executed source but an unused out edge are listed as never taken.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import types
+from statistics import median
+from typing import Any, Optional
+
+from jaclang.runtimelib.gins.cfg import (
+    CFG,
+    cfg_key,
+    create_BBs,
+    create_cfg,
+    disassemble_code,
+    iter_code_objects,
+)
+from jaclang.runtimelib.gins.profile import CfgLayout, ProfileReader, Snapshot
+
+
+def offset_lines(code: types.CodeType) -> dict[int, int]:
+    """Map each instruction offset of a code object to its source line."""
+    lines = {}
+    for idx, (line, _, _, _) in enumerate(code.co_positions()):
+        # generated code without a source location is reported at line 0
+        if line:
+            lines[idx * 2] = line
+    return lines
+
+
+def _block_lines(layout: CfgLayout, lines: dict[int, int]) -> list[list[int]]:
+    return [
+        sorted({lines[off] for off in range(start, end, 2) if off in lines})
+        for start, end in layout.blocks
+    ]
+
+
+def _source_lines(path: str) -> list[str]:
+    try:
+        with open(path) as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
+
+
+def _same_layout(layout: CfgLayout, cfg: CFG) -> bool:
+    return layout == CfgLayout.from_cfg(layout.key, cfg)
+
+
+class _Loop:
+    """Edges of a FOR_ITER loop header, as indices into the layout edges."""
+
+    def __init__(self, key: str, header: int, cfg: CFG, layout: CfgLayout) -> None:
+        self.key = key
+        self.header = header
+        header_start = layout.blocks[header][0]
+        exit_block = cfg.block_map.block_at(
+            cfg.block_map.idx_to_block[header].instructions[0].argval
+        )
+        self.entry_edges = []
+        self.body_edges = []
+        self.exit_edges = []
+        for idx, (src, dst) in enumerate(layout.edges):
+            if dst == header and src != header:
+                # back edges come from the loop body, laid out after the header
+                if layout.blocks[src][0] < header_start:
+                    self.entry_edges.append(idx)
+            elif src == header:
+                (self.exit_edges if dst == exit_block else self.body_edges).append(
+                    idx
+                )
+
+    def counts(self, edge_counts: list[int]) -> tuple[int, int]:
+        """Return (loop runs, iterations) for a set of edge counters."""
+        runs = sum(edge_counts[idx] for idx in self.entry_edges)
+        if not runs:
+            runs = sum(edge_counts[idx] for idx in self.exit_edges)
+        iterations = sum(edge_counts[idx] for idx in self.body_edges)
+        return runs, iterations
+
+
+def build_report(
+    reader: ProfileReader,
+    code_object: types.CodeType,
+    top: int = 10,
+    snapshot: Optional[int] = None,
+) -> dict[str, Any]:
+    """Build the report for a profile of the module compiled to `code_object`.
+
+    `snapshot` selects the point of the run to report on, the last one by
+    default. CFGs of the profile that do not match the current code (the
+    module changed since it was profiled) are listed under "skipped".
+    """
+    if len(reader):
+        final = reader.snapshot(-1 if snapshot is None else snapshot)
+    else:
+        final = Snapshot(index=-1, timestamp=0.0)
+    codes = {cfg_key(code): code for code in iter_code_objects(code_object)}
+
+    line_hits: dict[tuple[str, int], int] = {}
+    loops = []
+    branches = []
+    skipped = []
+    for key in sorted(reader.cfgs):
+        layout = reader.cfgs[key]
+        code = codes.get(key)
+        cfg = create_cfg(create_BBs(disassemble_code(code))) if code else None
+        if cfg is None or not _same_layout(layout, cfg):
+            skipped.append(key)
+            continue
+        block_counts = final.block_counts.get(key, [0] * len(layout.blocks))
+        edge_counts = final.edge_counts.get(key, [0] * len(layout.edges))
+        lines = offset_lines(code)
+        block_lines = _block_lines(layout, lines)
+
+        for block_id, block in sorted(cfg.block_map.idx_to_block.items()):
+            first, last = block.instructions[0], block.instructions[-1]
+            count = block_counts[block_id]
+            body_count = count
+            if first.is_for_iter():
+                loop = _Loop(key, block_id, cfg, layout)
+                loops.append((loop, lines.get(block.start_offset)))
+                # the rest of the header only runs when the loop goes on
+                body_count = loop.counts(edge_counts)[1]
+
+            # a line split over several blocks (a loop header, a condition and
+            # the jump back...) ran as often as the most executed of them
+            for instr in block.instructions if count else ():
+                line = lines.get(instr.offset)
+                if line is None:
+                    continue
+                loc = (code.co_filename, line)
+                hits = count if instr is first else body_count
+                line_hits[loc] = max(line_hits.get(loc, 0), hits)
+
+            if not (first.is_for_iter() or last.is_conditional_branch()):
+                continue
+            out_edges = [
+                (idx, dst)
+                for idx, (src, dst) in enumerate(layout.edges)
+                if src == block_id
+            ]
+            if not block_counts[block_id] or len(out_edges) < 2:
+                continue
+            for idx, dst in out_edges:
+                if edge_counts[idx] == 0:
+                    branch_instr = first if first.is_for_iter() else last
+                    branches.append(
+                        {
+                            "cfg": key,
+                            "file": code.co_filename,
+                            "line": lines.get(branch_instr.offset),
+                            "block": block_id,
+                            "executions": block_counts[block_id],
+                            "untaken_block": dst,
+                            "untaken_line": (block_lines[dst] or [None])[0],
+                        }
+                    )
+
+    loop_reports = []
+    for loop, line in loops:
+        layout = reader.cfgs[loop.key]
+        runs, iterations = loop.counts(
+            final.edge_counts.get(loop.key, [0] * len(layout.edges))
+        )
+        if not runs and not iterations:
+            continue
+        loop_reports.append(
+            {
+                "cfg": loop.key,
+                "file": codes[loop.key].co_filename,
+                "line": line,
+                "block": loop.header,
+                "runs": runs,
+                "iterations": iterations,
+                "mean_trips": iterations / runs if runs else None,
+                "window_trips": [],
+            }
+        )
+
+    # per snapshot window trip counts, the distribution over the run
+    if loop_reports and len(reader):
+        last_index = final.index if final.index >= 0 else len(reader) - 1
+        by_header = {(e["cfg"], e["block"]): e for e in loop_reports}
+        active = [
+            (by_header[(loop.key, loop.header)], loop)
+            for loop, _ in loops
+            if (loop.key, loop.header) in by_header
+        ]
+        previous = {id(loop): (0, 0) for _, loop in active}
+        for snap in reader.iter_snapshots():
+            if snap.index > last_index:
+                break
+            for entry, loop in active:
+                if loop.key not in snap.edge_counts:
+                    continue
+                runs, iterations = loop.counts(snap.edge_counts[loop.key])
+                prev_runs, prev_iterations = previous[id(loop)]
+                previous[id(loop)] = (runs, iterations)
+                if runs > prev_runs:
+                    entry["window_trips"].append(
+                        (iterations - prev_iterations) / (runs - prev_runs)
+                    )
+    for entry in loop_reports:
+        trips = entry.pop("window_trips")
+        entry["trip_distribution"] = (
+            {"min": min(trips), "median": median(trips), "max": max(trips)}
+            if trips
+            else None
+        )
+    loop_reports.sort(key=lambda e: (-e["iterations"], e["cfg"], e["block"]))
+
+    sources: dict[str, list[str]] = {}
+    hottest = []
+    for (path, line), count in sorted(
+        line_hits.items(), key=lambda item: (-item[1], item[0])
+    )[:top]:
+        if path not in sources:
+            sources[path] = _source_lines(path)
+        text = sources[path][line - 1].strip() if line <= len(sources[path]) else ""
+        hottest.append({"file": path, "line": line, "count": count, "source": text})
+
+    return {
+        "snapshot": final.index,
+        "timestamp": final.timestamp,
+        "hottest_lines": hottest,
+        "loops": loop_reports,
+        "never_taken_branches": branches,
+        "skipped": skipped,
+    }
+
+
+def report_to_json(report: dict[str, Any]) -> str:
+    """Serialize a report as JSON."""
+    return json.dumps(report, indent=2)
+
+
+def report_to_text(report: dict[str, Any]) -> str:
+    """Render a report for the terminal."""
+
+    def where(entry: dict) -> str:
+        return f"{os.path.basename(entry['file'])}:{entry['line']}"
+
+    out = [f"GINS profile report (snapshot {report['snapshot']})", ""]
+    out.append("Hottest lines:")
+    for entry in report["hottest_lines"]:
+        out.append(f"  {entry['count']:>10}  {where(entry):<24} {entry['source']}")
+    if not report["hottest_lines"]:
+        out.append("  (no executed blocks)")
+
+    out += ["", "Loops:"]
+    for entry in report["loops"]:
+        mean = entry["mean_trips"]
+        line = (
+            f"  {where(entry):<24} runs {entry['runs']}, "
+            f"iterations {entry['iterations']}"
+        )
+        if mean is not None:
+            line += f", trips/run {mean:.2f}"
+        dist = entry["trip_distribution"]
+        if dist:
+            line += (
+                f" (per window min {dist['min']:.2f}, median {dist['median']:.2f},"
+                f" max {dist['max']:.2f})"
+            )
+        out.append(line)
+    if not report["loops"]:
+        out.append("  (no loops executed)")
+
+    out += ["", "Never taken branches:"]
+    for entry in report["never_taken_branches"]:
+        out.append(
+            f"  {where(entry):<24} executed {entry['executions']} times, never "
+            f"went to bb{entry['untaken_block']} (line {entry['untaken_line']})"
+        )
+    if not report["never_taken_branches"]:
+        out.append("  (none)")
+
+    if report["skipped"]:
+        out += ["", "Skipped (code changed since profiling):"]
+        out += [f"  {key}" for key in report["skipped"]]
+    return "\n".join(out)
@@ -0,0 +1,478 @@
+"""Tests for the GINS tracer and CFG primitives."""
+
+import contextlib
+import io
+import marshal
+import os
+import sys
+import tempfile
+import unittest
+
+from jaclang.compiler.compile import jac_file_to_pass
+from jaclang.compiler.semtable import SemRegistry
+from jaclang.runtimelib.gins.analysis import (
+    HotPathAnalyzer,
+    PhaseChange,
+    analyze_profile,
+    branch_distance,
+    hot_path,
+)
+from jaclang.runtimelib.gins.capture import VariableSampler, summarize
+from jaclang.runtimelib.gins.cfg import (
+    CFG,
+    cfg_key,
+    create_BBs,
+    create_cfg,
+    create_code_cfgs,
+    disassemble_bytecode,
+)
+from jaclang.runtimelib.gins.ghost import ShellGhost
+from jaclang.runtimelib.gins.model import Gemini, StubModel, get_model
+from jaclang.runtimelib.gins.profile import ProfileReader, ProfileWriter
+from jaclang.runtimelib.gins.report import build_report, report_to_text
+from jaclang.runtimelib.gins.tracer import (
+    CFGTracker,
+    MonitoringCFGTracker,
+    make_tracker,
+)
+from jaclang.utils.test import TestCase
+
+
+class GinsTests(TestCase):
+    """Test GINS tracing and CFG construction."""
+
+    def setUp(self) -> None:
+        """Set up test."""
+        return super().setUp()
+
+    def compile_fixture(self, fixture: str) -> bytes:
+        """Compile a fixture to marshaled module bytecode."""
+        return jac_file_to_pass(self.fixture_abs_path(fixture)).ir.gen.py_bytecode
+
+    def trace_fixture(self, tracker: CFGTracker, bytecode: bytes) -> None:
+        """Execute module bytecode under a tracker."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracker.start_tracking()
+            try:
+                code = marshal.loads(bytecode)
+                exec(code, {"__name__": "__main__", "__file__": code.co_filename})
+            finally:
+                tracker.stop_tracking()
+
+    def build_cfg(self, bytecode: bytes) -> CFG:
+        """Build the module CFG for marshaled bytecode."""
+        return create_cfg(create_BBs(disassemble_bytecode(bytecode)))
+
+    def test_make_tracker_backend(self) -> None:
+        """The settrace backend is always available as fallback."""
+        self.assertEqual(make_tracker("settrace").backend, "settrace")
+        expected = "monitoring" if hasattr(sys, "monitoring") else "settrace"
+        self.assertEqual(make_tracker("monitoring").backend, expected)
+
+    def assert_loop_counts(self, cfg: CFG) -> None:
+        """Check the counts recorded for the loop.jac fixture."""
+        blocks = cfg.block_map.idx_to_block
+        loop_head = next(
+            idx for idx, blk in blocks.items() if blk.instructions[0].is_for_iter()
+        )
+        self.assertEqual(blocks[0].exec_count, 1)
+        self.assertEqual(blocks[loop_head].exec_count, 6)
+        self.assertEqual(
+            sum(cfg.edge_counts[(loop_head, succ)] for succ in cfg.edges[loop_head]),
+            6,
+        )
+
+    def test_block_counters(self) -> None:
+        """The settrace backend only counts block entries and taken edges."""
+        bytecode = self.compile_fixture("loop.jac")
+        cfg = self.build_cfg(bytecode)
+        tracker = CFGTracker()
+        key = cfg_key(marshal.loads(bytecode))
+        tracker.register_cfgs({key: cfg})
+        self.trace_fixture(tracker, bytecode)
+        counts = tracker.get_block_counts()
+        self.assertEqual(len(counts[key][0]), len(cfg.block_map.idx_to_block))
+        cfg.record_block_counts(*counts[key])
+        self.assert_loop_counts(cfg)
+        self.assertEqual(tracker.get_block_counts(), {})
+
+    @unittest.skipUnless(hasattr(sys, "monitoring"), "requires sys.monitoring")
+    def test_monitoring_edge_counts(self) -> None:
+        """Branch events reconstruct block and edge counts of a loop."""
+        bytecode = self.compile_fixture("loop.jac")
+        tracker = MonitoringCFGTracker()
+        self.trace_fixture(tracker, bytecode)
+        cfg = self.build_cfg(bytecode)
+        entries, transitions = tracker.get_exec_edges()[
+            cfg_key(marshal.loads(bytecode))
+        ]
+        cfg.record_transitions(entries, transitions)
+        self.assert_loop_counts(cfg)
+
+    @unittest.skipUnless(hasattr(sys, "monitoring"), "requires sys.monitoring")
+    def test_monitoring_tool_id_fallback(self) -> None:
+        """The tracker leaves the profiler id alone and falls back to settrace."""
+        mon = sys.monitoring
+        bytecode = self.compile_fixture("loop.jac")
+        tracker = MonitoringCFGTracker()
+        # an active profiler such as cProfile holds PROFILER_ID
+        mon.use_tool_id(mon.PROFILER_ID, "test")
+        try:
+            self.trace_fixture(tracker, bytecode)
+        finally:
+            mon.free_tool_id(mon.PROFILER_ID)
+        self.assertEqual(tracker.backend, "monitoring")
+        self.assertTrue(all(mon.get_tool(idx) is None for idx in tracker.tool_ids))
+
+        for idx in tracker.tool_ids:
+            mon.use_tool_id(idx, "test")
+        try:
+            cfg = self.build_cfg(bytecode)
+            key = cfg_key(marshal.loads(bytecode))
+            tracker = MonitoringCFGTracker()
+            tracker.register_cfgs({key: cfg})
+            self.trace_fixture(tracker, bytecode)
+            self.assertEqual(tracker.backend, "settrace")
+            self.assertEqual(mon.get_tool(tracker.tool_ids[0]), "test")
+        finally:
+            for idx in tracker.tool_ids:
+                mon.free_tool_id(idx)
+        cfg.record_block_counts(*tracker.get_block_counts()[key])
+        self.assert_loop_counts(cfg)
+
+    def test_block_map_index(self) -> None:
+        """Every instruction offset resolves to its block in O(1)."""
+        instructions = disassemble_bytecode(self.compile_fixture("loop.jac"))
+        block_map = create_BBs(instructions)
+        blocks = block_map.idx_to_block
+        self.assertEqual(
+            sum(len(block.instructions) for block in blocks.values()),
+            len(instructions),
+        )
+        for block_id, block in blocks.items():
+            self.assertEqual(block_map.block_starting_at(block.start_offset), block_id)
+            for instr in block.instructions:
+                self.assertEqual(block_map.block_at(instr.offset), block_id)
+        self.assertIsNone(block_map.block_at(instructions[-1].offset + 2))
+        self.assertIsNone(block_map.block_starting_at(instructions[1].offset))
+
+    def test_nested_code_cfgs(self) -> None:
+        """Function bodies get CFGs of their own and are traced under them."""
+        bytecode = self.compile_fixture("funcs.jac")
+        cfgs = create_code_cfgs(marshal.loads(bytecode))
+        self.assertIn("funcs.<module>:1", cfgs)
+        self.assertIn("funcs.collatz:1", cfgs)
+
+        tracker = make_tracker()
+        tracker.register_cfgs(cfgs)
+        self.trace_fixture(tracker, bytecode)
+        if tracker.backend == "monitoring":
+            for key, (entries, transitions) in tracker.get_exec_edges().items():
+                cfgs[key].record_transitions(entries, transitions)
+        else:
+            for key, counts in tracker.get_block_counts().items():
+                cfgs[key].record_block_counts(*counts)
+        collatz = cfgs["funcs.collatz:1"]
+        self.assertEqual(collatz.block_map.idx_to_block[0].exec_count, 2)
+        self.assertGreater(
+            max(block.exec_count for block in collatz.block_map.idx_to_block.values()),
+            2,
+        )
+
+    def test_threaded_counts(self) -> None:
+        """Worker threads count into their own buffers, merged on drain."""
+        bytecode = self.compile_fixture("threads.jac")
+        for backend in ("settrace", "monitoring"):
+            cfgs = create_code_cfgs(marshal.loads(bytecode))
+            tracker = make_tracker(backend)
+            tracker.register_cfgs(cfgs)
+            self.trace_fixture(tracker, bytecode)
+            if tracker.backend == "monitoring":
+                for key, (entries, transitions) in tracker.get_exec_edges().items():
+                    cfgs[key].record_transitions(entries, transitions)
+                self.assertEqual(tracker.get_exec_edges(), {})
+            else:
+                for key, counts in tracker.get_block_counts().items():
+                    cfgs[key].record_block_counts(*counts)
+                self.assertEqual(tracker.get_block_counts(), {})
+            self.assertGreaterEqual(len(tracker.buffers), 5)
+            work = cfgs["threads.work:3"].block_map.idx_to_block
+            loop_head = next(
+                idx for idx, blk in work.items() if blk.instructions[0].is_for_iter()
+            )
+            # four worker threads and the main thread each run the loop once
+            self.assertEqual(work[0].exec_count, 5, backend)
+            self.assertEqual(work[loop_head].exec_count, 5 * 11, backend)
+
+    def test_profile_roundtrip(self) -> None:
+        """Snapshots written as deltas are rebuilt from any point of the log."""
+        cfgs = create_code_cfgs(marshal.loads(self.compile_fixture("funcs.jac")))
+        collatz = cfgs["funcs.collatz:1"]
+        history = []
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.bin")
+            writer = ProfileWriter(path, keyframe_interval=3)
+            writer.register_cfgs(cfgs)
+            for tick in range(7):
+                collatz.block_map.idx_to_block[0].exec_count += 1
+                collatz.block_map.idx_to_block[1].exec_count += tick * 100
+                edge = next(iter(collatz.edge_counts))
+                collatz.edge_counts[edge] += tick
+                writer.write_snapshot(cfgs, float(tick))
+                history.append(
+                    [b.exec_count for b in collatz.block_map.idx_to_block.values()]
+                )
+            writer.close()
+
+            reader = ProfileReader(path)
+            self.assertEqual(len(reader), 7)
+            self.assertEqual(set(reader.cfgs), set(cfgs))
+            self.assertEqual(
+                len(reader.cfgs["funcs.collatz:1"].blocks),
+                len(collatz.block_map.idx_to_block),
+            )
+            for idx in (0, 2, 3, 5, 6):
+                snapshot = reader.snapshot(idx)
+                self.assertEqual(snapshot.timestamp, float(idx))
+                self.assertEqual(snapshot.block_counts["funcs.collatz:1"], history[idx])
+            self.assertEqual(
+                reader.snapshot(-1).edge_counts["funcs.collatz:1"][0], sum(range(7))
+            )
+            timeline = list(reader.timeline("funcs.collatz:1"))
+            self.assertEqual([blocks for _, blocks, _ in timeline], history)
+
+    def test_profile_counter_reset(self) -> None:
+        """Counters going backwards are rebuilt alike by snapshot and timeline."""
+        cfgs = create_code_cfgs(marshal.loads(self.compile_fixture("funcs.jac")))
+        blocks = cfgs["funcs.collatz:1"].block_map.idx_to_block
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.bin")
+            writer = ProfileWriter(path, keyframe_interval=64)
+            for tick in range(5):
+                if tick == 2:
+                    blocks[2].exec_count = 0
+                elif tick == 4:
+                    for block in blocks.values():
+                        block.exec_count = 0
+                else:
+                    blocks[1].exec_count += 3
+                    blocks[2].exec_count += 3
+                writer.write_snapshot(cfgs, float(tick))
+            writer.close()
+
+            reader = ProfileReader(path)
+            timeline = [blocks for _, blocks, _ in reader.timeline("funcs.collatz:1")]
+            self.assertEqual(
+                timeline,
+                [
+                    reader.snapshot(idx).block_counts.get(
+                        "funcs.collatz:1", [0] * len(blocks)
+                    )
+                    for idx in range(len(reader))
+                ],
+            )
+            self.assertEqual(timeline[2][1:3], [6, 0])
+            self.assertEqual(timeline[3][1:3], [9, 3])
+            self.assertFalse(any(timeline[4]))
+
+    def test_hot_path_and_distance(self) -> None:
+        """The hot path follows the likeliest edges and flips with them."""
+        # bb0 -> bb1, bb1 loops through bb2 or bb3 and exits to bb4
+        edges = [(0, 1), (1, 2), (1, 3), (2, 1), (3, 1), (1, 4)]
+        first = [1, 90, 10, 90, 10, 1]
+        second = [0, 10, 90, 10, 90, 0]
+        self.assertEqual(hot_path(edges, first), [0, 1, 2, 1])
+        self.assertEqual(hot_path(edges, second), [1, 3, 1])
+        self.assertEqual(branch_distance(edges, first, first), (0.0, []))
+        distance, changed = branch_distance(edges, first, second)
+        self.assertGreater(distance, 0.25)
+        self.assertIn(1, changed)
+
+    def test_phase_change_detection(self) -> None:
+        """A branch switching direction is reported once, live and replayed."""
+        cfgs = create_code_cfgs(marshal.loads(self.compile_fixture("funcs.jac")))
+        collatz = cfgs["funcs.collatz:1"]
+        branch, taken, other = 0, (0, 1), (0, 2)
+        collatz.add_edge(*taken)
+        collatz.add_edge(*other)
+        analyzer = HotPathAnalyzer(threshold=0.25, min_transitions=10)
+        events = []
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.bin")
+            writer = ProfileWriter(path)
+            for tick in range(6):
+                collatz.edge_counts[taken if tick < 3 else other] += 20
+                writer.write_snapshot(cfgs, float(tick))
+                events += analyzer.update(cfgs, float(tick))
+            writer.close()
+            replayed = list(
+                analyze_profile(ProfileReader(path), 0.25, min_transitions=10)
+            )
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].key, "funcs.collatz:1")
+        self.assertEqual(events[0].snapshot, 3)
+        self.assertEqual(events[0].changed_blocks, [branch])
+        self.assertIn(taken[1], events[0].previous_hot_path)
+        self.assertIn(other[1], events[0].hot_path)
+        self.assertEqual(
+            [(e.key, e.snapshot) for e in replayed], [("funcs.collatz:1", 3)]
+        )
+
+    def test_model_registry(self) -> None:
+        """Backends are created by name and configured on first use."""
+        self.assertIsInstance(get_model("stub"), StubModel)
+        with self.assertRaises(ValueError):
+            get_model("missing")
+        gemini = get_model("gemini")
+        self.assertIsInstance(gemini, Gemini)
+        self.assertFalse(gemini.configured)
+        stub = get_model("stub")
+        self.assertEqual(stub.generate("hello"), get_model("stub").generate("hello"))
+        self.assertEqual(
+            stub.generate_batch(["a", "b"]), [stub.generate("a"), stub.generate("b")]
+        )
+
+    def test_prompt_cache(self) -> None:
+        """Only new counter sections reach the backend."""
+        cfgs = create_code_cfgs(marshal.loads(self.compile_fixture("funcs.jac")))
+        with tempfile.TemporaryDirectory() as tmp:
+            ghost = ShellGhost(os.path.join(tmp, "profile.bin"), model="stub")
+            ghost.set_cfgs(cfgs)
+            ghost.sem_ir = SemRegistry()
+            first = ghost.prompt_for_runtime()
+            self.assertEqual(ghost.prompt_for_runtime(), first)
+            self.assertEqual(len(ghost.model.prompts), 1)
+            self.assertIn("Instructions per basic block", ghost.model.prompts[0])
+
+            cfgs["funcs.collatz:1"].block_map.idx_to_block[0].exec_count += 1
+            ghost.update_cfg_deque(
+                cfgs["funcs.collatz:1"].get_cfg_repr(), "funcs.collatz:1"
+            )
+            self.assertNotEqual(ghost.prompt_for_runtime(), first)
+            self.assertEqual(len(ghost.model.prompts), 2)
+            self.assertEqual(len(ghost.model.cache.contexts), 1)
+            self.assertEqual(ghost.model.cache.hits, 1)
+
+    def test_model_gated_by_phase_changes(self) -> None:
+        """The model is only called when the hot path changed."""
+        cfgs = create_code_cfgs(marshal.loads(self.compile_fixture("funcs.jac")))
+        with tempfile.TemporaryDirectory() as tmp:
+            ghost = ShellGhost(os.path.join(tmp, "profile.bin"), model="stub")
+            ghost.set_cfgs(cfgs)
+            ghost.sem_ir = SemRegistry()
+            ghost.set_finished()
+            with contextlib.redirect_stdout(io.StringIO()):
+                ghost.worker()
+                self.assertFalse(ghost.model.configured)
+
+                ghost.phase_changes.append(
+                    PhaseChange("funcs.collatz:1", 1, 0.0, 0.5, [0, 1], [0, 2], [0])
+                )
+                ghost.worker()
+            self.assertEqual(len(ghost.model.prompts), 1)
+            self.assertIn("bb0 -> bb2", ghost.model.prompts[0])
+            self.assertFalse(ghost.has_new_phase_changes())
+
+    def test_value_summaries(self) -> None:
+        """Values are summarized shallowly instead of being copied."""
+        readings = [1000.0 + i for i in range(200)]
+        summary = summarize(readings)
+        self.assertEqual(
+            (summary.type, summary.length, summary.min, summary.max),
+            ("list", 200, 1000.0, 1199.0),
+        )
+        self.assertEqual(summary.hash, summarize(list(readings)).hash)
+        self.assertLessEqual(len(summary.repr), 80)
+        self.assertTrue(summary.repr.endswith(", ...]"))
+        self.assertEqual(str(summary), "list(len=200, min=1000.0, max=1199.0)")
+        self.assertIsNone(summarize(["a", 1]).min)
+        self.assertEqual(str(summarize(3)), "3")
+        self.assertIsNone(summarize({}).hash)
+
+        sampler = VariableSampler(rate=3, history=2)
+        self.assertEqual(
+            [sampler.should_sample() for _ in range(7)],
+            [True, False, False, True, False, False, True],
+        )
+        for step in range(5):
+            sampler.record("mod", step * 2, {"x": step})
+        self.assertEqual(
+            [(offset, str(val)) for offset, val in sampler.samples["mod"]["x"]],
+            [(6, "3"), (8, "4")],
+        )
+        self.assertFalse(VariableSampler(rate=0).should_sample())
+
+    def test_sampled_capture(self) -> None:
+        """Variables are sampled at block entries into a bounded history."""
+        bytecode = self.compile_fixture("loop.jac")
+        for backend in ("settrace", "monitoring"):
+            tracker = make_tracker(backend)
+            tracker.capture_history = 3
+            tracker.register_cfgs(create_code_cfgs(marshal.loads(bytecode)))
+            self.trace_fixture(tracker, bytecode)
+            history = tracker.get_variable_history()["loop.<module>:1"]
+            self.assertEqual(len(history["total"]), 3, backend)
+            offset, latest = tracker.get_variable_values()["loop.<module>:1"]
+            self.assertEqual(latest["total"], history["total"][-1][1])
+            self.assertEqual(str(latest["total"]), "4", backend)
+
+            sparse = make_tracker(backend)
+            sparse.capture_rate = 0
+            sparse.register_cfgs(create_code_cfgs(marshal.loads(bytecode)))
+            self.trace_fixture(sparse, bytecode)
+            self.assertEqual(sparse.get_variable_values(), {})
+
+    def profile_fixture(self, fixture: str, path: str) -> bytes:
+        """Trace a fixture, writing its counters to a profile."""
+        bytecode = self.compile_fixture(fixture)
+        cfgs = create_code_cfgs(marshal.loads(bytecode))
+        tracker = make_tracker()
+        tracker.register_cfgs(cfgs)
+        self.trace_fixture(tracker, bytecode)
+        if tracker.backend == "monitoring":
+            for key, (entries, transitions) in tracker.get_exec_edges().items():
+                cfgs[key].record_transitions(entries, transitions)
+        else:
+            for key, counts in tracker.get_block_counts().items():
+                cfgs[key].record_block_counts(*counts)
+        writer = ProfileWriter(path)
+        writer.write_snapshot(cfgs, 1.0)
+        writer.close()
+        return bytecode
+
+    def test_profile_report(self) -> None:
+        """Counters map back to hot Jac lines, loop trips and untaken branches."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.bin")
+            bytecode = self.profile_fixture("loop.jac", path)
+            report = build_report(ProfileReader(path), marshal.loads(bytecode))
+        self.assertEqual(report["skipped"], [])
+        hottest = report["hottest_lines"][0]
+        self.assertEqual(
+            (hottest["line"], hottest["count"], hottest["source"]),
+            (3, 6, "for i in range(5) {"),
+        )
+        counts = {entry["line"]: entry["count"] for entry in report["hottest_lines"]}
+        self.assertEqual(counts[4], 5)
+        self.assertEqual(counts[5], 2)
+        self.assertEqual(counts[8], 1)
+        [loop] = report["loops"]
+        self.assertEqual((loop["line"], loop["runs"], loop["iterations"]), (3, 1, 5))
+        self.assertEqual(loop["trip_distribution"], {"min": 5, "median": 5, "max": 5})
+        self.assertEqual(report["never_taken_branches"], [])
+        self.assertIn("Hottest lines:", report_to_text(report))
+
+    def test_profile_report_cli(self) -> None:
+        """The gins_report command prints the never taken `n < 0` branch of halve(48)."""
+        from jaclang.cli import cli
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.bin")
+            self.profile_fixture("branch.jac", path)
+            captured = io.StringIO()
+            with contextlib.redirect_stdout(captured):
+                cli.gins_report(self.fixture_abs_path("branch.jac"), profile=path)
+        output = captured.getvalue()
+        self.assertIn("branch.jac:3", output)
+        self.assertIn("never went to", output)
+        self.assertIn("(line 4)", output)
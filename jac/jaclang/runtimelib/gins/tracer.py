@@ -1,173 +1,456 @@
-"""Module to track executed branches and variables
-"""
+"""Module to track executed branches and variables."""
+
+from __future__ import annotations
 
-import types
-from typing import Optional, Callable
-import threading
-import sys
 import copy
-import os
-import traceback
-import dis
+import sys
+import threading
+import types
 from collections import deque
-import inspect
-import warnings
-import ast
+from typing import Callable, Optional
+
+from jaclang.runtimelib.gins.capture import VariableSampler
+from jaclang.runtimelib.gins.cfg import CFG, cfg_key
+
+# (block counts, edge counts) of one CFG
+Counts = tuple[list[int], list[int]]
+# (code entries, {(source offset, destination offset): count}) of one CFG
+ExecEdges = tuple[int, dict[tuple[int, int], int]]
 
 
 class CfgDeque:
-    def __init__(self, max_size: int = 10):
+    """Ring of the latest CFG representations sent to the model."""
+
+    def __init__(self, max_size: int = 10) -> None:
+        """Initialize an empty ring keeping at most `max_size` CFGs."""
         self.__max_size = max_size
-        self.__deque = deque()
+        self.__deque: deque[str] = deque()
 
-    def add_cfg(self, cfg_repr: str):
+    def add_cfg(self, cfg_repr: str) -> None:
+        """Append a CFG representation, dropping the oldest one when full."""
         self.__deque.append(cfg_repr)
         if len(self.__deque) > self.__max_size:
             self.__deque.popleft()
 
-    def get_latest_cfg(self):
+    def get_latest_cfg(self) -> str:
+        """Return the most recent CFG representation."""
         return self.__deque[-1]
-        
-    def __len__(self):
+
+    def __len__(self) -> int:
+        """Return the number of CFGs kept."""
         return len(self.__deque)
 
-    def get_cfg_repr(self):
-      res = [f"CFG Changes in last {len(self.__deque)} Updates:\n"]
-      for idx, cfg in enumerate(self.__deque):
-        res.append(f"\nCFG {idx+1} of {len(self.__deque)}\n")
-        res.append(cfg)
-      
-      return "".join(res)
+    def get_cfg_repr(self) -> str:
+        """Render every kept CFG, oldest first."""
+        res = [f"CFG Changes in last {len(self.__deque)} Updates:\n"]
+        for idx, cfg in enumerate(self.__deque):
+            res.append(f"\nCFG {idx+1} of {len(self.__deque)}\n")
+            res.append(cfg)
+
+        return "".join(res)
+
+
+class BlockCounters:
+    """Fixed-size execution counters for the basic blocks and edges of one CFG.
+
+    Memory is O(blocks + edges) regardless of how long the program runs; only
+    block-entry offsets are looked up, every other executed offset is ignored.
+    Counters are cumulative and written by a single thread (see ThreadBuffer),
+    so entering a block takes no lock; readers diff them against the values
+    seen at their previous read.
+    """
+
+    def __init__(
+        self, cfg: Optional[CFG] = None, layout: Optional[BlockCounters] = None
+    ) -> None:
+        """Build the index tables of `cfg`, or share those of `layout`."""
+        self.block_index: list[int]
+        self.edge_index: list[dict[int, int]]
+        if layout is not None:
+            # share the read-only index tables of another thread's counters
+            self.block_index = layout.block_index
+            self.edge_index = layout.edge_index
+            num_blocks, num_edges = len(layout.block_counts), len(layout.edge_counts)
+        else:
+            assert cfg is not None
+            blocks = cfg.block_map.idx_to_block
+            # dense entry offset // 2 -> block id table, -1 for non entry offsets
+            self.block_index = list(cfg.block_map.start_to_block)
+            for block_id, block in blocks.items():
+                # an exhausted FOR_ITER jumps past END_FOR on Python 3.12+
+                if (
+                    block.instructions[0].op == "END_FOR"
+                    and len(block.instructions) > 1
+                ):
+                    self.block_index[block.start_offset // 2] = -1
+                    self.block_index[block.instructions[1].offset // 2] = block_id
+            self.edge_index = [{} for _ in blocks]
+            for edge_id, (src, dst) in enumerate(cfg.edge_counts):
+                self.edge_index[src][dst] = edge_id
+            num_blocks, num_edges = len(blocks), len(cfg.edge_counts)
+        self.block_counts: list[int] = [0] * num_blocks
+        self.edge_counts: list[int] = [0] * num_edges
+        # values handed out by the last drain, only touched by the reader
+        self.drained_blocks = [0] * num_blocks
+        self.drained_edges = [0] * num_edges
+
+    def enter(self, prev_block: Optional[int], block: int) -> None:
+        """Count an entry into `block`, coming from `prev_block` of the same frame."""
+        self.block_counts[block] += 1
+        if prev_block is not None:
+            edge_id = self.edge_index[prev_block].get(block)
+            if edge_id is not None:
+                self.edge_counts[edge_id] += 1
+
+    def drain(self) -> Counts:
+        """Return the (block counts, edge counts) added since the last drain.
+
+        Safe to call from another thread than the writer: an increment that
+        races with the read is simply reported by the next drain.
+        """
+        block_counts = list(self.block_counts)
+        edge_counts = list(self.edge_counts)
+        block_delta = [
+            cur - last for cur, last in zip(block_counts, self.drained_blocks)
+        ]
+        edge_delta = [cur - last for cur, last in zip(edge_counts, self.drained_edges)]
+        self.drained_blocks, self.drained_edges = block_counts, edge_counts
+        return block_delta, edge_delta
+
+
+class ThreadBuffer:
+    """Counters and captured variables owned by a single traced thread.
+
+    Only the owning thread writes to a buffer; the ghost thread reads it on
+    each tick and keeps track of what it already consumed, so the tracing hot
+    path never contends on a lock shared between threads.
+    """
+
+    def __init__(self, thread_name: str, sampler: VariableSampler) -> None:
+        """Initialize the empty buffer of a thread."""
+        self.thread_name = thread_name
+        # settrace backend: module -> BlockCounters
+        self.counters: dict[str, BlockCounters] = {}
+        # monitoring backend: code -> entries, code -> {(src, dst): count}
+        self.entries: dict[types.CodeType, int] = {}
+        self.edges: dict[types.CodeType, dict[tuple[int, int], int]] = {}
+        self.drained_entries: dict[types.CodeType, int] = {}
+        self.drained_edges: dict[types.CodeType, dict[tuple[int, int], int]] = {}
+        # sampled variable summaries and captured program inputs
+        self.sampler = sampler
+        self.inputs: list[object] = []
+        self.drained_inputs = 0
 
 
 class CFGTracker:
-    def __init__(self):
-        self.executed_insts = {}
-        self.inst_lock = threading.Lock()
+    """Tracks basic block entries through per-opcode sys.settrace.
+
+    Threads started while tracking is active are traced as well (through
+    threading.settrace); each thread counts into its own ThreadBuffer and
+    get_block_counts merges them.
+    """
+
+    backend = "settrace"
 
-        self.curr_variables_lock = threading.Lock()
-        self.curr_variables = {}
+    def __init__(
+        self, capture_rate: Optional[int] = None, capture_history: Optional[int] = None
+    ) -> None:
+        """Initialize the tracker, sampling settings default to the jac settings."""
+        from jaclang.settings import settings
 
-        #tracking inputs
-        self.inputs = []
+        # variables are sampled every capture_rate-th block entry of a thread
+        self.capture_rate = (
+            settings.gins_capture_rate if capture_rate is None else capture_rate
+        )
+        self.capture_history = (
+            settings.gins_capture_history
+            if capture_history is None
+            else capture_history
+        )
+        # module -> BlockCounters holding the index tables shared by threads
+        self.layouts: dict[str, BlockCounters] = {}
+        self.buffers: list[ThreadBuffer] = []
+        # only taken the first time a thread records something
+        self.buffers_lock = threading.Lock()
+        self.__local = threading.local()
 
-    def start_tracking(self):
-        """Start tracking branch coverage"""
+    def start_tracking(self) -> None:
+        """Start tracking branch coverage."""
         frame = sys._getframe()
         frame.f_trace_opcodes = True
+        threading.settrace(self.trace_callback)
         sys.settrace(self.trace_callback)
 
-    def stop_tracking(self):
-        """Stop tracking branch coverage"""
+    def stop_tracking(self) -> None:
+        """Stop tracking branch coverage."""
         sys.settrace(None)
+        threading.settrace(None)
 
-    def get_exec_inst(self):
-        self.inst_lock.acquire()
-        cpy = copy.deepcopy(self.executed_insts)
-        self.executed_insts = {}
-        self.inst_lock.release()
+    def register_cfgs(self, cfgs: dict[str, CFG]) -> None:
+        """Allocate block counters for the CFGs built by CfgGenPass."""
+        for module, cfg in cfgs.items():
+            self.layouts[module] = BlockCounters(cfg)
 
-        return cpy
+    def thread_buffer(self) -> ThreadBuffer:
+        """Return the buffer of the calling thread, creating it on first use."""
+        buffer = getattr(self.__local, "buffer", None)
+        if buffer is None:
+            buffer = ThreadBuffer(
+                threading.current_thread().name,
+                VariableSampler(self.capture_rate, self.capture_history),
+            )
+            self.__local.buffer = buffer
+            with self.buffers_lock:
+                self.buffers.append(buffer)
+        return buffer
+
+    def thread_counters(self, module: str) -> Optional[BlockCounters]:
+        """Return the calling thread's counters for a module, None if unknown."""
+        buffer = self.thread_buffer()
+        counters = buffer.counters.get(module)
+        if counters is None and module in self.layouts:
+            counters = BlockCounters(layout=self.layouts[module])
+            buffer.counters[module] = counters
+        return counters
+
+    def get_buffers(self) -> list[ThreadBuffer]:
+        """Return a snapshot of the buffers of every thread seen so far."""
+        with self.buffers_lock:
+            return list(self.buffers)
+
+    def get_block_counts(self) -> dict[str, Counts]:
+        """Drain the (block counts, edge counts) of every module that executed."""
+        block_counts: dict[str, Counts] = {}
+        for buffer in self.get_buffers():
+            for module, counters in list(buffer.counters.items()):
+                blocks, edges = counters.drain()
+                if not any(blocks):
+                    continue
+                if module not in block_counts:
+                    block_counts[module] = (blocks, edges)
+                    continue
+                total_blocks, total_edges = block_counts[module]
+                for idx, count in enumerate(blocks):
+                    total_blocks[idx] += count
+                for idx, count in enumerate(edges):
+                    total_edges[idx] += count
+        return block_counts
+
+    def get_inputs(self) -> list[object]:
+        """Return the inputs captured by every thread since the last call."""
+        inputs = []
+        for buffer in self.get_buffers():
+            end = len(buffer.inputs)
+            inputs.extend(copy.deepcopy(buffer.inputs[buffer.drained_inputs : end]))
+            buffer.drained_inputs = end
+        return inputs
+
+    def get_variable_values(self) -> dict:
+        """Return the latest sampled variable summaries per module, across threads."""
+        variables: dict = {}
+        for buffer in self.get_buffers():
+            variables.update(dict(buffer.sampler.latest))
+        return variables
+
+    def get_variable_history(self) -> dict[str, dict[str, list]]:
+        """Return the last sampled (offset, summary) pairs per module and variable."""
+        history: dict[str, dict[str, list]] = {}
+        for buffer in self.get_buffers():
+            for module, samples in list(buffer.sampler.samples.items()):
+                module_history = history.setdefault(module, {})
+                for name, ring in list(samples.items()):
+                    module_history.setdefault(name, []).extend(list(ring))
+        return history
 
-    def get_inputs(self):
-        self.inst_lock.acquire()
-        cpy = copy.deepcopy(self.inputs)
-        self.inputs = []
-        self.inst_lock.release()
+    def capture_variables(self, frame: types.FrameType, module: str) -> None:
+        """Sample the annotated variables of a traced frame at a block entry."""
+        buffer = self.thread_buffer()
+        if not buffer.sampler.should_sample():
+            return
+        f_locals = frame.f_locals
+        annotations = f_locals.get("__annotations__")
+        if not annotations:
+            return
+        values = {name: f_locals[name] for name in annotations if name in f_locals}
+        if "input_val" in values and (
+            len(buffer.inputs) == 0 or values["input_val"] != buffer.inputs[-1]
+        ):
+            buffer.inputs.append(values["input_val"])
+        buffer.sampler.record(module, frame.f_lasti, values)
 
-        return cpy
-        
-    def get_variable_values(self):
-        self.curr_variables_lock.acquire()
-        cpy = copy.deepcopy(self.curr_variables)
-        # print(cpy)
-        self.curr_variables_lock.release()
+    def block_tracer(self, module: str, frame: types.FrameType) -> Optional[Callable]:
+        """Local trace function counting the block entries of a single frame."""
+        counters = self.thread_counters(module)
+        if counters is None:
+            return None
+        block_index = counters.block_index
+        num_slots = len(block_index)
+        # the call event already executed the instruction at f_lasti (RESUME)
+        prev_block = None
+        if 0 <= frame.f_lasti // 2 < num_slots and block_index[frame.f_lasti // 2] >= 0:
+            prev_block = block_index[frame.f_lasti // 2]
+            counters.enter(None, prev_block)
 
-        return cpy
-    
+        def trace_opcode(
+            frame: types.FrameType, event: str, arg: object
+        ) -> Optional[Callable]:
+            nonlocal prev_block
+            if event == "opcode":
+                slot = frame.f_lasti >> 1
+                if slot < num_slots and block_index[slot] >= 0:
+                    block = block_index[slot]
+                    counters.enter(prev_block, block)
+                    prev_block = block
+                    self.capture_variables(frame, module)
+            return trace_opcode
+
+        return trace_opcode
 
     def trace_callback(
-        self, frame: types.FrameType, event: str, arg: any
+        self, frame: types.FrameType, event: str, arg: object
     ) -> Optional[Callable]:
-        """Trace function to track executed branches"""
+        """Trace function to track executed branches."""
         code = frame.f_code
         if ".jac" not in code.co_filename:
             return self.trace_callback
 
         if event == "call":
             frame.f_trace_opcodes = True
-        elif event == "opcode":
-            # edge case to handle executing code not within a function
-            filename = os.path.basename(code.co_filename)
-            module = (
-                code.co_name
-                if code.co_name != "<module>"
-                else os.path.splitext(filename)[0]
+            return self.block_tracer(cfg_key(code), frame)
+        return self.trace_callback
+
+
+class MonitoringCFGTracker(CFGTracker):
+    """Tracks taken CFG edges through PEP 669 sys.monitoring BRANCH/JUMP events.
+
+    Only code objects compiled from .jac files get local BRANCH/JUMP events, every
+    other code object is disabled on its first PY_START, so plain Python code runs
+    at full speed. Instead of a stream of executed offsets this tracker records
+    how often each (source offset, destination offset) transition was taken and how
+    often each code object was entered; fall-through edges are derived from those
+    counts by CFG.record_transitions.
+    """
+
+    backend = "monitoring"
+    # ids 0, 1, 2 and 5 are claimed by debuggers, coverage, profilers (cProfile)
+    # and optimizers, 3 and 4 are left free for other tools
+    tool_ids = (3, 4)
+
+    def __init__(self) -> None:
+        """Initialize the tracker, no tool id is claimed until tracking starts."""
+        super().__init__()
+        self.tool_id: Optional[int] = None
+        self.__instrumented: set[types.CodeType] = set()
+
+    @staticmethod
+    def is_supported() -> bool:
+        """Check whether the interpreter has sys.monitoring (Python 3.12+)."""
+        return hasattr(sys, "monitoring")
+
+    def start_tracking(self) -> None:
+        """Start tracking branch coverage."""
+        mon = sys.monitoring  # type: ignore[attr-defined]
+        tool_ids = self.tool_ids if self.backend == MonitoringCFGTracker.backend else ()
+        for tool_id in tool_ids:
+            try:
+                mon.use_tool_id(tool_id, "jac-gins")
+            except ValueError:
+                continue
+            self.tool_id = tool_id
+            break
+        else:
+            # every free tool id is in use, count block entries through settrace
+            # from now on so counters of both backends never get mixed
+            self.backend = CFGTracker.backend
+            super().start_tracking()
+            return
+        mon.register_callback(tool_id, mon.events.PY_START, self.start_callback)
+        mon.register_callback(tool_id, mon.events.BRANCH, self.edge_callback)
+        mon.register_callback(tool_id, mon.events.JUMP, self.edge_callback)
+        mon.set_events(tool_id, mon.events.PY_START)
+        mon.restart_events()
+
+    def stop_tracking(self) -> None:
+        """Stop tracking branch coverage."""
+        if self.tool_id is None:
+            super().stop_tracking()
+            return
+        mon = sys.monitoring  # type: ignore[attr-defined]
+        mon.set_events(self.tool_id, mon.events.NO_EVENTS)
+        for code in self.__instrumented:
+            mon.set_local_events(self.tool_id, code, mon.events.NO_EVENTS)
+        self.__instrumented.clear()
+        for event in (mon.events.PY_START, mon.events.BRANCH, mon.events.JUMP):
+            mon.register_callback(self.tool_id, event, None)
+        mon.free_tool_id(self.tool_id)
+        self.tool_id = None
+
+    def get_exec_edges(self) -> dict[str, ExecEdges]:
+        """Drain the (entries, transitions) counted since the last call, per module."""
+        exec_edges: dict[str, ExecEdges] = {}
+        for buffer in self.get_buffers():
+            entries = dict(buffer.entries)
+            for code, count in entries.items():
+                module = cfg_key(code)
+                module_entries, module_edges = exec_edges.get(module, (0, {}))
+                delta = count - buffer.drained_entries.get(code, 0)
+                exec_edges[module] = (module_entries + delta, module_edges)
+            buffer.drained_entries = entries
+
+            for code, code_edges in list(buffer.edges.items()):
+                code_edges = dict(code_edges)
+                drained = buffer.drained_edges.get(code, {})
+                module = cfg_key(code)
+                module_entries, module_edges = exec_edges.get(module, (0, {}))
+                for edge, count in code_edges.items():
+                    delta = count - drained.get(edge, 0)
+                    if delta:
+                        module_edges[edge] = module_edges.get(edge, 0) + delta
+                exec_edges[module] = (module_entries, module_edges)
+                buffer.drained_edges[code] = code_edges
+        return {
+            module: (entries, edges)
+            for module, (entries, edges) in exec_edges.items()
+            if entries or edges
+        }
+
+    def start_callback(self, code: types.CodeType, instruction_offset: int) -> object:
+        """Count a code object entry, enabling its branch events on the first one."""
+        mon = sys.monitoring  # type: ignore[attr-defined]
+        if not code.co_filename.endswith(".jac"):
+            return mon.DISABLE
+        if code not in self.__instrumented:
+            self.__instrumented.add(code)
+            mon.set_local_events(
+                self.tool_id, code, mon.events.BRANCH | mon.events.JUMP
             )
+        entries = self.thread_buffer().entries
+        entries[code] = entries.get(code, 0) + 1
+        return None
 
-            self.inst_lock.acquire()
-            if module not in self.executed_insts:
-                self.executed_insts[module] = []
-            self.executed_insts[module].append(frame.f_lasti)
-            self.inst_lock.release()
-            variable_dict = {}
-            if "__annotations__" in frame.f_locals:
-                self.curr_variables_lock.acquire()
-                for var_name in frame.f_locals["__annotations__"]:
-                    if var_name == "input_val" and (len(self.inputs) == 0 or frame.f_locals[var_name] != self.inputs[-1]):
-                      self.inputs.append(frame.f_locals[var_name])
-
-                    variable_dict[var_name] = frame.f_locals[var_name]
-                self.curr_variables[module] = (frame.f_lasti, variable_dict)
-                self.curr_variables_lock.release()
-        # elif event == "line":
-        #     ###
-        #     # this is really circumlocutious, but is also how
-        #     # [watchpoints](https://github.com/gaogaotiantian/watchpoints/tree/master)
-        #     # works
-        #     ###
-        #     try:
-        #         #print(inspect.getsourcefile(frame.f_code))
-        #         #print(frame.f_lineno)
-        #         # TODO: super inefficient but just for now
-        #         # inspect.getsource doesn't seem to work like it does for
-        #         # regular python (see test_tracer.py)
-        #         # NOTE: we're parsing jac lines as python, fingers crossed
-        #         with open(inspect.getsourcefile(frame.f_code)) as file:
-        #             line_asts = ast.parse(file.readlines()[frame.f_lineno - 1].lstrip().rstrip(';'))
-        #         #print("                       ", frame.f_lineno, ast.unparse(line_ast))
-        #     except (IndexError, SyntaxError):
-        #         return self.trace_callback
-        #     #print(ast.dump(a))
-        #     #print(len(a.body))
-        #     assert len(line_asts.body) == 1 # we only parsed one line
-        #     line_ast = line_asts.body[0]
-        #     if isinstance(line_ast, ast.Assign) or isinstance(line_ast, ast.AugAssign):
-        #         # yes, I know this isn't strictly necessary in python
-        #         lhs_ast = None
-        #         rhs_ast = None
-        #         if isinstance(line_ast, ast.Assign):
-        #             assert len(line_ast.targets) == 1, "Only handling single targets right now"
-        #             lhs_ast = line_ast.targets[0]
-        #         elif isinstance(line_ast, ast.AugAssign):
-        #             lhs_ast = line_ast.target
-        #         lhs_var = ast.unparse(lhs_ast)
-        #         rhs_ast = line_ast.value
-        #         # NOTE: for some reason, eval(ast.Expression(rhs_ast)) doesn't work
-        #         rhs_value = eval(ast.unparse(rhs_ast), frame.f_globals, frame.f_locals)
-        #         if isinstance(line_ast, ast.Assign):
-        #             exec(f"{lhs_var} = {rhs_value}\n", frame.f_globals, frame.f_locals)
-        #             print(f"{lhs_var} = {rhs_value}")
-        #         elif isinstance(line_ast, ast.AugAssign):
-        #             exec(f"{lhs_var} += {rhs_value}\n", frame.f_globals, frame.f_locals)
-        #             print(f"{lhs_var} (+)= {rhs_value}")
-        #         #print(frame.f_locals)
-        #         if lhs_var == 'PROGRAM_INPUT':
-        #             if isinstance(line_ast, ast.AugAssign):
-        #                 assert False, "Unimplemented"
-        #             print("tracer: PROGRAM_INPUT = ", rhs_value)
-        #         # this only silences some of the
-        #         # "RuntimeWarning: assigning None to unbound local" warnings
-        #         with warnings.catch_warnings(action="ignore"):
-        #             frame.f_lineno += 1
-        return self.trace_callback
+    def edge_callback(
+        self, code: types.CodeType, instruction_offset: int, destination_offset: int
+    ) -> None:
+        """Count a taken (source offset, destination offset) transition."""
+        edge = (instruction_offset, destination_offset)
+        buffer = self.thread_buffer()
+        code_edges = buffer.edges.get(code)
+        if code_edges is None:
+            code_edges = buffer.edges[code] = {}
+        code_edges[edge] = code_edges.get(edge, 0) + 1
+        # the monitored frame sits right below this callback
+        self.capture_variables(sys._getframe(1), cfg_key(code))
+
+
+def make_tracker(backend: Optional[str] = None) -> CFGTracker:
+    """Create the CFG tracker selected by the gins_tracer setting.
+
+    The sys.monitoring backend needs Python 3.12+, older interpreters fall back to
+    the per-opcode settrace tracker.
+    """
+    from jaclang.settings import settings
+
+    backend = backend or settings.gins_tracer
+    if backend == MonitoringCFGTracker.backend and MonitoringCFGTracker.is_supported():
+        return MonitoringCFGTracker()
+    return CFGTracker()
@@ -354,8 +354,10 @@ class JacImporter(Importer):
                     try:
                         with sys_path_context(spec.caller_dir):
                             JacMachine.get().gin.tracker.start_tracking()
-                            exec(codeobj, module.__dict__)
-                            JacMachine.get().gin.tracker.stop_tracking()
+                            try:
+                                exec(codeobj, module.__dict__)
+                            finally:
+                                JacMachine.get().gin.tracker.stop_tracking()
                             JacMachine.get().gin.set_finished(None)
                     except Exception as e:
                         logger.error(e)
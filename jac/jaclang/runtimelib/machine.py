@@ -13,9 +13,9 @@ from contextvars import ContextVar
 from typing import Optional, Union
 
 from jaclang.compiler.absyntree import Module
+from jaclang.compiler.bytecode_cache import BytecodeCache, gen_dir_of
 from jaclang.compiler.compile import compile_jac, jac_file_to_pass
 
-from jaclang.compiler.constant import Constants as Con
 from jaclang.compiler.semtable import SemRegistry
 from jaclang.runtimelib.architype import (
     Architype,
@@ -313,11 +313,13 @@ class JacProgram:
         if self.mod_bundle and isinstance(self.mod_bundle, Module):
             codeobj = self.mod_bundle.mod_deps[full_target].gen.py_bytecode
             return marshal.loads(codeobj) if isinstance(codeobj, bytes) else None
-        gen_dir = os.path.join(caller_dir, Con.JAC_GEN_DIR)
-        pyc_file_path = os.path.join(gen_dir, module_name + ".jbc")
-        if cachable and os.path.exists(pyc_file_path) and not reload:
-            with open(pyc_file_path, "rb") as f:
-                return marshal.load(f)
+        if cachable and not reload:
+            cached = BytecodeCache.of(gen_dir_of(full_target)).load(full_target)
+            if cached:
+                bytecode, registry = cached
+                # the registry pass did not run, restore what it collected
+                JacMachine.get().get_sem_ir(registry)
+                return marshal.loads(bytecode)
 
         result = compile_jac(full_target, cache_result=cachable)
         if result.errors_had or not result.ir.gen.py_bytecode:
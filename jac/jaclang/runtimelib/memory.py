@@ -2,16 +2,32 @@
 
 from __future__ import annotations
 
+import dbm
+import sqlite3
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from pickle import dumps
+from io import BytesIO
+from pathlib import Path
+from pickle import DEFAULT_PROTOCOL, Unpickler, dumps, loads
 from shelve import Shelf, open
-from typing import Callable, Generator, Generic, Iterable, TypeVar
+from typing import Any, Callable, Generator, Generic, Iterable, Iterator, TypeVar, cast
 from uuid import UUID
 
-from .architype import Anchor, NodeAnchor, Root, TANCH
+from .architype import (
+    Anchor,
+    EdgeAnchor,
+    NodeAnchor,
+    ObjectAnchor,
+    Root,
+    TANCH,
+    WalkerAnchor,
+)
 
 ID = TypeVar("ID")
 
+SQLITE_SCHEME = "sqlite://"
+SHELF_SCHEME = "shelf://"
+
 
 @dataclass
 class Memory(Generic[ID, TANCH]):
@@ -56,6 +72,29 @@ class Memory(Generic[ID, TANCH]):
         """Find one by id."""
         return self.__mem__.get(id)
 
+    def populate(self, anchors: Iterable[Anchor]) -> None:
+        """Load unpopulated anchor stubs with a single find."""
+        stubs = [anchor for anchor in anchors if not anchor.is_populated()]
+        if stubs:
+            ids = cast(list[ID], list(dict.fromkeys(stub.id for stub in stubs)))
+            loaded = {anchor.id: anchor for anchor in self.find(ids)}
+            for stub in stubs:
+                if anchor := loaded.get(stub.id):
+                    stub.load_from(anchor)
+
+    def populate_data(self, edges: Iterable[EdgeAnchor]) -> None:
+        """Populate edges and their end nodes to avoid a lookup per stub."""
+        edges = list(edges)
+        self.populate(edges)
+        self.populate(
+            [
+                node
+                for edge in edges
+                if edge.is_populated()
+                for node in (edge.source, edge.target)
+            ]
+        )
+
     def set(self, id: ID, data: TANCH) -> None:
         """Save anchor to memory."""
         self.__mem__[id] = data
@@ -76,17 +115,31 @@ class ShelfStorage(Memory[UUID, Anchor]):
 
     __shelf__: Shelf[Anchor] | None = None
 
-    def __init__(self, session: str | None = None) -> None:
+    def __init__(self, session: str | None = None, read_only: bool = False) -> None:
         """Initialize memory handler."""
         super().__init__()
-        self.__shelf__ = open(session) if session else None  # noqa: SIM115
+        self.session = session
+        self.read_only = read_only
+        self.__shelf__ = (
+            open(session, flag="r" if read_only else "c")  # noqa: SIM115
+            if session
+            else None
+        )
 
     def close(self) -> None:
         """Close memory handler."""
+        if isinstance(self.__shelf__, Shelf):
+            self.commit()
+            self.__shelf__.close()
+        super().close()
+
+    def commit(self) -> None:
+        """Write deletions and changes to the shelf, keeping it open."""
         if isinstance(self.__shelf__, Shelf):
             for anchor in self.__gc__:
                 self.__shelf__.pop(str(anchor.id), None)
                 self.__mem__.pop(anchor.id, None)
+            self.__gc__.clear()
 
             keys = set(self.__mem__.keys())
 
@@ -96,8 +149,91 @@ class ShelfStorage(Memory[UUID, Anchor]):
             # additional after memory sync
             self.sync_mem_to_db(set(self.__mem__.keys() - keys))
 
-            self.__shelf__.close()
-        super().close()
+            self.__shelf__.sync()
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """Commit, then let other processes open the shelf within the block.
+
+        dbm backends such as gnu lock a file open for writing against any
+        other reader, so the shelf is closed until the block exits.
+        """
+        self.commit()
+        if not isinstance(self.__shelf__, Shelf) or self.session is None:
+            yield
+            return
+        self.__shelf__.close()
+        try:
+            yield
+        finally:
+            self.__shelf__ = open(  # noqa: SIM115
+                self.session, flag="r" if self.read_only else "c"
+            )
+
+    def changes(self) -> tuple[list[tuple[Anchor, list[UUID] | None]], list[UUID]]:
+        """Collect what close would write, for another process to merge.
+
+        Returns the changed anchors, each with the edge ids it had in the
+        shelf (None when it is not a stored node), and the deleted ids.
+        """
+        changed: list[tuple[Anchor, list[UUID] | None]] = []
+        for anchor in self.__mem__.values():
+            if anchor.persistent and anchor.is_dirty():
+                stored = (
+                    self.__shelf__.get(str(anchor.id))
+                    if isinstance(self.__shelf__, Shelf)
+                    else None
+                )
+                changed.append(
+                    (
+                        anchor,
+                        (
+                            [edge.id for edge in stored.edges]
+                            if isinstance(stored, NodeAnchor)
+                            else None
+                        ),
+                    )
+                )
+        return changed, [anchor.id for anchor in self.__gc__]
+
+    def merge(
+        self,
+        changed: Iterable[tuple[Anchor, list[UUID] | None]],
+        deleted: Iterable[UUID],
+    ) -> None:
+        """Apply the changes collected by another process, see changes.
+
+        Edges are merged with the edges of the loaded node, so edges connected
+        by other processes are kept. Other fields are taken from the change, so
+        when changes of several processes are merged the last one wins.
+        """
+        for anchor, stored_edges in changed:
+            anchor.dirty = True
+            current = self.find_by_id(anchor.id)
+            if current is None:
+                self.set(anchor.id, anchor)
+                continue
+
+            current.architype.__dict__.update(
+                (name, value)
+                for name, value in anchor.architype.__dict__.items()
+                if name != "__jac__"
+            )
+            current.access = anchor.access
+            if isinstance(current, NodeAnchor) and isinstance(anchor, NodeAnchor):
+                edges = {edge.id for edge in anchor.edges}
+                removed = set(stored_edges or ()) - edges
+                for edge in [e for e in current.edges if e.id in removed]:
+                    current.remove_edge(edge)
+                known = {edge.id for edge in current.edges}
+                for edge in anchor.edges:
+                    if edge.id not in known:
+                        current.add_edge(edge)
+            current.dirty = True
+
+        for id in deleted:
+            if self.find_by_id(id):
+                self.remove(id)
 
     def sync_mem_to_db(self, keys: Iterable[UUID]) -> None:
         """Manually sync memory to db."""
@@ -105,11 +241,8 @@ class ShelfStorage(Memory[UUID, Anchor]):
 
         if isinstance(self.__shelf__, Shelf):
             for key in keys:
-                if (
-                    (d := self.__mem__.get(key))
-                    and d.persistent
-                    and d.hash != hash(dumps(d))
-                ):
+                # only anchors flagged by a write barrier are serialized
+                if (d := self.__mem__.get(key)) and d.persistent and d.is_dirty():
                     _id = str(d.id)
                     if p_d := self.__shelf__.get(_id):
                         if (
@@ -124,10 +257,8 @@ class ShelfStorage(Memory[UUID, Anchor]):
                             p_d.edges = d.edges
 
                         if Jac.check_write_access(d):
-                            if hash(dumps(p_d.access)) != hash(dumps(d.access)):
-                                p_d.access = d.access
-                            if hash(dumps(p_d.architype)) != hash(dumps(d.architype)):
-                                p_d.architype = d.architype
+                            p_d.access = d.access
+                            p_d.architype = d.architype
 
                         self.__shelf__[_id] = p_d
                     elif not (
@@ -136,6 +267,7 @@ class ShelfStorage(Memory[UUID, Anchor]):
                         and not d.edges
                     ):
                         self.__shelf__[_id] = d
+                    d.mark_synced()
 
     def find(
         self,
@@ -173,3 +305,313 @@ class ShelfStorage(Memory[UUID, Anchor]):
             self.__mem__[id] = data
 
         return data
+
+
+class SqliteShelf(Shelf):
+    """Shelf kept in a SQLite database, with one table per anchor kind.
+
+    The database runs in WAL mode. Anchors are pickled when set, but the rows
+    are only written, in a single transaction, on sync/close. Statements are
+    constant strings so sqlite3 reuses their prepared form. A read-only shelf
+    opens the database with mode=ro and never writes the queued rows.
+    """
+
+    KINDS = ("node", "edge", "walker", "object")
+    SELECT = " UNION ALL ".join(f"SELECT data FROM {k} WHERE id = ?" for k in KINDS)
+    EXISTS = " UNION ALL ".join(f"SELECT 1 FROM {k} WHERE id = ?" for k in KINDS)
+    # ids per batched lookup, below the default SQLITE_MAX_VARIABLE_NUMBER
+    CHUNK = 900
+
+    def __init__(
+        self, path: str, protocol: int = DEFAULT_PROTOCOL, read_only: bool = False
+    ) -> None:
+        """Open or create the database at `path`."""
+        super().__init__({}, protocol)
+        self.protocol = protocol
+        self.read_only = read_only
+        if read_only:
+            uri = Path(path).absolute().as_uri() + "?mode=ro"
+            self.db = sqlite3.connect(uri, uri=True)
+        else:
+            self.db = sqlite3.connect(path)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            with self.db:
+                for kind in self.KINDS:
+                    self.db.execute(
+                        f"CREATE TABLE IF NOT EXISTS {kind} "
+                        "(id TEXT PRIMARY KEY, root TEXT, data BLOB NOT NULL) "
+                        "WITHOUT ROWID"
+                    )
+                    self.db.execute(
+                        f"CREATE INDEX IF NOT EXISTS {kind}_root ON {kind} (root)"
+                    )
+        # id -> (kind, root, pickled anchor) / ids to delete, until next sync
+        self.pending: dict[str, tuple[str, str | None, bytes]] = {}
+        self.deleted: set[str] = set()
+
+    @staticmethod
+    def kind_of(anchor: Anchor) -> str:
+        """Return the table of an anchor."""
+        match anchor:
+            case NodeAnchor():
+                return "node"
+            case EdgeAnchor():
+                return "edge"
+            case WalkerAnchor():
+                return "walker"
+            case ObjectAnchor():
+                return "object"
+        raise ValueError(f"Unsupported anchor {anchor.__class__.__name__}!")
+
+    def put_raw(self, key: str, kind: str, root: str | None, data: bytes) -> None:
+        """Queue an already pickled anchor."""
+        self.pending[key] = (kind, root, data)
+        self.deleted.discard(key)
+
+    def __getitem__(self, key: str) -> Anchor:
+        """Load an anchor."""
+        if key in self.pending:
+            data = self.pending[key][2]
+        elif key in self.deleted:
+            raise KeyError(key)
+        elif row := self.db.execute(self.SELECT, (key,) * len(self.KINDS)).fetchone():
+            data = row[0]
+        else:
+            raise KeyError(key)
+        return loads(data)
+
+    def __setitem__(self, key: str, value: Anchor) -> None:
+        """Queue an anchor for writing."""
+        root = value.root
+        self.put_raw(
+            key,
+            self.kind_of(value),
+            str(root) if root else None,
+            dumps(value, self.protocol),
+        )
+
+    def __delitem__(self, key: str) -> None:
+        """Queue an anchor for deletion."""
+        self.pending.pop(key, None)
+        self.deleted.add(key)
+
+    def __contains__(self, key: object) -> bool:
+        """Check if an anchor is stored."""
+        if key in self.pending:
+            return True
+        if key in self.deleted:
+            return False
+        args = (key,) * len(self.KINDS)
+        return self.db.execute(self.EXISTS, args).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate stored anchor ids."""
+        self.sync()
+        for kind in self.KINDS:
+            for (key,) in self.db.execute(f"SELECT id FROM {kind}"):
+                yield key
+
+    def __len__(self) -> int:
+        """Count stored anchors."""
+        self.sync()
+        return sum(
+            self.db.execute(f"SELECT COUNT(*) FROM {kind}").fetchone()[0]
+            for kind in self.KINDS
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:  # noqa: ANN401
+        """Load an anchor if stored."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Anchor]:
+        """Load several anchors, with one query per chunk of keys."""
+        found: dict[str, Anchor] = {}
+        missing = []
+        for key in keys:
+            if key in self.pending:
+                found[key] = loads(self.pending[key][2])
+            elif key not in self.deleted:
+                missing.append(key)
+        for start in range(0, len(missing), self.CHUNK):
+            chunk = missing[start : start + self.CHUNK]
+            params = ", ".join(f"?{idx}" for idx in range(1, len(chunk) + 1))
+            query = " UNION ALL ".join(
+                f"SELECT id, data FROM {kind} WHERE id IN ({params})"
+                for kind in self.KINDS
+            )
+            for key, data in self.db.execute(query, chunk):
+                found[key] = loads(data)
+        return found
+
+    def pop(self, key: str, default: Any = None) -> Any:  # noqa: ANN401
+        """Remove an anchor, returning it."""
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        del self[key]
+        return value
+
+    def ids_by_root(self, root: str) -> list[str]:
+        """Return the ids of the anchors owned by a root."""
+        self.sync()
+        return [
+            key
+            for kind in self.KINDS
+            for (key,) in self.db.execute(
+                f"SELECT id FROM {kind} WHERE root = ?", (root,)
+            )
+        ]
+
+    def sync(self) -> None:
+        """Write queued changes in one transaction."""
+        if self.read_only or not (self.pending or self.deleted) or self.db is None:
+            return
+        rows: dict[str, list[tuple[str, str | None, bytes]]] = {
+            kind: [] for kind in self.KINDS
+        }
+        for key, (kind, root, data) in self.pending.items():
+            rows[kind].append((key, root, data))
+        deleted = [(key,) for key in self.deleted]
+        with self.db:
+            for kind in self.KINDS:
+                if deleted:
+                    self.db.executemany(f"DELETE FROM {kind} WHERE id = ?", deleted)
+                if rows[kind]:
+                    self.db.executemany(
+                        f"INSERT OR REPLACE INTO {kind} (id, root, data) "
+                        "VALUES (?, ?, ?)",
+                        rows[kind],
+                    )
+        self.pending.clear()
+        self.deleted.clear()
+
+    def close(self) -> None:
+        """Write queued changes and close the database."""
+        if getattr(self, "db", None) is not None:
+            self.sync()
+            self.db.close()
+            self.db = None  # type: ignore[assignment]
+
+
+class SqliteStorage(ShelfStorage):
+    """SQLite Handler."""
+
+    __shelf__: SqliteShelf | None = None
+
+    def __init__(self, session: str, read_only: bool = False) -> None:
+        """Initialize memory handler."""
+        super().__init__()
+        self.session = session
+        self.read_only = read_only
+        self.__shelf__ = SqliteShelf(session, read_only=read_only)
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """Commit, then let other processes open the database within the block.
+
+        A sqlite3 connection must not be carried over a fork, so it is closed
+        until the block exits.
+        """
+        self.commit()
+        if self.__shelf__ is None or self.session is None:
+            yield
+            return
+        self.__shelf__.close()
+        try:
+            yield
+        finally:
+            self.__shelf__ = SqliteShelf(self.session, read_only=self.read_only)
+
+    def find(
+        self,
+        ids: UUID | Iterable[UUID],
+        filter: Callable[[Anchor], Anchor] | None = None,
+    ) -> Generator[Anchor, None, None]:
+        """Find anchors by ids, loading the uncached ones in bulk."""
+        if not isinstance(ids, Iterable):
+            ids = [ids]
+        ids = list(ids)
+
+        if self.__shelf__ is not None:
+            missing = [
+                str(id)
+                for id in ids
+                if id not in self.__mem__ and id not in self.__gc__
+            ]
+            if missing:
+                for key, anchor in self.__shelf__.get_many(missing).items():
+                    self.__mem__[UUID(key)] = anchor
+
+        return super().find(ids, filter)
+
+    def find_by_root(self, root: UUID) -> Generator[Anchor, None, None]:
+        """Find the anchors owned by a root, without a full scan."""
+        ids = self.__shelf__.ids_by_root(str(root)) if self.__shelf__ else []
+        return self.find([UUID(key) for key in ids])
+
+
+def open_storage(session: str | None = None, read_only: bool = False) -> ShelfStorage:
+    """Open the storage of a session.
+
+    `sqlite://<path>` sessions are kept in SQLite, `shelf://<path>` or plain
+    paths in a shelve file, and no session in memory only. `read_only` opens
+    the session for reading, so that several processes can share it.
+    """
+    if session and session.startswith(SQLITE_SCHEME):
+        return SqliteStorage(session[len(SQLITE_SCHEME) :], read_only)
+    if session and session.startswith(SHELF_SCHEME):
+        session = session[len(SHELF_SCHEME) :]
+    return ShelfStorage(session or None, read_only)
+
+
+class _Unresolved:
+    """Stand-in for classes of a program that is not loaded."""
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        pass
+
+    def __setstate__(self, state: object) -> None:
+        if isinstance(state, dict):
+            self.__dict__.update(state)
+
+
+class _MigrationUnpickler(Unpickler):
+    """Unpickler that only needs the jaclang classes of an anchor."""
+
+    def find_class(self, module: str, name: str) -> Any:  # noqa: ANN401
+        try:
+            return super().find_class(module, name)
+        except (ImportError, AttributeError):
+            return _Unresolved
+
+
+def migrate_shelf(source: str, target: str) -> int:
+    """Copy the anchors of a shelf session into a SQLite database.
+
+    Pickles are copied as they are, they are only loaded to find the kind and
+    root of each anchor, so the program that created them does not need to be
+    importable. Returns the number of anchors copied.
+    """
+    count = 0
+    with dbm.open(source, "r") as shelf:
+        db = SqliteShelf(target)
+        try:
+            for key in shelf.keys():
+                data = shelf[key]
+                anchor: Anchor = _MigrationUnpickler(BytesIO(data)).load()
+                root = anchor.root
+                db.put_raw(
+                    key.decode() if isinstance(key, bytes) else key,
+                    SqliteShelf.kind_of(anchor),
+                    str(root) if root else None,
+                    data,
+                )
+                count += 1
+        finally:
+            db.close()
+    return count
@@ -20,6 +20,17 @@ class Settings:
     # Compiler configuration
     disable_mtllm: bool = False
     ignore_test_annex: bool = False
+    compile_jobs: int = 1  # processes parsing/compiling modules, 0: one per CPU
+    fuse_passes: bool = True  # one traversal per run of fusible passes
+    py_raise_cache_dir: str = ""  # e.g. ~/.jaclang/py_raise_cache, "": no cache
+    py_raise_cache_size: int = 256  # MB kept in py_raise_cache_dir, LRU evicted
+
+    # GINS configuration
+    gins_tracer: str = "monitoring"  # monitoring (Python 3.12+) | settrace
+    gins_profile: str = "gins_profile.bin"  # binary CFG counter log
+    gins_model: str = "gemini"  # gemini | stub (deterministic, offline)
+    gins_capture_rate: int = 1  # sample variables every Nth block entry, 0: off
+    gins_capture_history: int = 8  # samples kept per variable
 
     # Formatter configuration
     max_line_length: int = 88
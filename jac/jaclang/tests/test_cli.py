@@ -4,6 +4,7 @@ import contextlib
 import inspect
 import io
 import os
+import pickle
 import subprocess
 import sys
 import traceback
@@ -316,6 +317,30 @@ class JacCliTests(TestCase):
         self.assertIn("Errors: 0, Warnings: 0", stdout_value)
         self.assertIn("<module 'pyfunc' from", stdout_value)
 
+    def test_build_and_run_with_jobs(self) -> None:
+        """Test modules compiled over a process pool match a serial build."""
+        from jaclang.settings import settings
+
+        jac_file = self.fixture_abs_path("deep_import_mods.jac")
+        jir_file = self.fixture_abs_path("deep_import_mods.jir")
+        captured_output = io.StringIO()
+        sys.stdout = captured_output
+        mod_deps = []
+        try:
+            for jobs in (1, 2):
+                cli.build(jac_file, jobs=jobs)
+                with open(jir_file, "rb") as f:
+                    mod_deps.append(sorted(pickle.load(f).mod_deps))
+            cli.run(self.fixture_abs_path("impl_grab.jac"), cache=False, jobs=2)
+        finally:
+            sys.stdout = sys.__stdout__
+            os.remove(jir_file)
+        stdout_value = captured_output.getvalue()
+        self.assertEqual(settings.compile_jobs, 1)
+        self.assertEqual(stdout_value.count("Errors: 0"), 2)
+        self.assertEqual(mod_deps[0], mod_deps[1])
+        self.assertIn("1.414", stdout_value)
+
     def test_cache_no_cache_on_run(self) -> None:
         """Basic test for pass."""
         process = subprocess.Popen(
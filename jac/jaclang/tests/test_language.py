@@ -4,12 +4,19 @@ import io
 import os
 import sys
 import sysconfig
+import tempfile
 
 
 import jaclang.compiler.passes.main as passes
 from jaclang import jac_import
 from jaclang.cli import cli
-from jaclang.compiler.compile import jac_file_to_pass, jac_pass_to_pass, jac_str_to_pass
+from jaclang.compiler.bytecode_cache import BytecodeCache, gen_dir_of
+from jaclang.compiler.compile import (
+    compile_jac,
+    jac_file_to_pass,
+    jac_pass_to_pass,
+    jac_str_to_pass,
+)
 from jaclang.compiler.passes.main.schedules import py_code_gen_typed
 from jaclang.runtimelib.context import SUPER_ROOT_ANCHOR
 from jaclang.runtimelib.machine import JacMachine, JacProgram
@@ -517,6 +524,39 @@ class JacLanguageTests(TestCase):
         self.assertEqual(outputs[2], "Person")
         self.assertEqual(outputs[3], 2)
 
+    def test_bytecode_cache_manifest(self) -> None:
+        """Test cached bytecode is keyed by the module and its imports."""
+        with tempfile.TemporaryDirectory() as tmp:
+            main_path = os.path.join(tmp, "main.jac")
+            dep_path = os.path.join(tmp, "dep.jac")
+            with open(main_path, "w") as f:
+                f.write('import:jac dep;\n"""Greeter."""\nobj Greeter {}\n')
+            with open(dep_path, "w") as f:
+                f.write("glob x = 1;\n")
+            self.assertFalse(compile_jac(main_path, cache_result=True).errors_had)
+
+            cached = BytecodeCache(gen_dir_of(main_path)).load(main_path)
+            self.assertIsNotNone(cached)
+            self.assertIsNotNone(cached[1])
+            registry = cached[1]
+            self.assertIn("Greeter", str(registry.registry))
+
+            with open(dep_path, "w") as f:
+                f.write("glob x = 2;\n")
+            self.assertIsNone(BytecodeCache(gen_dir_of(main_path)).load(main_path))
+            self.assertFalse(compile_jac(main_path, cache_result=True).errors_had)
+            self.assertIsNotNone(BytecodeCache(gen_dir_of(main_path)).lookup(main_path))
+            shared = BytecodeCache.of(gen_dir_of(main_path))
+            self.assertIs(shared, BytecodeCache.of(gen_dir_of(main_path)))
+            self.assertIsNotNone(shared.lookup(main_path))
+
+            # an annex created after the build invalidates the module
+            with open(os.path.join(tmp, "main.impl.jac"), "w") as f:
+                f.write('"""Greeter impl."""\n')
+            self.assertIsNone(BytecodeCache(gen_dir_of(main_path)).lookup(main_path))
+            self.assertFalse(compile_jac(main_path, cache_result=True).errors_had)
+            self.assertIsNotNone(BytecodeCache(gen_dir_of(main_path)).lookup(main_path))
+
     def test_enum_inside_arch(self) -> None:
         """Test Enum as member stmt."""
         captured_output = io.StringIO()
@@ -1204,6 +1244,72 @@ class JacLanguageTests(TestCase):
             "Exiting at the end of walker:  test_node(value=", stdout_value[11]
         )
 
+    def test_walker_dispatch(self) -> None:
+        """Test abilities dispatched from cached walker/node tables."""
+        captured_output = io.StringIO()
+        sys.stdout = captured_output
+        jac_import("walker_dispatch", base_path=self.fixture_abs_path("./"))
+        sys.stdout = sys.__stdout__
+        stdout_value = captured_output.getvalue().split("\n")
+        self.assertEqual(
+            "['greet a', 'tag a', 'left a', 'left b']",
+            stdout_value[1],
+        )
+        self.assertEqual("box b from Tagger", stdout_value[0])
+        self.assertEqual("box b from Counter", stdout_value[2])
+
+    def test_traversal_strategy(self) -> None:
+        """Test walker frontier traversal strategies."""
+        captured_output = io.StringIO()
+        sys.stdout = captured_output
+        jac_import("traversal_strategy", base_path=self.fixture_abs_path("./"))
+        sys.stdout = sys.__stdout__
+        stdout_value = captured_output.getvalue().split("\n")
+        self.assertEqual("['A', 'B', 'C', 'D', 'E']", stdout_value[0])
+        self.assertEqual("['A', 'C', 'D', 'B', 'E']", stdout_value[1])
+        self.assertEqual("['B', 'E', 'A', 'D', 'C']", stdout_value[2])
+        self.assertEqual("['A', 'B', 'C', 'E']", stdout_value[3])
+
+    def test_typed_edge_index(self) -> None:
+        """Test typed edge references served from the edge index."""
+        captured_output = io.StringIO()
+        sys.stdout = captured_output
+        jac_import("typed_edge_index", base_path=self.fixture_abs_path("./"))
+        sys.stdout = sys.__stdout__
+        stdout_value = captured_output.getvalue().split("\n")
+        self.assertEqual(
+            "[Hub(name='c'), Hub(name='a')] [Hub(name='a')] [Hub(name='c')]",
+            stdout_value[0],
+        )
+        self.assertEqual(
+            "[Hub(name='c')] [Hub(name='b'), Hub(name='c')] [Hub(name='c')]",
+            stdout_value[1],
+        )
+        self.assertEqual(
+            "[Hub(name='b'), Hub(name='c')] [Hub(name='c'), Hub(name='a')]",
+            stdout_value[2],
+        )
+        self.assertEqual("[Hub(name='c')] [Hub(name='c')] 0", stdout_value[3])
+
+    def test_frontier_expand(self) -> None:
+        """Test order preserving dedup of multi-source edge references."""
+        captured_output = io.StringIO()
+        sys.stdout = captured_output
+        jac_import("frontier_expand", base_path=self.fixture_abs_path("./"))
+        sys.stdout = sys.__stdout__
+        stdout_value = captured_output.getvalue().split("\n")
+        self.assertEqual(
+            "[Cell(val=99), Cell(val=10), Cell(val=1), Cell(val=11), "
+            "Cell(val=12), Cell(val=13)]",
+            stdout_value[0],
+        )
+        self.assertEqual("[99, 12, 10, 1]", stdout_value[1])
+        self.assertEqual("9", stdout_value[2])
+        self.assertEqual(
+            "[Cell(val=10), Cell(val=11), Cell(val=12), Cell(val=13)]",
+            stdout_value[3],
+        )
+
     def test_visit_order(self) -> None:
         """Test entry and exit behavior of walker."""
         captured_output = io.StringIO()